@@ -0,0 +1,6 @@
+"""Benchmarks of the back-end, run on the SQLite stand-in of the database (see tests/database.py)
+and on synthetic catalogues (see tests/catalogue.py), so no SQL Server or Azure is needed.
+
+Run all of them by `python -m benchmarks` (or `make benchmark`), or some of them by their
+names, e.g. `python -m benchmarks thread_pool`.
+"""
@@ -0,0 +1,31 @@
+import importlib
+import pkgutil
+import sys
+from pathlib import Path
+
+# Modules of benchmarks (each has the main function)
+BENCHMARK_PREFIX = "bench_"
+
+
+def available_benchmarks() -> list[str]:
+    """Names of all benchmarks (without the prefix)."""
+    return sorted(
+        _module.name.removeprefix(BENCHMARK_PREFIX)
+        for _module in pkgutil.iter_modules([str(Path(__file__).parent)])
+        if _module.name.startswith(BENCHMARK_PREFIX)
+    )
+
+
+def main(names: list[str]) -> None:
+    """Run the benchmarks (all of them if no name is given)."""
+    for _name in names or available_benchmarks():
+        module = importlib.import_module(f"benchmarks.{BENCHMARK_PREFIX}{_name}")
+        # The first paragraph of the docstring describes what is measured
+        summary = " ".join(module.__doc__.split("\n\n")[0].split())
+        print(f"== {_name}: {summary}", flush=True)
+        module.main()
+        print()
+
+
+if __name__ == "__main__":
+    main(sys.argv[1:])
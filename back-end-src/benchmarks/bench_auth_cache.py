@@ -0,0 +1,62 @@
+"""Time of the authentication of a request and statements registering its user, without
+and with the caches of validated principals and registered users.
+
+Tokens are signed by a local RSA key the bearer is configured with (see tests/tokens.py).
+"""
+import asyncio
+import time
+import uuid
+
+from fastapi.security import SecurityScopes
+from starlette.requests import Request
+
+from dataaccessrequest.authentication.role_validators import CachedAzureAuthorizationCodeBearer
+from dataaccessrequest.utils.data_access import KNOWN_USERS, register_user_if_missing
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from dataaccessrequest.utils.ttl_cache import TTLCache
+from tests.conftest import RESEARCHER
+from tests.tokens import TokenIssuer
+from .harness import temporary_database
+
+TENANT_ID = str(uuid.UUID(int=1))
+APP_CLIENT_ID = str(uuid.UUID(int=2))
+NUMBER_OF_REQUESTS = 300
+# Time to live of cache entries (0 disables the caches)
+CACHE_TTLS = {"no cache": 0, "cache": 300}
+
+
+async def _authenticate(bearer: CachedAzureAuthorizationCodeBearer, access_token: str) -> float:
+    """Authenticate the requests, return seconds per request."""
+    started = time.perf_counter()
+    for _ in range(NUMBER_OF_REQUESTS):
+        request = Request({"type": "http", "method": "GET", "path": "/", "headers": [
+            (b"authorization", f"Bearer {access_token}".encode())
+        ]})
+        assert await bearer(request, SecurityScopes()) == RESEARCHER
+    return (time.perf_counter() - started) / NUMBER_OF_REQUESTS
+
+
+def main() -> None:
+    token_issuer = TokenIssuer(TENANT_ID, APP_CLIENT_ID)
+    access_token = token_issuer.issue(RESEARCHER)
+    known_users_ttl = KNOWN_USERS.ttl
+    try:
+        for _label, _ttl in CACHE_TTLS.items():
+            bearer = CachedAzureAuthorizationCodeBearer(
+                TTLCache(16, _ttl), app_client_id=APP_CLIENT_ID, tenant_id=TENANT_ID,
+                allow_guest_users=True,
+                scopes={f"api://{APP_CLIENT_ID}/user_impersonation": "access"},
+            )
+            token_issuer.configure(bearer)
+            authentication_time = asyncio.run(_authenticate(bearer, access_token))
+            KNOWN_USERS.ttl = _ttl
+            with temporary_database() as database:
+                for _ in range(NUMBER_OF_REQUESTS):
+                    with SESSION_FACTORY() as session:
+                        register_user_if_missing(session, RESEARCHER)
+                        session.commit()
+                print(f"{_label:8s}: authentication {authentication_time * 1e6:6.1f} us per "
+                      f"request, statements registering the user: "
+                      f"{database.recorder.round_trips} of {NUMBER_OF_REQUESTS} requests")
+    finally:
+        KNOWN_USERS.ttl = known_users_ttl
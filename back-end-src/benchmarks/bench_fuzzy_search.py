@@ -0,0 +1,84 @@
+"""Latency of the typo tolerant (fuzzy) search on a catalogue of 2200 tables of 50 columns.
+
+Names matched by the index are compared with a brute-force scan of all names (Jaccard
+index of trigram sets).
+"""
+import random
+import statistics
+import tempfile
+import time
+from pathlib import Path
+
+from riocatalogue.catalogue_index import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    CatalogueFuzzyIndex,
+    name_trigrams,
+    normalize_name,
+)
+from riocatalogue.create_catalogue import create_fuzzy_index
+from tests.catalogue import synthetic_catalogue
+from .harness import percentile
+
+NUMBER_OF_TABLES = 2200
+NUMBER_OF_COLUMNS = 50
+FIXED_QUERIES = ("ClientIdentifer", "date of brith", "Refferal", "admision", "bloodpresure",
+                 "xq", "wardbed")
+# Queries with a typo made in random column and table names
+NUMBER_OF_COLUMN_TYPOS = 40
+NUMBER_OF_TABLE_TYPOS = 20
+# Queries compared with the brute-force scan and repetitions of each timed query
+NUMBER_OF_VERIFIED_QUERIES = 15
+REPETITIONS = 5
+
+
+def _with_typo(random_generator: random.Random, name: str) -> str:
+    """Delete, substitute or insert a random letter."""
+    position = random_generator.randrange(len(name))
+    operation = random_generator.choice("dsi")
+    letter = random_generator.choice("abcdefghijklmnopqrstuvwxyz")
+    return name[:position] + (letter if operation != "d" else "") + \
+        name[position + (operation != "i"):]
+
+
+def _similar_names_by_scan(fuzzy_index: CatalogueFuzzyIndex, search: str) -> set[str]:
+    query_trigrams = name_trigrams(normalize_name(search))
+    similar_names = set()
+    for _name in fuzzy_index.names:
+        trigrams = name_trigrams(_name)
+        if len(query_trigrams & trigrams) / len(query_trigrams | trigrams) >= \
+                DEFAULT_SIMILARITY_THRESHOLD:
+            similar_names.add(_name)
+    return similar_names
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        catalogue, _ = synthetic_catalogue(Path(directory), NUMBER_OF_TABLES, NUMBER_OF_COLUMNS)
+    started = time.perf_counter()
+    fuzzy_index = create_fuzzy_index(catalogue)
+    print(f"index of {len(fuzzy_index.names)} names built in "
+          f"{time.perf_counter() - started:.2f} s")
+
+    random_generator = random.Random(3)
+    column_names = [_column for _entry in catalogue.values() for _column in _entry["columns"]]
+    queries = list(FIXED_QUERIES)
+    queries.extend(_with_typo(random_generator, _name)
+                   for _name in random_generator.sample(column_names, NUMBER_OF_COLUMN_TYPOS))
+    queries.extend(_with_typo(random_generator, _name)
+                   for _name in random_generator.sample(list(catalogue), NUMBER_OF_TABLE_TYPOS))
+    for _query in queries[:NUMBER_OF_VERIFIED_QUERIES]:
+        similar_names = {
+            fuzzy_index.names[_name_id]
+            for _name_id, _ in fuzzy_index.similar_names(_query, DEFAULT_SIMILARITY_THRESHOLD)
+        }
+        assert similar_names == _similar_names_by_scan(fuzzy_index, _query), _query
+
+    durations = []
+    for _query in queries:
+        for _ in range(REPETITIONS):
+            started = time.perf_counter()
+            fuzzy_index.rank(_query, DEFAULT_SIMILARITY_THRESHOLD, 20)
+            durations.append(time.perf_counter() - started)
+    print(f"{len(queries)} queries: median {statistics.median(durations) * 1000:.2f} ms, "
+          f"p95 {percentile(durations, 0.95) * 1000:.2f} ms, max {max(durations) * 1000:.2f} ms "
+          f"(first {NUMBER_OF_VERIFIED_QUERIES} verified by the brute-force scan)")
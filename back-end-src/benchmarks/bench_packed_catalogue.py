@@ -0,0 +1,52 @@
+"""Memory of a catalogue of about 2000 tables of 50 columns kept as dicts (as create_catalogue
+returns it) and packed into arrays (see pack_catalogue), and the time to render a table of
+the packed one.
+
+Memory is measured by tracemalloc (Python allocations only).
+"""
+import gc
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+
+from riocatalogue.catalogue_binary import pack_catalogue
+from riocatalogue.create_catalogue import create_catalogue
+from tests.catalogue import write_catalogue_sources
+
+# About 10 % of tables are not imported (as in the real catalogue)
+NUMBER_OF_TABLES = 2200
+NUMBER_OF_COLUMNS = 50
+
+
+def _traced_megabytes() -> float:
+    gc.collect()
+    return tracemalloc.get_traced_memory()[0] / 2 ** 20
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        source_paths = write_catalogue_sources(Path(directory), NUMBER_OF_TABLES,
+                                               NUMBER_OF_COLUMNS)
+        tracemalloc.start()
+        try:
+            catalogue, search_catalogue = create_catalogue(*source_paths)
+            packed_catalogue = pack_catalogue(catalogue, search_catalogue)
+            # Both ways of keeping the catalogue are measured by the memory released
+            with_both = _traced_megabytes()
+            del catalogue
+            with_packed = _traced_megabytes()
+            del packed_catalogue
+            dict_megabytes = with_both - with_packed
+            packed_megabytes = with_packed - _traced_megabytes()
+        finally:
+            tracemalloc.stop()
+        catalogue, search_catalogue = create_catalogue(*source_paths)
+    packed_catalogue = pack_catalogue(catalogue, search_catalogue)
+    started = time.perf_counter()
+    for _table in packed_catalogue:
+        packed_catalogue[_table]
+    render_time = (time.perf_counter() - started) / len(packed_catalogue)
+    assert dict(packed_catalogue) == catalogue
+    print(f"{len(catalogue)} tables: dicts {dict_megabytes:.1f} MB, packed "
+          f"{packed_megabytes:.1f} MB, rendering a table takes {render_time * 1e6:.0f} us")
@@ -0,0 +1,67 @@
+"""Duration of POST /request and its statements for requests of 1, 50 and 2000 columns.
+
+The request is inserted by one transaction with an executemany per table (see
+insert_data_access_request), each executemany is a single batch on SQL Server.
+"""
+import asyncio
+import statistics
+import time
+
+import sqlalchemy
+
+from tests.conftest import DATA_MANAGER, RESEARCHER
+from tests.database import seed_database
+from .harness import authenticated_as, service_client, temporary_database
+
+# Number of columns of the request -> number of its calls
+NUMBER_OF_CALLS = {1: 20, 50: 20, 2000: 5}
+# Columns per table of the request
+COLUMNS_PER_TABLE = 200
+
+
+def _request_body(workspace_uuid: str, number_of_columns: int) -> dict:
+    number_of_tables = max(1, number_of_columns // COLUMNS_PER_TABLE)
+    return {
+        "title": "New request",
+        "workspace": {"workspace_uuid": workspace_uuid, "workspace_name": "Workspace 0"},
+        "justification": "Justification",
+        "comment": None,
+        "tables_and_columns": [
+            {"table_name": f"t{_table}", "table_description": "Table", "where_statement": None,
+             "columns": [{"column_name": f"c{_column}", "column_description": "Column"}
+                         for _column in range(number_of_columns // number_of_tables)]}
+            for _table in range(number_of_tables)
+        ],
+    }
+
+
+async def _post_requests(body: dict, number_of_calls: int) -> list[float]:
+    durations = []
+    async with service_client() as client:
+        for _ in range(number_of_calls):
+            started = time.perf_counter()
+            response = await client.post("/request", json=body)
+            durations.append(time.perf_counter() - started)
+            assert response.status_code == 200, response.text
+    return durations
+
+
+def main() -> None:
+    with temporary_database() as database, authenticated_as(RESEARCHER):
+        (request, *_) = seed_database(
+            database.engine, [DATA_MANAGER.user_uuid, RESEARCHER.user_uuid], 1, 1, 1
+        )
+        commits = []
+        sqlalchemy.event.listen(database.engine, "commit", lambda _connection: commits.append(1))
+        for _number_of_columns, _number_of_calls in NUMBER_OF_CALLS.items():
+            body = _request_body(request["workspace_uuid"], _number_of_columns)
+            # The first call loads the workspace visibility and registers the user
+            asyncio.run(_post_requests(body, 1))
+            database.recorder.reset()
+            commits.clear()
+            durations = asyncio.run(_post_requests(body, _number_of_calls))
+            statements = database.recorder.round_trips / _number_of_calls
+            rows = sum(_rows for _, _rows in database.recorder.statements) / _number_of_calls
+            print(f"{_number_of_columns:5d} columns: median "
+                  f"{statistics.median(durations) * 1000:7.1f} ms, {statements:.0f} statements "
+                  f"({rows:.0f} rows), {len(commits) / _number_of_calls:.0f} commit")
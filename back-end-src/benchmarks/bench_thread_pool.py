@@ -0,0 +1,70 @@
+"""Latency of GET /catalogue under load of GET /requests with slow database round-trips.
+
+Database calls of routes run in the database thread pool (see SessionManager.run_sync),
+the former way of running them directly on the event loop is emulated for comparison.
+"""
+import asyncio
+import contextlib
+import time
+from typing import Any, Callable, Iterator
+
+from dataaccessrequest.utils.session_manager import SessionManager
+from tests.conftest import DATA_MANAGER, RESEARCHER
+from tests.database import seed_database
+from .harness import authenticated_as, percentile, service_client, temporary_database
+
+# Seconds each SQL statement takes (a remote SQL Server)
+STATEMENT_LATENCY = 0.05
+NUMBER_OF_CALLS = 200
+# Every n-th call lists requests, the others get the catalogue
+REQUESTS_CALL_EVERY = 4
+
+
+@contextlib.contextmanager
+def _database_on_event_loop() -> Iterator[None]:
+    """Run the database logic of routes on the event loop (blocking it)."""
+    run_sync = SessionManager.__dict__["run_sync"]
+
+    async def _run_blocking(cls, function: Callable[..., Any], *args, **kwargs) -> Any:
+        with cls() as session:
+            return function(session, *args, **kwargs)
+
+    SessionManager.run_sync = classmethod(_run_blocking)
+    try:
+        yield
+    finally:
+        SessionManager.run_sync = run_sync
+
+
+async def _mixed_load() -> tuple[float, list[float], list[float]]:
+    """Send all calls at once, return the wall time and durations of calls of both kinds."""
+    catalogue_durations, requests_durations = [], []
+
+    async def _call(url: str, durations: list[float]) -> None:
+        started = time.perf_counter()
+        response = await client.get(url)
+        durations.append(time.perf_counter() - started)
+        assert response.status_code == 200, response.text
+
+    async with service_client() as client:
+        started = time.perf_counter()
+        await asyncio.gather(*(
+            _call("/requests", requests_durations) if _call_number % REQUESTS_CALL_EVERY == 0
+            else _call("/catalogue", catalogue_durations)
+            for _call_number in range(NUMBER_OF_CALLS)
+        ))
+        return time.perf_counter() - started, catalogue_durations, requests_durations
+
+
+def main() -> None:
+    for _label, _context in (("event loop", _database_on_event_loop),
+                             ("thread pool", contextlib.nullcontext)):
+        with temporary_database(STATEMENT_LATENCY) as database, \
+                authenticated_as(RESEARCHER), _context():
+            seed_database(database.engine, [DATA_MANAGER.user_uuid, RESEARCHER.user_uuid],
+                          50, 2, 3)
+            wall_time, catalogue_durations, requests_durations = asyncio.run(_mixed_load())
+        print(f"{_label:11s}: wall {wall_time:.2f} s | /catalogue p50 "
+              f"{percentile(catalogue_durations, 0.5) * 1000:7.1f} ms, p99 "
+              f"{percentile(catalogue_durations, 0.99) * 1000:7.1f} ms | /requests p99 "
+              f"{percentile(requests_durations, 0.99) * 1000:7.1f} ms")
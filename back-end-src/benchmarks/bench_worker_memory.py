@@ -0,0 +1,97 @@
+"""Memory of worker processes holding a catalogue of 2200 tables of 50 columns, built in
+memory by each worker or read from the memory mapped artifact shared by all of them.
+
+Memory is the proportional set size (PSS, pages shared by n processes count 1/n in each)
+summed over the workers, above the same number of workers without any catalogue (Linux).
+"""
+import gc
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from riocatalogue.create_catalogue import create_catalogue, write_catalogue_artifact
+from tests.catalogue import SOURCE_FILES, write_catalogue_sources
+
+NUMBER_OF_WORKERS = 4
+NUMBER_OF_TABLES = 2200
+NUMBER_OF_COLUMNS = 50
+# Ways of loading the catalogue in workers (the first one is the baseline)
+MODES = ("none", "in-memory", "mapped")
+ARTIFACT_NAME = "catalogue.bin"
+# Searches each worker serves before it is measured (all search modes)
+QUERIES = ("client", "date", "blood pressure", "referral", "a")
+
+
+def _proportional_set_size(pid: int) -> float:
+    """PSS of the process in MB."""
+    with open(f"/proc/{pid}/smaps_rollup") as smaps_file:
+        for _line in smaps_file:
+            if _line.startswith("Pss:"):
+                return int(_line.split()[1]) / 1024
+    raise ValueError(f"No PSS of the process {pid}")
+
+
+def worker(mode: str, directory: Path) -> None:
+    """Load the catalogue, serve some searches and wait until stdin is closed."""
+    # Imported here, so that the baseline pays the same imports
+    from dataaccessrequest.utils.catalogue_snapshot import CatalogueSnapshot
+    from riocatalogue.create_catalogue import catalogue_version, read_catalogue_artifact
+
+    snapshot = None
+    if mode == "in-memory":
+        catalogue, search_catalogue = create_catalogue(
+            *(directory / _file_name for _file_name in SOURCE_FILES)
+        )
+        snapshot = CatalogueSnapshot.from_catalogue(
+            catalogue_version(catalogue, search_catalogue), catalogue, search_catalogue
+        )
+        del catalogue, search_catalogue
+    elif mode == "mapped":
+        snapshot = CatalogueSnapshot.from_artifact(
+            read_catalogue_artifact(directory / ARTIFACT_NAME)
+        )
+    if snapshot is not None:
+        for _query in QUERIES:
+            snapshot.search_index.rank(_query, 20)
+            snapshot.search_index.search(_query)
+            snapshot.fuzzy_index.rank(_query, 0.4, 20)
+        for _table in list(snapshot.catalogue)[:50]:
+            snapshot.catalogue[_table]
+    gc.collect()
+    print("ready", flush=True)
+    sys.stdin.read()
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as directory:
+        directory = Path(directory)
+        source_paths = write_catalogue_sources(directory, NUMBER_OF_TABLES, NUMBER_OF_COLUMNS)
+        write_catalogue_artifact(directory / ARTIFACT_NAME, *create_catalogue(*source_paths))
+        memory = {}
+        for _mode in MODES:
+            started = time.perf_counter()
+            workers = [
+                subprocess.Popen(
+                    [sys.executable, "-m", __name__, _mode, str(directory)],
+                    cwd=Path(__file__).parents[1], stdin=subprocess.PIPE,
+                    stdout=subprocess.PIPE, text=True
+                )
+                for _ in range(NUMBER_OF_WORKERS)
+            ]
+            for _worker in workers:
+                assert _worker.stdout.readline() == "ready\n"
+            start_up = time.perf_counter() - started
+            memory[_mode] = sum(_proportional_set_size(_worker.pid) for _worker in workers)
+            for _worker in workers:
+                _worker.stdin.close()
+                _worker.wait()
+            catalogue_memory = memory[_mode] - memory[MODES[0]]
+            print(f"{_mode:9s}: {NUMBER_OF_WORKERS} workers started in {start_up:4.1f} s, "
+                  f"catalogue PSS {catalogue_memory:5.0f} MB "
+                  f"({catalogue_memory / NUMBER_OF_WORKERS:4.0f} MB per worker)")
+
+
+if __name__ == "__main__":
+    worker(sys.argv[1], Path(sys.argv[2]))
@@ -0,0 +1,67 @@
+"""Shared set-up of benchmarks: the database of the service, authentication and statistics."""
+import contextlib
+import tempfile
+import time
+from pathlib import Path
+from typing import Iterator
+
+import httpx
+import sqlalchemy
+
+from dataaccessrequest.main import service
+from dataaccessrequest.authentication.role_validators import (
+    validator_is_researcher_or_data_manager,
+    validator_is_researcher,
+    validator_is_data_manager,
+)
+from dataaccessrequest.pydantic_models.pd_aad_auth_models import AADUserModel
+from dataaccessrequest.utils.data_access import KNOWN_USERS
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from dataaccessrequest.utils.workspace_acl import WORKSPACE_ACL
+from tests.database import SqliteDatabase
+
+
+@contextlib.contextmanager
+def temporary_database(statement_latency: float = 0.0) -> Iterator[SqliteDatabase]:
+    """Empty database the sessions of the service are bound to (as the database fixture of
+    tests).
+    Args:
+        statement_latency (float): Seconds each statement waits (as a round-trip to a remote
+            SQL Server would, it holds the connection and the thread, not the CPU).
+    """
+    with tempfile.TemporaryDirectory() as directory:
+        database = SqliteDatabase(Path(directory) / "dar.sqlite")
+        if statement_latency:
+            @sqlalchemy.event.listens_for(database.engine, "before_cursor_execute")
+            def _wait(*_args) -> None:
+                time.sleep(statement_latency)
+        SESSION_FACTORY.configure(bind=database.engine)
+        WORKSPACE_ACL.version = None
+        KNOWN_USERS.clear()
+        try:
+            yield database
+        finally:
+            database.dispose()
+
+
+@contextlib.contextmanager
+def authenticated_as(user: AADUserModel) -> Iterator[None]:
+    """Replace the role validators (tokens are not involved, see the api fixture of tests)."""
+    for _validator in (validator_is_researcher_or_data_manager, validator_is_researcher,
+                       validator_is_data_manager):
+        service.dependency_overrides[_validator] = lambda: user
+    try:
+        yield
+    finally:
+        service.dependency_overrides.clear()
+
+
+def service_client() -> httpx.AsyncClient:
+    """Client calling the service in-process."""
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=service), base_url="http://test")
+
+
+def percentile(values: list[float], fraction: float) -> float:
+    """Value below which the fraction of values falls (nearest rank)."""
+    ordered_values = sorted(values)
+    return ordered_values[max(0, round(fraction * len(ordered_values)) - 1)]
@@ -4,6 +4,7 @@ from typing import Type
 from sqlalchemy.engine import create_engine
 
 from .config_base import ConfigBase
+from .connection_pool import MonitoredQueuePool
 from .config_local import ConfigLocal
 from .config_prod import ConfigProd
 
@@ -22,4 +23,14 @@ match ENVIRONMENT:
         raise RuntimeError("Wrong stack name")
 
 # Create SQLAlchemy engine
-ENGINE = create_engine(CONFIG.connection_url)
+ENGINE = create_engine(
+    CONFIG.connection_url,
+    poolclass=MonitoredQueuePool,
+    pool_size=CONFIG.MSSQL_POOL_SIZE,
+    max_overflow=CONFIG.MSSQL_POOL_MAX_OVERFLOW,
+    pool_recycle=CONFIG.MSSQL_POOL_RECYCLE,
+    pool_pre_ping=CONFIG.MSSQL_POOL_PRE_PING,
+    pool_timeout=CONFIG.MSSQL_POOL_TIMEOUT,
+    # pyodbc sends the parameters of executemany in one batch (bulk inserts)
+    fast_executemany=True,
+)
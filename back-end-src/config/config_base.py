@@ -9,6 +9,26 @@ class ConfigBase:
     MSSQL_PASS: str
     MSSQL_PORT: int
     MSSQL_DATABASE: str
+    #   - connection pool: number of persistent connections, how many extra connections
+    #     can be opened on peak, seconds after which connection is replaced, whether the
+    #     connection is tested before use and seconds to wait for a free connection
+    MSSQL_POOL_SIZE: int
+    MSSQL_POOL_MAX_OVERFLOW: int
+    MSSQL_POOL_RECYCLE: int
+    MSSQL_POOL_PRE_PING: bool
+    MSSQL_POOL_TIMEOUT: int
+    #   - maximal number of threads running blocking (pyodbc) database calls
+    #     outside the event loop of asynchronous routes (should not be higher than
+    #     MSSQL_POOL_SIZE + MSSQL_POOL_MAX_OVERFLOW)
+    MSSQL_THREAD_POOL_SIZE: int
+
+    # Catalogue configuration
+    #   - path to the artifact written by create_catalogue (if not set, the catalogue
+    #     in riocatalogue package is used)
+    CATALOGUE_ARTIFACT_PATH: str | None
+    #   - seconds between checks whether the artifact changed (0 disables the reloading,
+    #     it can be still triggered by the reload end-point)
+    CATALOGUE_RELOAD_INTERVAL: int
 
     # CORS header list
     CORS_ORIGINS: list[str]
@@ -20,6 +40,11 @@ class ConfigBase:
     AAD_TENANT_ID: str
     #   - you can find this in "Expose an API" option of APP (in section "scopes").
     AAD_APPLICATION_ID_URI_SCOPES: str
+    #   - validated principals are cached by the token (until it expires) and registered users
+    #     are remembered, each for at most AUTH_CACHE_TTL seconds (0 disables both), in at
+    #     most AUTH_CACHE_SIZE entries per process
+    AUTH_CACHE_TTL: int
+    AUTH_CACHE_SIZE: int
 
     # Azure Data Factory (aka ADF) configuration
     #   - subscription ID (UUID) where ADF resource is located
@@ -30,6 +55,40 @@ class ConfigBase:
     ADF_DATA_FACTORY: str
     #   - name of the pipeline inside ADF that does dataset provisioning
     ADF_PIPELINE_NAME: str
+    #   - URL of the Azure Resource Manager (management) API (can point to a local stand-in)
+    ADF_MANAGEMENT_URL: str
+    #   - provisioning jobs: how many pipeline runs are submitted at once (per process),
+    #     how many times a failed submission is tried, seconds before the first retry
+    #     (doubled with each attempt), seconds between checks for new jobs and seconds
+    #     after which a job left running (e.g. by a crashed process) is queued again
+    PROVISIONING_CONCURRENCY: int
+    PROVISIONING_MAX_ATTEMPTS: int
+    PROVISIONING_RETRY_BACKOFF: int
+    PROVISIONING_POLL_INTERVAL: int
+    PROVISIONING_JOB_TIMEOUT: int
+    #   - pipeline runs: seconds between status checks of all unfinished runs (0 disables
+    #     them) and days after which runs not updated are not checked anymore
+    ADF_RUN_POLL_INTERVAL: int
+    ADF_RUN_LOOKBACK_DAYS: int
+    #   - fan-out: requests with at least this many tables are split into groups of tables
+    #     (balanced by number of rows) submitted as separate runs (0 disables it), and the
+    #     maximal number of runs per request (i.e. how many of its runs run in parallel)
+    ADF_FAN_OUT_MIN_TABLES: int
+    ADF_FAN_OUT_PARALLELISM: int
+    #   - format of the request definition passed to the pipeline: "json" (plain JSON) or
+    #     "compact-v1" (deduplicated, compressed, see query_payload), compact payloads whose
+    #     encoding is longer than the limit (characters) are staged at the URL (a blob
+    #     container or a file:// directory as a local stand-in; empty never stages them),
+    #     staged payloads are deleted once their runs finish (a lifecycle rule of the
+    #     container should delete the ones left by runs older than ADF_RUN_LOOKBACK_DAYS)
+    ADF_QUERY_FORMAT: str
+    ADF_QUERY_INLINE_LIMIT: int
+    ADF_QUERY_STAGING_URL: str | None
+
+    # Workspace visibility configuration
+    #   - seconds between checks whether the workspace visibility was changed by another
+    #     worker process (0 loads it only at start-up, enough for a single process)
+    ACL_RELOAD_INTERVAL: int
 
     @classmethod
     @property
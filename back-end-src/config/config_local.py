@@ -8,6 +8,15 @@ class ConfigLocal(ConfigBase):
     MSSQL_PASS: str = "TeZRoglILDh5"
     MSSQL_PORT: int = 1433
     MSSQL_DATABASE: str = "mrictestdb"
+    MSSQL_POOL_SIZE: int = 5
+    MSSQL_POOL_MAX_OVERFLOW: int = 5
+    MSSQL_POOL_RECYCLE: int = 1800
+    MSSQL_POOL_PRE_PING: bool = True
+    MSSQL_POOL_TIMEOUT: int = 30
+    MSSQL_THREAD_POOL_SIZE: int = 10
+
+    CATALOGUE_ARTIFACT_PATH: str | None = None
+    CATALOGUE_RELOAD_INTERVAL: int = 0
 
     CORS_ORIGINS: list[str] = ["*"]
 
@@ -19,3 +28,19 @@ class ConfigLocal(ConfigBase):
     ADF_RESOURCE_GROUP: str = "TODO"
     ADF_DATA_FACTORY: str = "TODO"
     ADF_PIPELINE_NAME: str = "DatasetProvisioning"
+    ADF_MANAGEMENT_URL: str = "https://management.azure.com"
+    PROVISIONING_CONCURRENCY: int = 2
+    PROVISIONING_MAX_ATTEMPTS: int = 5
+    PROVISIONING_RETRY_BACKOFF: int = 10
+    PROVISIONING_POLL_INTERVAL: int = 5
+    PROVISIONING_JOB_TIMEOUT: int = 600
+    ADF_RUN_POLL_INTERVAL: int = 60
+    ADF_RUN_LOOKBACK_DAYS: int = 7
+    ADF_FAN_OUT_MIN_TABLES: int = 0
+    ADF_FAN_OUT_PARALLELISM: int = 4
+    ADF_QUERY_FORMAT: str = "json"
+    ADF_QUERY_INLINE_LIMIT: int = 32768
+    ADF_QUERY_STAGING_URL: str | None = "file:///tmp/dar-query-payloads"
+    AUTH_CACHE_TTL: int = 300
+    AUTH_CACHE_SIZE: int = 1024
+    ACL_RELOAD_INTERVAL: int = 0
@@ -11,6 +11,16 @@ class ConfigProd(ConfigBase):
     MSSQL_PASS: str = getenv("MSSQL_PASS", None)
     MSSQL_PORT: int = int(getenv("MSSQL_PORT", -1))
     MSSQL_DATABASE: str = getenv("MSSQL_DATABASE", None)
+    MSSQL_POOL_SIZE: int = int(getenv("MSSQL_POOL_SIZE", 10))
+    MSSQL_POOL_MAX_OVERFLOW: int = int(getenv("MSSQL_POOL_MAX_OVERFLOW", 10))
+    # Azure SQL closes connections idle for 30 minutes, so they are replaced sooner
+    MSSQL_POOL_RECYCLE: int = int(getenv("MSSQL_POOL_RECYCLE", 1500))
+    MSSQL_POOL_PRE_PING: bool = getenv("MSSQL_POOL_PRE_PING", "true").lower() == "true"
+    MSSQL_POOL_TIMEOUT: int = int(getenv("MSSQL_POOL_TIMEOUT", 30))
+    MSSQL_THREAD_POOL_SIZE: int = int(getenv("MSSQL_THREAD_POOL_SIZE", 20))
+
+    CATALOGUE_ARTIFACT_PATH: str | None = getenv("CATALOGUE_ARTIFACT_PATH", None)
+    CATALOGUE_RELOAD_INTERVAL: int = int(getenv("CATALOGUE_RELOAD_INTERVAL", 60))
 
     # This requires to have env variable in the form: ["Origin1", "Origin2", ...]
     CORS_ORIGINS: list[str] = json.loads(getenv("CORS_ORIGINS", "[]"))
@@ -23,3 +33,19 @@ class ConfigProd(ConfigBase):
     ADF_RESOURCE_GROUP: str = getenv("ADF_RESOURCE_GROUP", None)
     ADF_DATA_FACTORY: str = getenv("ADF_DATA_FACTORY", None)
     ADF_PIPELINE_NAME: str = getenv("ADF_PIPELINE_NAME", None)
+    ADF_MANAGEMENT_URL: str = getenv("ADF_MANAGEMENT_URL", "https://management.azure.com")
+    PROVISIONING_CONCURRENCY: int = int(getenv("PROVISIONING_CONCURRENCY", 4))
+    PROVISIONING_MAX_ATTEMPTS: int = int(getenv("PROVISIONING_MAX_ATTEMPTS", 5))
+    PROVISIONING_RETRY_BACKOFF: int = int(getenv("PROVISIONING_RETRY_BACKOFF", 30))
+    PROVISIONING_POLL_INTERVAL: int = int(getenv("PROVISIONING_POLL_INTERVAL", 10))
+    PROVISIONING_JOB_TIMEOUT: int = int(getenv("PROVISIONING_JOB_TIMEOUT", 900))
+    ADF_RUN_POLL_INTERVAL: int = int(getenv("ADF_RUN_POLL_INTERVAL", 60))
+    ADF_RUN_LOOKBACK_DAYS: int = int(getenv("ADF_RUN_LOOKBACK_DAYS", 7))
+    ADF_FAN_OUT_MIN_TABLES: int = int(getenv("ADF_FAN_OUT_MIN_TABLES", 0))
+    ADF_FAN_OUT_PARALLELISM: int = int(getenv("ADF_FAN_OUT_PARALLELISM", 4))
+    ADF_QUERY_FORMAT: str = getenv("ADF_QUERY_FORMAT", "json")
+    ADF_QUERY_INLINE_LIMIT: int = int(getenv("ADF_QUERY_INLINE_LIMIT", 32768))
+    ADF_QUERY_STAGING_URL: str | None = getenv("ADF_QUERY_STAGING_URL", None)
+    AUTH_CACHE_TTL: int = int(getenv("AUTH_CACHE_TTL", 300))
+    AUTH_CACHE_SIZE: int = int(getenv("AUTH_CACHE_SIZE", 1024))
+    ACL_RELOAD_INTERVAL: int = int(getenv("ACL_RELOAD_INTERVAL", 5))
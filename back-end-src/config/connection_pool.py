@@ -0,0 +1,55 @@
+import threading
+import time
+
+from sqlalchemy.exc import TimeoutError as PoolTimeoutError
+from sqlalchemy.pool import QueuePool
+
+
+class MonitoredQueuePool(QueuePool):
+    """Standard SQLAlchemy QueuePool that also measures how long checkouts wait for
+    a connection (including the login when a new connection must be opened)."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._statistics_lock = threading.Lock()
+        self._checkouts: int = 0
+        self._checkout_timeouts: int = 0
+        self._checkout_wait_total: float = 0.0
+        self._checkout_wait_max: float = 0.0
+
+    def _do_get(self):
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        except PoolTimeoutError:
+            with self._statistics_lock:
+                self._checkout_timeouts += 1
+            raise
+        finally:
+            waited = time.perf_counter() - started
+            with self._statistics_lock:
+                self._checkouts += 1
+                self._checkout_wait_total += waited
+                self._checkout_wait_max = max(self._checkout_wait_max, waited)
+
+    def statistics(self) -> dict:
+        """Collect the current state of the pool and the checkout wait times.
+        Returns:
+            dict: Mapping with pool sizes, connections in use/idle and wait times (in ms).
+        """
+        with self._statistics_lock:
+            checkouts = self._checkouts
+            checkout_timeouts = self._checkout_timeouts
+            checkout_wait_total = self._checkout_wait_total
+            checkout_wait_max = self._checkout_wait_max
+        return {
+            "pool_size": self.size(),
+            "max_overflow": self._max_overflow,
+            "connections_in_use": self.checkedout(),
+            "connections_idle": self.checkedin(),
+            "overflow": max(0, self.overflow()),
+            "checkouts": checkouts,
+            "checkout_timeouts": checkout_timeouts,
+            "checkout_wait_avg_ms": checkout_wait_total / checkouts * 1000 if checkouts else 0.0,
+            "checkout_wait_max_ms": checkout_wait_max * 1000,
+        }
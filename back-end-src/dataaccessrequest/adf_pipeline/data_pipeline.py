@@ -1,15 +1,249 @@
+import asyncio
+import datetime
 import json
+import threading
 import uuid
 from base64 import b64encode as base64_encode_byte_array
+from urllib.parse import urlparse
 
+from azure.core.credentials import TokenCredential
 from azure.identity import DefaultAzureCredential
 from azure.mgmt.datafactory import DataFactoryManagementClient
+from azure.mgmt.datafactory.models import (
+    PipelineRun,
+    RunFilterParameters,
+    RunQueryFilter,
+    RunQueryFilterOperand,
+    RunQueryFilterOperator,
+)
 
 from config import CONFIG
+from ..utils.catalogue_snapshot import CATALOGUE_LOADER
+from .query_payload import (
+    COMPACT_QUERY_FORMAT,
+    PayloadStore,
+    create_payload_store,
+    encode_query_payload,
+)
+
+# Format of the query parameter understood by every version of the pipeline (plain JSON)
+JSON_QUERY_FORMAT = "json"
+# Hosts of a local stand-in of the management API (plain HTTP is permitted only for them)
+LOCAL_MANAGEMENT_HOSTS = ("localhost", "127.0.0.1")
+
+
+class DataPipelineClient:
+    """Process-wide client of Azure Data Factory (aka ADF).
+
+    The credential (with its cached access token) and the management client (with its pool
+    of HTTPS connections) are created on the first use and reused by all later runs, hence
+    only the first run pays the credential chain probing, token acquisition and TLS
+    handshake. Runs are submitted from worker threads, so the client is created under lock.
+    """
+
+    def __init__(self, subscription_id: str, base_url: str,
+                 credential: TokenCredential | None = None,
+                 query_format: str = JSON_QUERY_FORMAT, inline_limit: int = 0,
+                 staging_url: str | None = None):
+        self.subscription_id = subscription_id
+        self.base_url = base_url
+        # Format of the request definition (see query_parameters)
+        self.query_format = query_format
+        self.inline_limit = inline_limit
+        self.staging_url = staging_url
+        self._credential = credential
+        # Only the credential created here is closed by the client
+        self._owns_credential = credential is None
+        self._client: DataFactoryManagementClient | None = None
+        self._payload_store: PayloadStore | None = None
+        self._client_lock = threading.Lock()
+        # Bearer tokens are sent over plain HTTP only to a local stand-in of the API
+        self._request_options = {}
+        if urlparse(base_url).hostname in LOCAL_MANAGEMENT_HOSTS:
+            self._request_options["enforce_https"] = False
+
+    def _credential_locked(self) -> TokenCredential:
+        """The credential (created on the first use, called under the lock)."""
+        if self._credential is None:
+            self._credential = DefaultAzureCredential()
+        return self._credential
+
+    @property
+    def client(self) -> DataFactoryManagementClient:
+        """The management client (created on the first access)."""
+        with self._client_lock:
+            if self._client is None:
+                self._client = DataFactoryManagementClient(
+                    self._credential_locked(), self.subscription_id, base_url=self.base_url
+                )
+            return self._client
+
+    @property
+    def payload_store(self) -> PayloadStore:
+        """Store of payloads staged for the pipeline (created on the first access)."""
+        with self._client_lock:
+            if self._payload_store is None:
+                self._payload_store = create_payload_store(
+                    self.staging_url, self._credential_locked()
+                )
+            return self._payload_store
+
+    def query_parameters(self, request_def: dict) -> dict:
+        """Parameters of the pipeline carrying the request definition: the plain JSON in
+        query_base64, or the compact payload (see query_payload) in query_base64, or in
+        the staging storage with its URL in query_reference if the encoded payload is
+        longer than inline_limit.
+        Args:
+            request_def (dict): Request definition (see create_run).
+        Returns:
+            dict: Parameters of the pipeline run.
+        """
+        if self.query_format != COMPACT_QUERY_FORMAT:
+            # Create a query and encode it as a base64 (to safe transfer)
+            return {"query_base64": base64_encode_byte_array(
+                json.dumps(request_def).encode('ascii')
+            ).decode('ascii')}
+        payload = encode_query_payload(request_def, CATALOGUE_LOADER.snapshot)
+        encoded_payload = base64_encode_byte_array(payload).decode('ascii')
+        if self.staging_url and len(encoded_payload) > self.inline_limit:
+            return {"query_format": COMPACT_QUERY_FORMAT,
+                    "query_reference": self.payload_store.put(payload)}
+        return {"query_format": COMPACT_QUERY_FORMAT, "query_base64": encoded_payload}
+
+    def create_run(self, request_def: dict, target_workspace: uuid.UUID) -> str:
+        """Run the requested pipeline in Azure Data Factory pipeline (blocking).
+        Args:
+            request_def (dict): Mapping with tables and columns to be serialized and run.
+                following the logic:
+                table_name -> {"columns" -> [col_1, ...], "where_statement" -> "condition" | None}
+            target_workspace (uuid.UUID): UUID of the target workspace.
+        Returns:
+            str: Identifier of the pipeline run.
+        """
+        # Run the pipeline
+        response = self.client.pipelines.create_run(
+            parameters={
+                **self.query_parameters(request_def),
+                "workspace_uuid": str(target_workspace),
+            },
+            resource_group_name=CONFIG.ADF_RESOURCE_GROUP,
+            factory_name=CONFIG.ADF_DATA_FACTORY,
+            pipeline_name=CONFIG.ADF_PIPELINE_NAME,
+            **self._request_options,
+        )
+        return response.run_id
+
+    def run_link(self, run_id: str) -> str:
+        """Construct the link to the pipeline run in the ADF portal."""
+        return f'https://adf.azure.com/en/monitoring/pipelineruns/{run_id}?factory=%2F' \
+               f'subscriptions%2F' \
+               f'{self.subscription_id}%2F' \
+               f'resourceGroups%2F' \
+               f'{CONFIG.ADF_RESOURCE_GROUP}%2F' \
+               f'providers%2F' \
+               f'Microsoft.DataFactory%2F' \
+               f'factories%2F' \
+               f'{CONFIG.ADF_DATA_FACTORY}'
+
+    def run_pipeline(self, request_def: dict, target_workspace: uuid.UUID) -> str:
+        """Run the pipeline (see create_run) and return the link to the run."""
+        return self.run_link(self.create_run(request_def, target_workspace))
+
+    async def create_run_async(self, request_def: dict, target_workspace: uuid.UUID) -> str:
+        """Run the pipeline (see create_run) in a worker thread, so the event loop does not
+        wait for Azure."""
+        return await asyncio.to_thread(self.create_run, request_def, target_workspace)
+
+    def query_runs(self, run_ids: list[str],
+                   updated_after: datetime.datetime) -> list[PipelineRun]:
+        """Fetch the state of all given pipeline runs by one query (blocking, more calls only
+        if ADF splits the result into pages).
+        ADF cannot filter runs by their identifiers, hence runs of the pipeline updated in
+        the time window are queried and the given ones are picked from them (paging stops
+        once all are found).
+        Args:
+            run_ids (list[str]): Identifiers of pipeline runs.
+            updated_after (datetime.datetime): Runs last updated before are not returned.
+        Returns:
+            list[PipelineRun]: Runs found (with status, duration and message).
+        """
+        filter_parameters = RunFilterParameters(
+            last_updated_after=updated_after,
+            last_updated_before=datetime.datetime.now(datetime.timezone.utc),
+            filters=[RunQueryFilter(
+                operand=RunQueryFilterOperand.PIPELINE_NAME,
+                operator=RunQueryFilterOperator.EQUALS,
+                values=[CONFIG.ADF_PIPELINE_NAME],
+            )],
+        )
+        missing_run_ids = set(run_ids)
+        pipeline_runs = []
+        while True:
+            response = self.client.pipeline_runs.query_by_factory(
+                CONFIG.ADF_RESOURCE_GROUP, CONFIG.ADF_DATA_FACTORY, filter_parameters,
+                **self._request_options,
+            )
+            for _pipeline_run in response.value:
+                if _pipeline_run.run_id in missing_run_ids:
+                    missing_run_ids.remove(_pipeline_run.run_id)
+                    pipeline_runs.append(_pipeline_run)
+            if not missing_run_ids or not response.continuation_token:
+                return pipeline_runs
+            filter_parameters.continuation_token = response.continuation_token
+
+    async def query_runs_async(self, run_ids: list[str],
+                               updated_after: datetime.datetime) -> list[PipelineRun]:
+        """Fetch the state of the runs (see query_runs) in a worker thread."""
+        return await asyncio.to_thread(self.query_runs, run_ids, updated_after)
+
+    def delete_staged_payloads(self, pipeline_runs: list[PipelineRun]) -> int:
+        """Delete payloads staged for the pipeline runs (see query_parameters), to be called
+        once the runs are finished (blocking).
+        Args:
+            pipeline_runs (list[PipelineRun]): Finished runs (as returned by query_runs).
+        Returns:
+            int: Number of runs whose payload was staged.
+        """
+        query_references = [
+            _pipeline_run.parameters["query_reference"] for _pipeline_run in pipeline_runs
+            if _pipeline_run.parameters and "query_reference" in _pipeline_run.parameters
+        ]
+        if query_references and self.staging_url:
+            for _query_reference in query_references:
+                self.payload_store.delete(_query_reference)
+        return len(query_references)
+
+    async def delete_staged_payloads_async(self, pipeline_runs: list[PipelineRun]) -> int:
+        """Delete payloads of the runs (see delete_staged_payloads) in a worker thread."""
+        return await asyncio.to_thread(self.delete_staged_payloads, pipeline_runs)
+
+    def close(self) -> None:
+        """Close connections of the client, the payload store and the credential (on
+        shut-down)."""
+        with self._client_lock:
+            if self._client is not None:
+                self._client.close()
+                self._client = None
+            if self._payload_store is not None:
+                self._payload_store.close()
+                self._payload_store = None
+            if self._owns_credential and self._credential is not None:
+                self._credential.close()
+                self._credential = None
+
+
+# Single (process-wide) client of ADF
+ADF_CLIENT = DataPipelineClient(
+    CONFIG.ADF_SUBSCRIPTION_ID, CONFIG.ADF_MANAGEMENT_URL,
+    query_format=CONFIG.ADF_QUERY_FORMAT,
+    inline_limit=CONFIG.ADF_QUERY_INLINE_LIMIT,
+    staging_url=CONFIG.ADF_QUERY_STAGING_URL,
+)
 
 
 def run_data_pipeline(request_def: dict, target_workspace: uuid.UUID) -> str:
-    """Run the requested pipeline in Azure Data Factory pipeline.
+    """Run the requested pipeline in Azure Data Factory pipeline (blocking, see
+    DataPipelineClient.run_pipeline).
     Args:
         request_def (dict): Mapping with tables and columns to be serialized and run.
             following the logic:
@@ -18,33 +252,4 @@ def run_data_pipeline(request_def: dict, target_workspace: uuid.UUID) -> str:
     Returns:
         str: URL to Azure Data Factory pipeline run.
     """
-    # Authentication for ADF
-    data_factory_client = DataFactoryManagementClient(
-        DefaultAzureCredential(),
-        CONFIG.ADF_SUBSCRIPTION_ID
-    )
-
-    # Run the pipeline
-    response = data_factory_client.pipelines.create_run(
-        parameters={
-            # Create a query and encode it as a base64 (to safe transfer)
-            "query_base64": base64_encode_byte_array(
-                json.dumps(request_def).encode('ascii')
-            ).decode('ascii'),
-            "workspace_uuid": str(target_workspace),
-        },
-        resource_group_name=CONFIG.ADF_RESOURCE_GROUP,
-        factory_name=CONFIG.ADF_DATA_FACTORY,
-        pipeline_name=CONFIG.ADF_PIPELINE_NAME,
-    )
-
-    # Construct the link to the ADF resource and return
-    return f'https://adf.azure.com/en/monitoring/pipelineruns/{response.run_id}?factory=%2F' \
-           f'subscriptions%2F' \
-           f'{CONFIG.ADF_SUBSCRIPTION_ID}%2F' \
-           f'resourceGroups%2F' \
-           f'{CONFIG.ADF_RESOURCE_GROUP}%2F' \
-           f'providers%2F' \
-           f'Microsoft.DataFactory%2F' \
-           f'factories%2F' \
-           f'{CONFIG.ADF_DATA_FACTORY}'
+    return ADF_CLIENT.run_pipeline(request_def, target_workspace)
@@ -0,0 +1,36 @@
+import heapq
+from collections.abc import Callable, Mapping
+
+
+def split_request_definition(request_definition: dict, table_rows: Callable[[str], int],
+                             number_of_groups: int) -> list[tuple[dict, int]]:
+    """Split the request definition into groups of tables with similar number of rows
+    (largest tables first, each to the group with the fewest rows so far, then with the
+    fewest tables, so tables without rows are spread over the groups too).
+    Args:
+        request_definition (dict): Request definition (see run_data_pipeline).
+        table_rows (Callable[[str], int]): Number of rows of the table (by its name).
+        number_of_groups (int): Maximal number of groups.
+    Returns:
+        list[tuple[dict, int]]: Request definitions of non-empty groups and their number of
+            rows (the group with the largest table first).
+    """
+    number_of_rows = {_table: table_rows(_table) for _table in request_definition}
+    # Heap of (rows so far, tables so far, group number)
+    groups_heap = [(0, 0, _group) for _group in range(max(1, number_of_groups))]
+    groups = [({}, 0) for _ in groups_heap]
+    for _table in sorted(request_definition, key=lambda _name: (-number_of_rows[_name], _name)):
+        group_rows, group_tables, group_number = heapq.heappop(groups_heap)
+        groups[group_number][0][_table] = request_definition[_table]
+        group_rows += number_of_rows[_table]
+        groups[group_number] = (groups[group_number][0], group_rows)
+        heapq.heappush(groups_heap, (group_rows, group_tables + 1, group_number))
+    return [_group for _group in groups if _group[0]]
+
+
+def catalogue_table_rows(catalogue: Mapping[str, dict]) -> Callable[[str], int]:
+    """Number of rows of tables from the catalogue (0 for tables no longer there)."""
+    def table_rows(table_name: str) -> int:
+        table_entry = catalogue.get(table_name)
+        return table_entry["number_of_rows"] if table_entry is not None else 0
+    return table_rows
@@ -0,0 +1,362 @@
+import asyncio
+import datetime
+import json
+import logging
+import uuid
+from typing import Protocol
+
+import sqlalchemy
+from fastapi import HTTPException
+from sqlalchemy.orm import Session, selectinload
+
+from config import CONFIG
+from ..pydantic_models.pd_models import ProvisioningJobStatus, RequestStatusOptions
+from ..sql_models.db_models import (
+    DataAccessRequest,
+    DataAccessRequestTables,
+    DataAccessRequestProvisioningJob,
+    DataAccessRequestPipelineRun,
+)
+from ..utils.catalogue_snapshot import CATALOGUE_LOADER
+from ..utils.session_manager import SessionManager
+from ..utils.data_access import select_one_or_404
+from .data_pipeline import ADF_CLIENT
+from .fan_out import catalogue_table_rows, split_request_definition
+from .run_status import INITIAL_RUN_STATUS, update_request_states
+
+logger = logging.getLogger(__name__)
+
+# Maximal length of the stored error (size of the column)
+JOB_ERROR_LENGTH = 1024
+
+
+class PipelineClient(Protocol):
+    """Client submitting pipeline runs (DataPipelineClient or a fake one in tests)."""
+
+    async def create_run_async(self, request_def: dict, target_workspace: uuid.UUID) -> str:
+        ...
+
+    def run_link(self, run_id: str) -> str:
+        ...
+
+
+def select_request_definition(session: Session,
+                              request_uuid: uuid.UUID) -> tuple[dict, uuid.UUID]:
+    """Select the tables and columns of the approved request for the ADF pipeline.
+    Args:
+        session (Session): Session for SQL Server.
+        request_uuid (uuid.UUID): UUID of the request.
+    Raises:
+        HTTPException: 404 error if the request is not found or is not approved.
+    Returns:
+        tuple[dict, uuid.UUID]: Request definition (see run_data_pipeline) and the UUID
+            of the target workspace.
+    """
+    # Selects the DAR (with the requested tables and columns),
+    #   raise error if nothing is found or is not reviewed
+    _request = select_one_or_404(session.query(DataAccessRequest).options(
+        selectinload(
+            DataAccessRequest.tables_and_columns
+        ).selectinload(
+            DataAccessRequestTables.columns
+        )
+    ).filter(
+        DataAccessRequest.request_uuid == request_uuid,
+        DataAccessRequest.status == str(RequestStatusOptions.approved)
+    ))
+    # Select the related tables and columns
+    _requested_tables = _request.tables_and_columns
+    request_definition = {}
+    for _requested_table in _requested_tables:
+        _table_cols_req_def = {
+            "columns": [_col.column_name for _col in _requested_table.columns],
+            "where_statement": _requested_table.where_statement
+        }
+        request_definition[_requested_table.table_name] = _table_cols_req_def
+    return request_definition, _request.workspace_uuid
+
+
+def _claim_jobs(session: Session, number_of_jobs: int, job_timeout: int) -> list[sqlalchemy.Row]:
+    """Mark up to number_of_jobs due jobs as running (smallest requests first, by their
+    estimated bytes, then oldest first) and return them.
+    Each job is claimed by a conditional update, so when more processes compete for it,
+    only one of them gets it.
+    Returns:
+        list[sqlalchemy.Row]: Job UUID, request UUID and attempts of each claimed job.
+    """
+    now = datetime.datetime.now()
+    # Jobs left running for too long (their process stopped) are queued again
+    session.execute(
+        sqlalchemy.update(
+            DataAccessRequestProvisioningJob
+        ).where(
+            DataAccessRequestProvisioningJob.status == str(ProvisioningJobStatus.running),
+            DataAccessRequestProvisioningJob.updated_on <
+            now - datetime.timedelta(seconds=job_timeout)
+        ).values(status=str(ProvisioningJobStatus.queued), updated_on=now)
+    )
+    due_jobs = session.query(
+        DataAccessRequestProvisioningJob.job_uuid,
+        DataAccessRequestProvisioningJob.request_uuid,
+        DataAccessRequestProvisioningJob.attempts,
+    ).join(
+        DataAccessRequest,
+        DataAccessRequest.request_uuid == DataAccessRequestProvisioningJob.request_uuid
+    ).filter(
+        DataAccessRequestProvisioningJob.status == str(ProvisioningJobStatus.queued),
+        DataAccessRequestProvisioningJob.next_attempt_on <= now
+    ).order_by(
+        # Large requests go last, so they do not hold up the small ones (not estimated
+        #   requests are considered small)
+        sqlalchemy.func.coalesce(DataAccessRequest.estimated_bytes, 0).asc(),
+        DataAccessRequestProvisioningJob.next_attempt_on.asc()
+    ).limit(number_of_jobs).all()
+    claimed_jobs = []
+    for _job in due_jobs:
+        matched_rows = session.execute(
+            sqlalchemy.update(
+                DataAccessRequestProvisioningJob
+            ).where(
+                DataAccessRequestProvisioningJob.job_uuid == _job.job_uuid,
+                DataAccessRequestProvisioningJob.status == str(ProvisioningJobStatus.queued)
+            ).values(status=str(ProvisioningJobStatus.running), updated_on=now)
+        ).rowcount
+        if matched_rows == 1:
+            claimed_jobs.append(_job)
+    session.commit()
+    return claimed_jobs
+
+
+def _select_job_runs(session: Session, job_uuid: str) -> list[sqlalchemy.Row]:
+    """Select runs already submitted by the job (ordered by group number).
+    Returns:
+        list[sqlalchemy.Row]: Run identifier, group number and table names of each run.
+    """
+    return session.query(
+        DataAccessRequestPipelineRun.run_id,
+        DataAccessRequestPipelineRun.group_number,
+        DataAccessRequestPipelineRun.table_names,
+    ).filter(
+        DataAccessRequestPipelineRun.job_uuid == job_uuid
+    ).order_by(
+        DataAccessRequestPipelineRun.group_number.asc()
+    ).all()
+
+
+def _insert_run(session: Session, job: sqlalchemy.Row, group_number: int,
+                group_definition: dict, number_of_rows: int, run_id: str) -> None:
+    """Record the submitted run of the group of tables (so a retry of the job does not
+    submit the group again)."""
+    session.add(DataAccessRequestPipelineRun(
+        run_id=run_id,
+        job_uuid=job.job_uuid,
+        group_number=group_number,
+        table_names=json.dumps(list(group_definition)),
+        number_of_rows=number_of_rows,
+        created_on=datetime.datetime.now(),
+        status=INITIAL_RUN_STATUS,
+    ))
+    session.commit()
+
+
+def _complete_job(session: Session, job: sqlalchemy.Row, first_run_id: str,
+                  adf_link: str) -> None:
+    """Store the link to the (first) pipeline run on the job and the request, with the
+    state of all runs of the job."""
+    now = datetime.datetime.now()
+    session.execute(
+        sqlalchemy.update(
+            DataAccessRequestProvisioningJob
+        ).where(
+            DataAccessRequestProvisioningJob.job_uuid == job.job_uuid
+        ).values(status=str(ProvisioningJobStatus.succeeded), attempts=job.attempts + 1,
+                 adf_link=adf_link, error=None, updated_on=now)
+    )
+    session.execute(
+        sqlalchemy.update(
+            DataAccessRequest
+        ).where(
+            DataAccessRequest.request_uuid == job.request_uuid
+        ).values(adf_link=adf_link, adf_run_id=first_run_id)
+    )
+    # Runs may have been checked by the poller already (e.g. before a retry)
+    update_request_states(session, [job.job_uuid])
+    session.commit()
+
+
+def _fail_job(session: Session, job: sqlalchemy.Row, error: str,
+              retry_in: float | None) -> None:
+    """Record the failed submission, the job is queued again unless retry_in is None."""
+    now = datetime.datetime.now()
+    values = {"attempts": job.attempts + 1, "error": error[:JOB_ERROR_LENGTH], "updated_on": now}
+    if retry_in is None:
+        values["status"] = str(ProvisioningJobStatus.failed)
+    else:
+        values["status"] = str(ProvisioningJobStatus.queued)
+        values["next_attempt_on"] = now + datetime.timedelta(seconds=retry_in)
+    session.execute(
+        sqlalchemy.update(
+            DataAccessRequestProvisioningJob
+        ).where(
+            DataAccessRequestProvisioningJob.job_uuid == job.job_uuid
+        ).values(**values)
+    )
+    session.commit()
+
+
+class ProvisioningWorker:
+    """Submits pipeline runs of queued provisioning jobs in the background.
+
+    Jobs are persisted (DataAccessRequestProvisioningJob), so they survive restarts and
+    each worker process can pick them up. At most `concurrency` jobs are processed at
+    once by a process, a failed submission is retried after `retry_backoff` seconds
+    (doubled with each attempt) until `max_attempts` is reached.
+
+    Requests with at least `fan_out_min_tables` tables (if set) are split into up to
+    `fan_out_parallelism` groups of tables balanced by their number of rows, each group is
+    submitted as its own pipeline run, so the groups are provisioned in parallel."""
+
+    def __init__(self, pipeline_client: PipelineClient, concurrency: int, max_attempts: int,
+                 retry_backoff: float, poll_interval: float, job_timeout: int,
+                 fan_out_min_tables: int = 0, fan_out_parallelism: int = 1):
+        self.pipeline_client = pipeline_client
+        self.concurrency = concurrency
+        self.max_attempts = max_attempts
+        self.retry_backoff = retry_backoff
+        self.poll_interval = poll_interval
+        self.job_timeout = job_timeout
+        self.fan_out_min_tables = fan_out_min_tables
+        self.fan_out_parallelism = fan_out_parallelism
+        # Jobs being processed by this process
+        self._running_jobs: set[asyncio.Task] = set()
+        self._job_finished: asyncio.Event | None = None
+        self._wake_up: asyncio.Event | None = None
+
+    def wake_up(self) -> None:
+        """Check for jobs without waiting for the poll interval (e.g. a job was created)."""
+        if self._wake_up is not None:
+            self._wake_up.set()
+
+    def _split(self, request_definition: dict, remaining_definition: dict,
+               number_of_submitted_runs: int) -> list[tuple[dict, int]]:
+        """Groups of the tables not submitted yet (see split_request_definition), a single
+        group unless the request is large enough to be split (runs submitted by previous
+        attempts count towards the parallelism)."""
+        number_of_groups = 1
+        if 0 < self.fan_out_min_tables <= len(request_definition):
+            number_of_groups = max(1, self.fan_out_parallelism - number_of_submitted_runs)
+        return split_request_definition(
+            remaining_definition, catalogue_table_rows(CATALOGUE_LOADER.snapshot.catalogue),
+            number_of_groups
+        )
+
+    async def _submit_group(self, job: sqlalchemy.Row, group_number: int,
+                            group_definition: dict, number_of_rows: int,
+                            workspace_uuid: uuid.UUID) -> str:
+        """Submit the pipeline run of the group of tables and record it."""
+        run_id = await self.pipeline_client.create_run_async(group_definition, workspace_uuid)
+        await SessionManager.run_sync(
+            _insert_run, job, group_number, group_definition, number_of_rows, run_id
+        )
+        return run_id
+
+    async def _process(self, job: sqlalchemy.Row) -> None:
+        """Submit the pipeline runs of the claimed job and record the outcome."""
+        try:
+            request_definition, workspace_uuid = await SessionManager.run_sync(
+                select_request_definition, job.request_uuid
+            )
+            if not request_definition:
+                raise HTTPException(status_code=422, detail="request has no tables")
+            # Groups submitted by a previous attempt are kept
+            submitted_runs = await SessionManager.run_sync(_select_job_runs, job.job_uuid)
+            submitted_tables = {
+                _table for _run in submitted_runs for _table in json.loads(_run.table_names)
+            }
+            groups = self._split(request_definition, {
+                _table: _table_definition
+                for _table, _table_definition in request_definition.items()
+                if _table not in submitted_tables
+            }, len(submitted_runs))
+            next_group_number = submitted_runs[-1].group_number + 1 if submitted_runs else 0
+            submissions = await asyncio.gather(*(
+                self._submit_group(job, next_group_number + _position, _group_definition,
+                                   _number_of_rows, workspace_uuid)
+                for _position, (_group_definition, _number_of_rows) in enumerate(groups)
+            ), return_exceptions=True)
+            for _submission in submissions:
+                if isinstance(_submission, BaseException):
+                    raise _submission
+            first_run_id = submitted_runs[0].run_id if submitted_runs else submissions[0]
+        except Exception as error:
+            retry_in = None
+            # A request that is not approved (anymore) or has no tables is not retried
+            if not isinstance(error, HTTPException) and job.attempts + 1 < self.max_attempts:
+                retry_in = self.retry_backoff * 2 ** job.attempts
+            logger.warning("Provisioning job %s failed (attempt %d): %s",
+                           job.job_uuid, job.attempts + 1, error)
+            await SessionManager.run_sync(_fail_job, job, repr(error), retry_in)
+        else:
+            await SessionManager.run_sync(
+                _complete_job, job, first_run_id, self.pipeline_client.run_link(first_run_id)
+            )
+
+    def _finish(self, task: asyncio.Task) -> None:
+        """Release the slot of the processed job."""
+        self._running_jobs.discard(task)
+        self._job_finished.set()
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Provisioning job cannot be recorded: %s", task.exception())
+
+    async def run(self) -> None:
+        """Claim and process due jobs (runs until cancelled, errors are only logged)."""
+        self._wake_up = asyncio.Event()
+        self._job_finished = asyncio.Event()
+        while True:
+            free_slots = self.concurrency - len(self._running_jobs)
+            if free_slots > 0:
+                try:
+                    claimed_jobs = await SessionManager.run_sync(
+                        _claim_jobs, free_slots, self.job_timeout
+                    )
+                except Exception as error:
+                    logger.error("Provisioning jobs cannot be claimed: %s", error)
+                    claimed_jobs = []
+                for _job in claimed_jobs:
+                    task = asyncio.create_task(self._process(_job))
+                    self._running_jobs.add(task)
+                    task.add_done_callback(self._finish)
+                if len(claimed_jobs) == free_slots:
+                    # There may be more due jobs
+                    continue
+            # Wait for a new job, a free slot or the next check
+            self._wake_up.clear()
+            self._job_finished.clear()
+            waiters = [asyncio.create_task(self._wake_up.wait())]
+            if self._running_jobs:
+                waiters.append(asyncio.create_task(self._job_finished.wait()))
+            try:
+                await asyncio.wait(waiters, timeout=self.poll_interval,
+                                   return_when=asyncio.FIRST_COMPLETED)
+            finally:
+                for _waiter in waiters:
+                    _waiter.cancel()
+
+    async def drain(self) -> None:
+        """Wait until the jobs being processed are finished (on shut-down, after run is
+        cancelled)."""
+        if self._running_jobs:
+            await asyncio.gather(*self._running_jobs, return_exceptions=True)
+
+
+# Single (process-wide) worker submitting provisioning jobs
+PROVISIONING_WORKER = ProvisioningWorker(
+    ADF_CLIENT,
+    concurrency=CONFIG.PROVISIONING_CONCURRENCY,
+    max_attempts=CONFIG.PROVISIONING_MAX_ATTEMPTS,
+    retry_backoff=CONFIG.PROVISIONING_RETRY_BACKOFF,
+    poll_interval=CONFIG.PROVISIONING_POLL_INTERVAL,
+    job_timeout=CONFIG.PROVISIONING_JOB_TIMEOUT,
+    fan_out_min_tables=CONFIG.ADF_FAN_OUT_MIN_TABLES,
+    fan_out_parallelism=CONFIG.ADF_FAN_OUT_PARALLELISM,
+)
@@ -0,0 +1,203 @@
+"""Compact payload of the request definition for the ADF pipeline (query_format
+"compact-v1"), an alternative to the plain JSON of query_base64 for very wide requests.
+
+The payload is gzip compressed JSON:
+    {
+        "format": "compact-v1",
+        "catalogue_version": "<version of the catalogue the indexes refer to>",
+        "column_sets": [[0, 1, 5], [2, "NewColumn"], ...],
+        "tables": [[table, column_set, where_statement], ...]
+    }
+where `table` is the index of the table in the catalogue (or its name if it is not in
+the catalogue), `column_set` is the index of the list in column_sets (or "*" if all
+columns of the table are selected) and lists in column_sets hold positions of columns
+in the table of the catalogue (or names of columns not in the catalogue). Identical
+lists are stored only once.
+"""
+import gzip
+import json
+import os
+import tempfile
+import uuid
+from pathlib import Path
+from typing import Protocol
+from urllib.parse import urlparse
+from urllib.request import url2pathname
+
+from azure.core import PipelineClient
+from azure.core.credentials import TokenCredential
+from azure.core.pipeline.policies import (
+    BearerTokenCredentialPolicy,
+    HeadersPolicy,
+    RetryPolicy,
+)
+from azure.core.rest import HttpRequest
+
+from ..utils.catalogue_snapshot import CatalogueSnapshot
+
+COMPACT_QUERY_FORMAT = "compact-v1"
+# Column set of tables with all columns selected
+ALL_COLUMNS = "*"
+# Scope of tokens for Azure Storage and the version of its REST API
+STORAGE_SCOPE = "https://storage.azure.com/.default"
+STORAGE_API_VERSION = "2021-08-06"
+
+
+def encode_query_payload(request_def: dict, catalogue: CatalogueSnapshot) -> bytes:
+    """Encode the request definition into the compact payload (see the module docstring).
+    Args:
+        request_def (dict): Request definition (see run_data_pipeline).
+        catalogue (CatalogueSnapshot): Catalogue the indexes refer to.
+    Returns:
+        bytes: Compressed payload.
+    """
+    column_sets = []
+    # Column set (as a tuple) -> its index in column_sets
+    column_set_ids = {}
+    tables = []
+    for _table, _table_def in request_def.items():
+        table_id = catalogue.catalogue.table_ids.get(_table)
+        if table_id is None:
+            table_reference = _table
+            column_set = tuple(_table_def["columns"])
+        else:
+            table_reference = table_id
+            column_positions = {
+                _column: _position
+                for _position, _column in enumerate(catalogue.catalogue.column_names(table_id))
+            }
+            column_set = tuple(column_positions.get(_column, _column)
+                               for _column in _table_def["columns"])
+            if column_set == tuple(range(len(column_positions))):
+                column_set = ALL_COLUMNS
+        if column_set != ALL_COLUMNS:
+            if column_set not in column_set_ids:
+                column_set_ids[column_set] = len(column_sets)
+                column_sets.append(list(column_set))
+            column_set = column_set_ids[column_set]
+        tables.append([table_reference, column_set, _table_def["where_statement"]])
+    payload = {
+        "format": COMPACT_QUERY_FORMAT,
+        "catalogue_version": catalogue.version,
+        "column_sets": column_sets,
+        "tables": tables,
+    }
+    # No timestamp in the header, so the same request always gives the same bytes
+    return gzip.compress(
+        json.dumps(payload, separators=(",", ":")).encode("utf-8"), mtime=0
+    )
+
+
+def decode_query_payload(payload: bytes, catalogue: CatalogueSnapshot) -> dict:
+    """Decode the compact payload back into the request definition (the reference for
+    the consumer of the payload).
+    Args:
+        payload (bytes): Compressed payload (see encode_query_payload).
+        catalogue (CatalogueSnapshot): The catalogue of the version in the payload.
+    Raises:
+        ValueError: If the payload is not compact-v1 or refers to another catalogue.
+    Returns:
+        dict: Request definition (see run_data_pipeline).
+    """
+    decoded = json.loads(gzip.decompress(payload))
+    if decoded.get("format") != COMPACT_QUERY_FORMAT:
+        raise ValueError(f"Unknown format of the payload: {decoded.get('format')}")
+    if decoded["catalogue_version"] != catalogue.version:
+        raise ValueError(f"Payload refers to catalogue {decoded['catalogue_version']}")
+    request_def = {}
+    for _table_reference, _column_set, _where_statement in decoded["tables"]:
+        if isinstance(_table_reference, int):
+            table_name = catalogue.catalogue.table_names[_table_reference]
+            column_names = list(catalogue.catalogue.column_names(_table_reference))
+        else:
+            table_name = _table_reference
+            column_names = []
+        if _column_set == ALL_COLUMNS:
+            columns = column_names
+        else:
+            columns = [column_names[_column] if isinstance(_column, int) else _column
+                       for _column in decoded["column_sets"][_column_set]]
+        request_def[table_name] = {"columns": columns, "where_statement": _where_statement}
+    return request_def
+
+
+class PayloadStore(Protocol):
+    """Storage of payloads handed to the pipeline by reference."""
+
+    def put(self, payload: bytes) -> str:
+        """Store the payload and return its URL."""
+        ...
+
+    def delete(self, reference: str) -> None:
+        """Delete the payload stored at the URL (missing payloads and URLs outside of the
+        store are ignored)."""
+        ...
+
+    def close(self) -> None:
+        ...
+
+
+class LocalPayloadStore:
+    """Stand-in of the blob storage keeping payloads in a local directory (development)."""
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+
+    def put(self, payload: bytes) -> str:
+        self.directory.mkdir(parents=True, exist_ok=True)
+        payload_path = self.directory / f"query-{uuid.uuid4()}.json.gz"
+        # Written aside and renamed, so a reader never sees a partial file
+        with tempfile.NamedTemporaryFile(dir=self.directory, delete=False) as payload_file:
+            payload_file.write(payload)
+        os.replace(payload_file.name, payload_path)
+        return payload_path.as_uri()
+
+    def delete(self, reference: str) -> None:
+        payload_path = Path(url2pathname(urlparse(reference).path))
+        if payload_path.parent == self.directory:
+            payload_path.unlink(missing_ok=True)
+
+    def close(self) -> None:
+        pass
+
+
+class BlobPayloadStore:
+    """Container in Azure Blob Storage, payloads are uploaded by the Put Blob REST call
+    (authorized by the credential of the service)."""
+
+    def __init__(self, container_url: str, credential: TokenCredential):
+        self.container_url = container_url.rstrip("/")
+        self._client = PipelineClient(self.container_url, policies=[
+            HeadersPolicy({"x-ms-version": STORAGE_API_VERSION}),
+            RetryPolicy(),
+            BearerTokenCredentialPolicy(credential, STORAGE_SCOPE),
+        ])
+
+    def put(self, payload: bytes) -> str:
+        blob_url = f"{self.container_url}/query-{uuid.uuid4()}.json.gz"
+        response = self._client.send_request(HttpRequest("PUT", blob_url, headers={
+            "x-ms-blob-type": "BlockBlob",
+            "Content-Type": "application/gzip",
+        }, content=payload))
+        response.raise_for_status()
+        return blob_url
+
+    def delete(self, reference: str) -> None:
+        if not reference.startswith(f"{self.container_url}/"):
+            return
+        response = self._client.send_request(HttpRequest("DELETE", reference))
+        # Already deleted (e.g. by the lifecycle policy of the container)
+        if response.status_code != 404:
+            response.raise_for_status()
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def create_payload_store(staging_url: str, credential: TokenCredential) -> PayloadStore:
+    """Create the store of payloads: a local directory for file:// URLs, otherwise the
+    blob container."""
+    parsed_url = urlparse(staging_url)
+    if parsed_url.scheme == "file":
+        return LocalPayloadStore(Path(url2pathname(parsed_url.path)))
+    return BlobPayloadStore(staging_url, credential)
@@ -0,0 +1,223 @@
+import asyncio
+import datetime
+import logging
+from typing import Protocol
+
+import sqlalchemy
+from azure.mgmt.datafactory.models import PipelineRun
+from sqlalchemy.orm import Session
+
+from config import CONFIG
+from ..sql_models.db_models import (
+    DataAccessRequest,
+    DataAccessRequestProvisioningJob,
+    DataAccessRequestPipelineRun,
+)
+from ..utils.session_manager import SessionManager
+from .data_pipeline import ADF_CLIENT
+
+logger = logging.getLogger(__name__)
+
+# Status of the pipeline run just submitted (as reported by ADF)
+INITIAL_RUN_STATUS = "Queued"
+# Statuses of pipeline runs that do not change anymore
+FINISHED_RUN_STATUSES = ("Succeeded", "Failed", "Cancelled")
+# Maximal length of the stored error (size of the column)
+RUN_ERROR_LENGTH = 1024
+
+
+class RunStatusClient(Protocol):
+    """Client querying pipeline runs (DataPipelineClient or a fake one in tests)."""
+
+    async def query_runs_async(self, run_ids: list[str],
+                               updated_after: datetime.datetime) -> list[PipelineRun]:
+        ...
+
+    async def delete_staged_payloads_async(self, pipeline_runs: list[PipelineRun]) -> int:
+        ...
+
+
+def _select_unfinished_runs(session: Session, created_after: datetime.datetime) -> list[str]:
+    """Select identifiers of pipeline runs submitted after created_after that are not
+    finished (older runs are not checked anymore)."""
+    return session.scalars(
+        sqlalchemy.select(DataAccessRequestPipelineRun.run_id).where(
+            DataAccessRequestPipelineRun.status.not_in(FINISHED_RUN_STATUSES),
+            DataAccessRequestPipelineRun.created_on >= created_after
+        )
+    ).all()
+
+
+def _run_error(pipeline_run: PipelineRun) -> str | None:
+    """Message of the failed pipeline run (None for other runs)."""
+    if pipeline_run.status != "Failed" or not pipeline_run.message:
+        return None
+    return pipeline_run.message[:RUN_ERROR_LENGTH]
+
+
+def aggregate_run_states(runs: list[sqlalchemy.Row]) -> tuple[str, int | None, str | None]:
+    """State of the request provisioned by the runs (one run per group of tables).
+    Args:
+        runs (list[sqlalchemy.Row]): Status, duration and error of each run (ordered by
+            group number).
+    Returns:
+        tuple[str, int | None, str | None]: Status (the status of a single run; otherwise
+            Queued / InProgress until all runs finish, then Failed, Cancelled or Succeeded),
+            duration of the slowest run (once all finished) and errors of failed runs.
+    """
+    statuses = {_run.status for _run in runs}
+    errors = [_run.error for _run in runs if _run.error]
+    if len(runs) > 1:
+        errors = [f"Run {_number + 1} of {len(runs)}: {_run.error}"
+                  for _number, _run in enumerate(runs) if _run.error]
+    error = "\n".join(errors)[:RUN_ERROR_LENGTH] or None
+    if not statuses.issubset(FINISHED_RUN_STATUSES):
+        if len(runs) == 1:
+            return runs[0].status, None, error
+        return (INITIAL_RUN_STATUS if statuses == {INITIAL_RUN_STATUS} else "InProgress",
+                None, error)
+    durations = [_run.duration_ms for _run in runs if _run.duration_ms is not None]
+    duration = max(durations) if durations else None
+    for _status in ("Failed", "Cancelled"):
+        if _status in statuses:
+            return _status, duration, error
+    return "Succeeded", duration, error
+
+
+def update_request_states(session: Session, job_uuids: list[str]) -> None:
+    """Store the aggregated state of runs of the jobs on their requests (only requests
+    whose last submission is the job, by one executemany, without commit)."""
+    runs = session.query(
+        DataAccessRequestProvisioningJob.request_uuid,
+        DataAccessRequestPipelineRun.job_uuid,
+        DataAccessRequestPipelineRun.run_id,
+        DataAccessRequestPipelineRun.status,
+        DataAccessRequestPipelineRun.duration_ms,
+        DataAccessRequestPipelineRun.error,
+    ).join(
+        DataAccessRequestProvisioningJob,
+        DataAccessRequestProvisioningJob.job_uuid == DataAccessRequestPipelineRun.job_uuid
+    ).filter(
+        DataAccessRequestPipelineRun.job_uuid.in_(job_uuids)
+    ).order_by(
+        DataAccessRequestPipelineRun.job_uuid, DataAccessRequestPipelineRun.group_number
+    ).all()
+    runs_of_jobs: dict[str, list[sqlalchemy.Row]] = {}
+    for _run in runs:
+        runs_of_jobs.setdefault(_run.job_uuid, []).append(_run)
+    if not runs_of_jobs:
+        return
+    requests_table = DataAccessRequest.__table__
+    request_states = []
+    for _job_runs in runs_of_jobs.values():
+        run_status, run_duration_ms, run_error = aggregate_run_states(_job_runs)
+        request_states.append({
+            "job_request_uuid": _job_runs[0].request_uuid,
+            # The request refers to the first run of the job
+            "first_run_id": _job_runs[0].run_id,
+            "run_status": run_status,
+            "run_duration_ms": run_duration_ms,
+            "run_error": run_error,
+        })
+    session.execute(
+        sqlalchemy.update(requests_table).where(
+            requests_table.c.request_uuid == sqlalchemy.bindparam("job_request_uuid"),
+            requests_table.c.adf_run_id == sqlalchemy.bindparam("first_run_id"),
+        ).values(
+            adf_run_status=sqlalchemy.bindparam("run_status"),
+            adf_run_duration_ms=sqlalchemy.bindparam("run_duration_ms"),
+            adf_run_error=sqlalchemy.bindparam("run_error"),
+        ),
+        request_states
+    )
+
+
+def _store_run_states(session: Session, pipeline_runs: list[PipelineRun]) -> None:
+    """Store status, duration and error of the pipeline runs (by one executemany) and the
+    aggregated state on their requests."""
+    runs_table = DataAccessRequestPipelineRun.__table__
+    session.execute(
+        sqlalchemy.update(runs_table).where(
+            runs_table.c.run_id == sqlalchemy.bindparam("fetched_run_id")
+        ).values(
+            status=sqlalchemy.bindparam("run_status"),
+            duration_ms=sqlalchemy.bindparam("run_duration_ms"),
+            error=sqlalchemy.bindparam("run_error"),
+        ),
+        [
+            {
+                "fetched_run_id": _pipeline_run.run_id,
+                "run_status": _pipeline_run.status,
+                "run_duration_ms": _pipeline_run.duration_in_ms,
+                "run_error": _run_error(_pipeline_run),
+            }
+            for _pipeline_run in pipeline_runs
+        ]
+    )
+    update_request_states(session, session.scalars(
+        sqlalchemy.select(DataAccessRequestPipelineRun.job_uuid).where(
+            DataAccessRequestPipelineRun.run_id.in_(
+                [_pipeline_run.run_id for _pipeline_run in pipeline_runs]
+            )
+        ).distinct()
+    ).all())
+    session.commit()
+
+
+class PipelineRunPoller:
+    """Keeps the state of submitted pipeline runs and their requests up to date: all
+    unfinished runs are checked by a single query to ADF each interval (not one call per
+    run), so the request list and detail show the state without calling Azure. Runs
+    submitted more than `lookback_days` ago keep their last known state.
+
+    Payloads staged for the runs (see DataPipelineClient.query_parameters) are deleted once
+    the runs finish. Runs not seen finished (e.g. older than the lookback) leave their
+    payloads behind, so the staging container needs a lifecycle rule for old blobs."""
+
+    def __init__(self, status_client: RunStatusClient, interval: float, lookback_days: int):
+        self.status_client = status_client
+        self.interval = interval
+        self.lookback_days = lookback_days
+
+    async def poll(self) -> int:
+        """Check all unfinished runs once.
+        Returns:
+            int: Number of runs whose state was fetched.
+        """
+        lookback = datetime.timedelta(days=self.lookback_days)
+        # Runs are created with the local time, ADF is queried in UTC
+        run_ids = await SessionManager.run_sync(
+            _select_unfinished_runs, datetime.datetime.now() - lookback
+        )
+        if not run_ids:
+            return 0
+        pipeline_runs = await self.status_client.query_runs_async(
+            run_ids, datetime.datetime.now(datetime.timezone.utc) - lookback
+        )
+        if pipeline_runs:
+            await SessionManager.run_sync(_store_run_states, pipeline_runs)
+        # Finished runs are not checked anymore, their payloads are not needed either
+        finished_runs = [_pipeline_run for _pipeline_run in pipeline_runs
+                         if _pipeline_run.status in FINISHED_RUN_STATUSES]
+        if finished_runs:
+            try:
+                await self.status_client.delete_staged_payloads_async(finished_runs)
+            except Exception as error:
+                logger.error("Staged payloads of finished runs cannot be deleted: %s", error)
+        return len(pipeline_runs)
+
+    async def run(self) -> None:
+        """Check the runs every interval seconds (runs until cancelled, errors are only
+        logged)."""
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                await self.poll()
+            except Exception as error:
+                logger.error("State of pipeline runs cannot be updated: %s", error)
+
+
+# Single (process-wide) poller of pipeline runs
+RUN_STATUS_POLLER = PipelineRunPoller(
+    ADF_CLIENT, CONFIG.ADF_RUN_POLL_INTERVAL, CONFIG.ADF_RUN_LOOKBACK_DAYS
+)
@@ -1,13 +1,59 @@
-from fastapi import Depends
+import hashlib
+
+from fastapi import Depends, HTTPException, Request
+from fastapi.security import SecurityScopes
 from fastapi_azure_auth import SingleTenantAzureAuthorizationCodeBearer
-from fastapi_azure_auth.user import User
 from fastapi_azure_auth.exceptions import InvalidAuth
 
 from config import CONFIG
 from ..pydantic_models.pd_aad_auth_models import AADUserModel, AADUserRoles
+from ..utils.ttl_cache import TTLCache
+
+
+class CachedAzureAuthorizationCodeBearer(SingleTenantAzureAuthorizationCodeBearer):
+    """Validates the access token (JWT) only on its first use, the principal is then taken
+    from the cache keyed by the hash of the token until the token expires (or the ttl
+    of the cache passes), so repeated requests skip the signature and claims checks."""
+
+    def __init__(self, principal_cache: TTLCache, **kwargs):
+        super().__init__(**kwargs)
+        self.principal_cache = principal_cache
+
+    async def __call__(self, request: Request,
+                       security_scopes: SecurityScopes) -> AADUserModel | None:
+        """Return the principal of the access token (validated when not cached), the user
+        is attached to the request (request.state.user) in both cases.
+        Raises:
+            InvalidAuth: If the token is not valid (None is returned instead if auto_error is
+                False). Causes 401 error later.
+        """
+        try:
+            access_token = await self.oauth(request=request)
+        except (HTTPException, InvalidAuth):
+            if not self.auto_error:
+                return None
+            raise
+        token_hash = hashlib.sha256(
+            f"{access_token} {security_scopes.scope_str}".encode()
+        ).digest()
+        cached = self.principal_cache.get(token_hash)
+        if cached is None:
+            user = await super().__call__(request, security_scopes)
+            if user is None:
+                return None
+            cached = (user, AADUserModel(**user.model_dump()))
+            self.principal_cache.put(token_hash, cached, user.claims["exp"])
+        user, principal = cached
+        request.state.user = user
+        return principal
+
 
 # === AZURE SINGLE TENANT CODE BEARER ===
-AAD_CODE_BEARER = SingleTenantAzureAuthorizationCodeBearer(
+#   - validated users with their principals (at most AUTH_CACHE_SIZE tokens for up to
+#     AUTH_CACHE_TTL seconds)
+PRINCIPAL_CACHE = TTLCache(CONFIG.AUTH_CACHE_SIZE, CONFIG.AUTH_CACHE_TTL)
+AAD_CODE_BEARER = CachedAzureAuthorizationCodeBearer(
+    PRINCIPAL_CACHE,
     app_client_id=CONFIG.AAD_APPLICATION_CLIENT_ID,
     tenant_id=CONFIG.AAD_TENANT_ID,
     allow_guest_users=True,
@@ -20,50 +66,50 @@ AAD_CODE_BEARER = SingleTenantAzureAuthorizationCodeBearer(
 
 # === CONCRETE VALIDATORS ===
 async def validator_is_researcher_or_data_manager(
-    user: User = Depends(AAD_CODE_BEARER)
+    user: AADUserModel = Depends(AAD_CODE_BEARER)
 ) -> AADUserModel:
     """Check if the user has DataManager or Researcher role (or both).
     Args:
-        user (User): Authenticated user.
+        user (AADUserModel): Authenticated user.
     Raises:
         InvalidAuth: In the case that user does not have required role. Causes 401 error later.
     Returns:
         AADUserModel: Details about user.
     """
     if AADUserRoles.researcher in user.roles or AADUserRoles.data_manager in user.roles:
-        return AADUserModel(**user.model_dump())
+        return user
     raise InvalidAuth('user must have Researcher or DataManager role')
 
 
 async def validator_is_researcher(
-    user: User = Depends(AAD_CODE_BEARER)
+    user: AADUserModel = Depends(AAD_CODE_BEARER)
 ) -> AADUserModel:
     """Check if the user has a Researcher role.
     Args:
-        user (User): Authenticated user.
+        user (AADUserModel): Authenticated user.
     Raises:
         InvalidAuth: In the case that user does not have required role. Causes 401 error later.
     Returns:
         AADUserModel: Details about user.
     """
     if AADUserRoles.researcher in user.roles:
-        return AADUserModel(**user.model_dump())
+        return user
     raise InvalidAuth('user must have Researcher role')
 
 
 async def validator_is_data_manager(
-    user: User = Depends(AAD_CODE_BEARER)
+    user: AADUserModel = Depends(AAD_CODE_BEARER)
 ) -> AADUserModel:
     """Check if the user has a DataManager role.
     Args:
-        user (User): Authenticated user.
+        user (AADUserModel): Authenticated user.
     Raises:
         InvalidAuth: In the case that user does not have required role. Causes 401 error later.
     Returns:
         AADUserModel: Details about user.
     """
     if AADUserRoles.data_manager in user.roles:
-        return AADUserModel(**user.model_dump())
+        return user
     raise InvalidAuth('user must have DataManager role')
 
 # ===========================
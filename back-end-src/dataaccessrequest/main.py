@@ -1,18 +1,66 @@
+import asyncio
+from contextlib import asynccontextmanager
+
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 
-from config import CONFIG, ENVIRONMENT
+from config import CONFIG, ENGINE, ENVIRONMENT
 from .routes.catalogue import catalogue_router
+from .routes.health import health_router
 from .routes.workspaces import workspaces_router
 from .routes.requests import requests_router
 from .routes.users import users_router
+from .utils.session_manager import DATABASE_EXECUTOR, warm_up_connection_pool
+from .utils.catalogue_snapshot import CATALOGUE_LOADER
+from .utils.request_estimate import refresh_stale_estimates
+from .utils.workspace_acl import WORKSPACE_ACL
+from .adf_pipeline.data_pipeline import ADF_CLIENT
+from .adf_pipeline.provisioning_jobs import PROVISIONING_WORKER
+from .adf_pipeline.run_status import RUN_STATUS_POLLER
 from . import __title__, __author__, __version__
 
 
+# ===================================
+#   Start-up and shut-down logic
+# ===================================
+@asynccontextmanager
+async def lifespan(_service: FastAPI):
+    """Pre-open database connections, refresh stale estimates of requests, load the workspace
+    visibility, start checking it and the catalogue artifact for changes, submitting
+    provisioning jobs and checking pipeline runs on start-up, stop them (waiting for jobs
+    being submitted) and release the connections (database and ADF) on shut-down"""
+    await warm_up_connection_pool()
+    estimates_refresh = asyncio.create_task(refresh_stale_estimates(CATALOGUE_LOADER.snapshot))
+    acl_watcher = asyncio.create_task(WORKSPACE_ACL.watch(CONFIG.ACL_RELOAD_INTERVAL))
+    catalogue_watcher = None
+    if CONFIG.CATALOGUE_ARTIFACT_PATH and CONFIG.CATALOGUE_RELOAD_INTERVAL > 0:
+        catalogue_watcher = asyncio.create_task(
+            CATALOGUE_LOADER.watch(CONFIG.CATALOGUE_RELOAD_INTERVAL)
+        )
+    provisioning_worker = asyncio.create_task(PROVISIONING_WORKER.run())
+    run_status_poller = None
+    if CONFIG.ADF_RUN_POLL_INTERVAL > 0:
+        run_status_poller = asyncio.create_task(RUN_STATUS_POLLER.run())
+    yield
+    background_tasks = [
+        _task for _task in (estimates_refresh, acl_watcher, run_status_poller,
+                            catalogue_watcher, provisioning_worker)
+        if _task is not None
+    ]
+    for _task in background_tasks:
+        _task.cancel()
+    # The tasks have to stop before the executor and connections they use are closed
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    await PROVISIONING_WORKER.drain()
+    DATABASE_EXECUTOR.shutdown()
+    ENGINE.dispose()
+    ADF_CLIENT.close()
+
+
 # ===================================
 #         Main web service
 # ===================================
-service = FastAPI()
+service = FastAPI(lifespan=lifespan)
 
 # ===================================
 #          CORS headers
@@ -47,3 +95,5 @@ service.include_router(workspaces_router)
 service.include_router(requests_router)
 # Register routes for users
 service.include_router(users_router)
+# Register routes for health checks
+service.include_router(health_router)
@@ -0,0 +1,62 @@
+from datetime import datetime
+from enum import StrEnum
+
+from pydantic import BaseModel
+
+
+class CatalogueSearchMode(StrEnum):
+    """Modes of the catalogue search"""
+    # Tables containing all words of the search (the whole catalogue entries are returned)
+    substring = "substring"
+    # Best scoring tables first, with only the matching columns
+    ranked = "ranked"
+    # Tables and columns with names similar to the search (tolerates typos)
+    fuzzy = "fuzzy"
+
+
+class CatalogueColumnModel(BaseModel):
+    """Single column of the table in catalogue"""
+    description: str
+    is_free_text: bool
+    is_identifiable: bool
+    is_client_id: bool
+    is_date_time: bool
+    is_date: bool
+    is_nullable: bool
+    data_type: str
+
+
+class CatalogueSearchHitModel(BaseModel):
+    """Table matching the search"""
+    table_name: str
+    table_description: str | None
+    number_of_rows: int
+    table_classification: str
+    # Relevance of the table: in the ranked mode, matches in table name weight more than
+    #   in columns; in the fuzzy mode, the best similarity (0 to 1) of table or column name
+    score: int | float
+    # Only the columns whose name or description matches the search
+    matched_columns: dict[str, CatalogueColumnModel]
+
+
+class CatalogueFacetCountsModel(BaseModel):
+    """Numbers of tables per facet value"""
+    # Number of all matching tables
+    total: int
+    # Facet (e.g. data_type) -> value (e.g. "int", or "true"/"false" for column flags)
+    #   -> number of matching tables with the value
+    facets: dict[str, dict[str, int]]
+
+
+class CatalogueSearchResultsModel(CatalogueFacetCountsModel):
+    """One page of the search results, ordered by the score (with facet counts of all
+    matching tables)"""
+    hits: list[CatalogueSearchHitModel]
+
+
+class CatalogueVersionModel(BaseModel):
+    """Version of the active catalogue"""
+    # Hash of the catalogue content
+    version: str
+    loaded_at: datetime
+    number_of_tables: int
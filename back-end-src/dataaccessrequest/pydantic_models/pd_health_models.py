@@ -0,0 +1,21 @@
+from pydantic import BaseModel
+
+
+class DatabasePoolHealthModel(BaseModel):
+    """State of the database connection pool of this worker"""
+    # Number of persistent connections
+    pool_size: int
+    # Number of additional connections that can be opened on peak
+    max_overflow: int
+    # Connections currently used by requests
+    connections_in_use: int
+    # Opened connections waiting in the pool
+    connections_idle: int
+    # Additional (over the pool size) connections currently opened
+    overflow: int
+    # Number of checkouts since start and how many of them timed out
+    checkouts: int
+    checkout_timeouts: int
+    # Time spent waiting for a connection (including login of new connections)
+    checkout_wait_avg_ms: float
+    checkout_wait_max_ms: float
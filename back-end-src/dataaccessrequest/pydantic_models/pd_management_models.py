@@ -16,6 +16,12 @@ class UsersPerWorkspace(BaseModel):
     available_workspaces: list[UUID]
 
 
+class WorkspaceVisibilityChangeModel(BaseModel):
+    """Users to add to (and remove from) the visibility of one workspace"""
+    add_users: list[UUID] = []
+    remove_users: list[UUID] = []
+
+
 class WorkspaceWithUsersModel(WorkspaceModel):
     """Define workspace with a field that defines users that can see it (visibility)"""
     visible_for_users: list[UUID]
@@ -2,7 +2,7 @@ from uuid import UUID
 from enum import StrEnum
 from datetime import datetime
 
-from pydantic import BaseModel, ConfigDict
+from pydantic import BaseModel, ConfigDict, Json
 
 
 class RequestStatusOptions(StrEnum):
@@ -12,6 +12,14 @@ class RequestStatusOptions(StrEnum):
     rejected = "rejected"
 
 
+class ProvisioningJobStatus(StrEnum):
+    """Statuses of the job running the ADF pipeline for DAR"""
+    queued = "queued"
+    running = "running"
+    succeeded = "succeeded"
+    failed = "failed"
+
+
 class WorkspaceModel(BaseModel):
     """Provides info about concrete workspace"""
     # UUID of workspace where data should be provided
@@ -76,6 +84,27 @@ class SystemSpecificFieldsMixin(BaseModel):
 class RequestListModel(RequestBasicModel, SystemSpecificFieldsMixin):
     """Basic model for Data Access Request list (aka DAR)"""
     creator: UserModel
+    # State of the Dataset Provisioning pipeline run in ADF (None until submitted), e.g.
+    #   Queued, InProgress, Succeeded, Failed, Cancelled, and its duration once finished
+    adf_run_status: str | None = None
+    adf_run_duration_ms: int | None = None
+    # Estimated number of rows and bytes provisioned (None until estimated)
+    estimated_rows: int | None = None
+    estimated_bytes: int | None = None
+
+
+class RequestListPageModel(BaseModel):
+    """One page of the Data Access Request list (keyset pagination)"""
+    # Requests on this page
+    items: list[RequestListModel]
+    # Opaque cursor for the next page (None when this is the last page)
+    next_cursor: str | None
+
+
+class RequestListSortOrder(StrEnum):
+    """Sort order of the request list (by created_on, then request_uuid)"""
+    newest_first = "newest_first"
+    oldest_first = "oldest_first"
 
 
 class RequestInsertModel(RequestBasicModel):
@@ -95,6 +124,8 @@ class RequestDetailModel(RequestListModel, RequestInsertModel):
     reviewer: UserModel | None
     reviewed_on: datetime | None
     adf_link: str | None
+    # Message of the failed pipeline run
+    adf_run_error: str | None
 
 
 class RequestSendReviewerDecision(BaseModel):
@@ -111,9 +142,34 @@ class RequestSendReviewerDecision(BaseModel):
     reviewer_decision: str
 
 
-class RequestADFCommitModel(BaseModel):
-    """Returns Azure Data Factory link for commited ADF pipeline for dataset provisioning."""
-    # UUID of the request (PK) that is the subject of decision
+class PipelineRunModel(BaseModel):
+    """Pipeline run submitted by the provisioning job for a group of tables of the DAR."""
+    # Identifier of the run in Azure Data Factory (PK)
+    run_id: str
+    # Order of the group within the job and its tables (with their total number of rows)
+    group_number: int
+    table_names: Json[list[str]]
+    number_of_rows: int
+    # State of the run in ADF (updated periodically)
+    status: str
+    duration_ms: int | None
+    error: str | None
+
+
+class ProvisioningJobModel(BaseModel):
+    """Job running the Azure Data Factory pipeline for dataset provisioning of the DAR."""
+    # UUID of the job (PK)
+    job_uuid: UUID
+    # UUID of the request that is provisioned
     request_uuid: UUID
-    # Link to the Azure Data Factory pipeline
-    adf_link: str
+    # State of the job (and number of submissions tried so far)
+    status: ProvisioningJobStatus
+    attempts: int
+    created_on: datetime
+    updated_on: datetime
+    # Link to the Azure Data Factory pipeline (once submitted)
+    adf_link: str | None
+    # Reason of the last failed submission
+    error: str | None
+    # Pipeline runs submitted so far (more than one if the request was split)
+    runs: list[PipelineRunModel]
@@ -1,22 +1,249 @@
-from fastapi import APIRouter, Depends
+from fastapi import APIRouter, Depends, HTTPException, Query, Request
 
-from riocatalogue.catalogue import CATALOGUE
-from riocatalogue.catalogue_search import CATALOGUE_SEARCH
+from riocatalogue.catalogue_index import (
+    DEFAULT_SIMILARITY_THRESHOLD,
+    bitmap_to_ids,
+    ids_to_bitmap,
+)
+from riocatalogue.create_catalogue import TABLE_FIELDS, TABLE_SUMMARY_FIELDS
 from ..pydantic_models.pd_aad_auth_models import AADUserModel
-from ..authentication.role_validators import validator_is_researcher_or_data_manager
+from ..pydantic_models.pd_catalogue_models import (
+    CatalogueSearchMode,
+    CatalogueSearchResultsModel,
+    CatalogueFacetCountsModel,
+    CatalogueVersionModel,
+)
+from ..authentication.role_validators import (
+    validator_is_researcher_or_data_manager,
+    validator_is_data_manager,
+)
+from ..utils.catalogue_snapshot import CATALOGUE_LOADER, CatalogueSnapshot, active_catalogue
 
 catalogue_router = APIRouter()
 
 
+def _search_hits(catalogue: CatalogueSnapshot,
+                 ranked_tables: list[tuple[str, int | float, list[int]]]) -> list[dict]:
+    """Create hits of the search from the ranked tables (only with matching columns).
+    Args:
+        catalogue (CatalogueSnapshot): Catalogue of the request.
+        ranked_tables (list[tuple[str, int | float, list[int]]]): Table names, scores and
+            positions of matching columns.
+    Returns:
+        list[dict]: Hits in the shape of CatalogueSearchHitModel.
+    """
+    hits = []
+    for _table, _score, _column_positions in ranked_tables:
+        table_entry = catalogue.catalogue[_table]
+        column_names = list(table_entry["columns"].keys())
+        hits.append({
+            "table_name": _table,
+            "table_description": table_entry.get("table_description"),
+            "number_of_rows": table_entry["number_of_rows"],
+            "table_classification": table_entry["table_classification"],
+            "score": _score,
+            "matched_columns": {
+                column_names[_position]: table_entry["columns"][column_names[_position]]
+                for _position in _column_positions
+            },
+        })
+    return hits
+
+
+def facet_filter(is_identifiable: bool | None = None,
+                 is_client_id: bool | None = None,
+                 is_free_text: bool | None = None,
+                 is_date_time: bool | None = None,
+                 data_type: list[str] = Query(default=[]),
+                 table_classification: list[str] = Query(default=[]),
+                 min_rows: int | None = Query(default=None, ge=0),
+                 max_rows: int | None = Query(default=None, ge=0),
+                 catalogue: CatalogueSnapshot = Depends(active_catalogue)) -> int | None:
+    """Dependency selecting tables by facets (all given facets must match):
+        - is_identifiable, is_client_id, is_free_text, is_date_time: true for tables having
+            any column with the flag, false for tables without such columns,
+        - data_type, table_classification: any of the (repeated) values,
+        - min_rows, max_rows: range of the number of rows (inclusive).
+    Returns:
+        int | None: Bitmap of selected tables, None if nothing is filtered.
+    """
+    return catalogue.facets.filter(
+        flags={
+            "is_identifiable": is_identifiable,
+            "is_client_id": is_client_id,
+            "is_free_text": is_free_text,
+            "is_date_time": is_date_time,
+        },
+        data_types=data_type,
+        classifications=table_classification,
+        min_rows=min_rows,
+        max_rows=max_rows,
+    )
+
+
+def _search_results(catalogue: CatalogueSnapshot, table_ids: list[int],
+                    ranked_tables: list[tuple[str, int | float, list[int]]]) -> dict:
+    """Create the page of search results with facet counts of all matching tables."""
+    return {
+        "total": len(table_ids),
+        "hits": _search_hits(catalogue, ranked_tables),
+        "facets": catalogue.facets.counts(ids_to_bitmap(table_ids, len(catalogue.catalogue))),
+    }
+
+
 @catalogue_router.get("/catalogue")
-async def get_catalogue(search: str | None = None,
+async def get_catalogue(request: Request,
+                        search: str | None = None,
+                        mode: CatalogueSearchMode = CatalogueSearchMode.substring,
+                        limit: int = Query(default=20, ge=1, le=500),
+                        offset: int = Query(default=0, ge=0),
+                        similarity: float = Query(default=DEFAULT_SIMILARITY_THRESHOLD,
+                                                  gt=0.0, le=1.0),
+                        selected_tables: int | None = Depends(facet_filter),
+                        catalogue: CatalogueSnapshot = Depends(active_catalogue),
                         user: AADUserModel = Depends(validator_is_researcher_or_data_manager)):
-    """Return user catalogue (GET) with a possibility for full text search filter."""
+    """Return user catalogue (GET) with a possibility for full text search filter.
+    In the ranked and fuzzy modes, only one page (limit, offset) of the best scoring tables
+    is returned, each with just the matching columns, and counts of all matching tables per
+    facet value. The fuzzy mode matches table and column names with at least the given
+    similarity to the search. Facet filters (see facet_filter) apply to all modes.
+    The whole catalogue (without search) is sent pre-compressed, 304 if the client has it."""
+    table_ids = None if selected_tables is None else set(bitmap_to_ids(selected_tables))
     if search:
-        search_lower = search.lower()
-        matching_tables = set()
-        for _table, _search_str in CATALOGUE_SEARCH.items():
-            if search_lower in _search_str:
-                matching_tables.add(_table)
-        return {_k: _v for _k, _v in CATALOGUE.items() if _k in matching_tables}
-    return CATALOGUE
+        if mode == CatalogueSearchMode.ranked:
+            return CatalogueSearchResultsModel(**_search_results(
+                catalogue, *catalogue.search_index.rank(search, limit, offset, table_ids)
+            ))
+        if mode == CatalogueSearchMode.fuzzy:
+            return CatalogueSearchResultsModel(**_search_results(
+                catalogue,
+                *catalogue.fuzzy_index.rank(search, similarity, limit, offset, table_ids)
+            ))
+        # Tables containing all words of the search (resolved by the inverted index)
+        matching_tables = catalogue.search_index.search(search, table_ids)
+        return {_table: catalogue.catalogue[_table] for _table in matching_tables}
+    if table_ids is not None:
+        return {
+            _table: catalogue.catalogue[_table]
+            for _table in catalogue.facets.table_names_of(selected_tables)
+        }
+    return catalogue.catalogue_response.response(request)
+
+
+@catalogue_router.get("/catalogue/facets")
+async def get_catalogue_facets(search: str | None = None,
+                               selected_tables: int | None = Depends(facet_filter),
+                               catalogue: CatalogueSnapshot = Depends(active_catalogue),
+                               user: AADUserModel = Depends(
+                                   validator_is_researcher_or_data_manager
+                               )) -> CatalogueFacetCountsModel:
+    """Count tables matching the search (as in the substring mode) and facet filters,
+    per each facet value."""
+    if search:
+        table_ids = None if selected_tables is None else set(bitmap_to_ids(selected_tables))
+        selected_tables = ids_to_bitmap(
+            catalogue.search_index.search_ids(search, table_ids), len(catalogue.catalogue)
+        )
+    elif selected_tables is None:
+        selected_tables = catalogue.facets.all_tables
+    return {
+        "total": selected_tables.bit_count(),
+        "facets": catalogue.facets.counts(selected_tables),
+    }
+
+
+def _parse_fields(fields: str | None, default_fields: tuple[str, ...]) -> tuple[str, ...]:
+    """Parse the comma separated list of requested table fields.
+    Args:
+        fields (str | None): Value of the fields parameter.
+        default_fields (tuple[str, ...]): Fields returned when nothing is requested.
+    Raises:
+        HTTPException: 400 error for unknown fields.
+    Returns:
+        tuple[str, ...]: Requested fields.
+    """
+    if not fields:
+        return default_fields
+    requested_fields = tuple(_field.strip() for _field in fields.split(",") if _field.strip())
+    unknown_fields = set(requested_fields) - set(TABLE_FIELDS)
+    if unknown_fields:
+        raise HTTPException(status_code=400,
+                            detail=f"unknown fields: {', '.join(sorted(unknown_fields))}")
+    return requested_fields
+
+
+def _project_table(catalogue: CatalogueSnapshot, table_name: str,
+                   fields: tuple[str, ...]) -> dict:
+    """Select only the requested fields of the table (its name is always included)."""
+    table_entry = catalogue.catalogue[table_name]
+    return {"table_name": table_name} | {_field: table_entry.get(_field) for _field in fields}
+
+
+@catalogue_router.get("/catalogue/tables")
+async def get_catalogue_tables(request: Request,
+                               fields: str | None = None,
+                               selected_tables: int | None = Depends(facet_filter),
+                               catalogue: CatalogueSnapshot = Depends(active_catalogue),
+                               user: AADUserModel = Depends(
+                                   validator_is_researcher_or_data_manager
+                               )):
+    """Return the list of tables without columns (name, description, number of rows and
+    classification). Use fields (comma separated) to select other table fields and facet
+    filters (see facet_filter) to select tables."""
+    selected_fields = _parse_fields(fields, TABLE_SUMMARY_FIELDS)
+    if selected_tables is not None:
+        return [
+            _project_table(catalogue, _table, selected_fields)
+            for _table in catalogue.facets.table_names_of(selected_tables)
+        ]
+    if selected_fields == TABLE_SUMMARY_FIELDS:
+        return catalogue.table_summaries_response.response(request)
+    return [
+        _project_table(catalogue, _table, selected_fields)
+        for _table in catalogue.catalogue.keys()
+    ]
+
+
+@catalogue_router.get("/catalogue/tables/{table_name}")
+async def get_catalogue_table(table_name: str,
+                              fields: str | None = None,
+                              catalogue: CatalogueSnapshot = Depends(active_catalogue),
+                              user: AADUserModel = Depends(
+                                  validator_is_researcher_or_data_manager
+                              )):
+    """Return the table from catalogue (all fields including columns by default)."""
+    if table_name not in catalogue.catalogue:
+        raise HTTPException(status_code=404, detail="not found")
+    return _project_table(catalogue, table_name, _parse_fields(fields, TABLE_FIELDS))
+
+
+def _catalogue_version(catalogue: CatalogueSnapshot) -> dict:
+    """Describe the version of the catalogue (in the shape of CatalogueVersionModel)."""
+    return {
+        "version": catalogue.version,
+        "loaded_at": catalogue.loaded_at,
+        "number_of_tables": len(catalogue.catalogue),
+    }
+
+
+@catalogue_router.get("/catalogue/version")
+async def get_catalogue_version(catalogue: CatalogueSnapshot = Depends(active_catalogue),
+                                user: AADUserModel = Depends(
+                                    validator_is_researcher_or_data_manager
+                                )) -> CatalogueVersionModel:
+    """Return the version (content hash) of the active catalogue, clients can drop anything
+    cached from the catalogue when it changes."""
+    return _catalogue_version(catalogue)
+
+
+@catalogue_router.post("/catalogue/reload")
+async def reload_catalogue(user: AADUserModel = Depends(validator_is_data_manager)
+                           ) -> CatalogueVersionModel:
+    """Load the catalogue artifact again (DataManager only) without restarting the service.
+    Only the worker process handling the request is reloaded, others pick the new version
+    up on their periodic check (see CATALOGUE_RELOAD_INTERVAL)."""
+    try:
+        await CATALOGUE_LOADER.reload(force=True)
+    except (OSError, ValueError) as error:
+        raise HTTPException(status_code=500, detail=f"catalogue cannot be loaded: {error}")
+    return _catalogue_version(CATALOGUE_LOADER.snapshot)
@@ -0,0 +1,12 @@
+from fastapi import APIRouter
+
+from config import ENGINE
+from ..pydantic_models.pd_health_models import DatabasePoolHealthModel
+
+health_router = APIRouter()
+
+
+@health_router.get("/health/db")
+async def get_health_db() -> DatabasePoolHealthModel:
+    """Return the state of the database connection pool (for monitoring, no authentication)."""
+    return ENGINE.pool.statistics()
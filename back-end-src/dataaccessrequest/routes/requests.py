@@ -2,180 +2,316 @@ import datetime
 import uuid
 from typing import Any
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query
 from fastapi import status as HTTPStatusCode
 
 import sqlalchemy
+from sqlalchemy.orm import Session, joinedload, load_only, selectinload
 
 from ..pydantic_models.pd_models import (
     RequestDetailModel,
     RequestListModel,
+    RequestListPageModel,
+    RequestListSortOrder,
     RequestInsertModel,
     RequestSendReviewerDecision,
-    RequestADFCommitModel,
     RequestStatusOptions,
+    ProvisioningJobModel,
+    ProvisioningJobStatus,
 )
 from ..sql_models.db_models import (
     DataAccessRequest,
     DataAccessRequestTables,
     DataAccessRequestColumns,
-    DataAccessRequestWorkspaceVisibility,
-    DataAccessRequestUser,
+    DataAccessRequestProvisioningJob,
 )
 from ..utils.session_manager import SessionManager
+from ..utils.data_access import (
+    select_one_or_404,
+    update_or_404,
+    delete_or_404,
+    row_exists,
+    register_user_if_missing,
+)
+from ..utils.pagination import encode_keyset_cursor, decode_keyset_cursor
+from ..utils.catalogue_snapshot import CatalogueSnapshot, active_catalogue
+from ..utils.workspace_acl import WorkspaceAclIndex, workspace_acl
+from ..utils.request_estimate import (
+    estimate_request_size,
+    requested_tables_of,
+    store_request_estimates,
+)
 from ..pydantic_models.pd_aad_auth_models import AADUserModel
 from ..authentication.role_validators import (
     validator_is_researcher_or_data_manager,
     validator_is_data_manager,
 )
-from ..adf_pipeline.data_pipeline import run_data_pipeline
+from ..adf_pipeline.provisioning_jobs import PROVISIONING_WORKER
 
 requests_router = APIRouter()
 
+# Loading strategies of the request graph (relationships are never loaded implicitly):
+#   - the list loads only the fields of RequestListModel, joining the workspace and creator
+REQUEST_LIST_LOADING = (
+    load_only(
+        DataAccessRequest.request_uuid,
+        DataAccessRequest.title,
+        DataAccessRequest.status,
+        DataAccessRequest.created_on,
+        DataAccessRequest.adf_run_status,
+        DataAccessRequest.adf_run_duration_ms,
+        DataAccessRequest.estimated_rows,
+        DataAccessRequest.estimated_bytes,
+    ),
+    joinedload(DataAccessRequest.workspace),
+    joinedload(DataAccessRequest.creator),
+)
+#   - the detail loads everything, the nested tables and columns in one query per level
+REQUEST_DETAIL_LOADING = (
+    joinedload(DataAccessRequest.workspace),
+    joinedload(DataAccessRequest.creator),
+    joinedload(DataAccessRequest.reviewer),
+    selectinload(
+        DataAccessRequest.tables_and_columns
+    ).selectinload(
+        DataAccessRequestTables.columns
+    ),
+)
+#   - the provisioning job loads its pipeline runs by one more query
+PROVISIONING_JOB_LOADING = (
+    selectinload(DataAccessRequestProvisioningJob.runs),
+)
+
+
+def _select_requests_page(
+    session: Session,
+    user: AADUserModel,
+    filters: list[sqlalchemy.ColumnElement[bool]],
+    cursor: str | None,
+    limit: int,
+    sort_order: RequestListSortOrder,
+) -> dict[str, Any]:
+    """Select one page of requests visible for the user, ordered by (created_on, request_uuid)
+    and starting after the cursor (runs in the database thread pool)."""
+    query = session.query(DataAccessRequest).options(*REQUEST_LIST_LOADING).filter(*filters)
+    if not user.is_data_manager:
+        # Researcher can only see requests where the researcher is creator
+        query = query.filter(DataAccessRequest.creator_uuid == user.user_uuid)
+
+    # Keyset pagination: continue strictly after the last row of the previous page
+    newest_first = sort_order == RequestListSortOrder.newest_first
+    if cursor is not None:
+        _created_on, _request_uuid = decode_keyset_cursor(cursor, 2)
+        try:
+            cursor_created_on = datetime.datetime.fromisoformat(_created_on)
+            cursor_request_uuid = uuid.UUID(_request_uuid)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="invalid cursor")
+        if newest_first:
+            query = query.filter(sqlalchemy.or_(
+                DataAccessRequest.created_on < cursor_created_on,
+                sqlalchemy.and_(
+                    DataAccessRequest.created_on == cursor_created_on,
+                    DataAccessRequest.request_uuid < cursor_request_uuid,
+                )
+            ))
+        else:
+            query = query.filter(sqlalchemy.or_(
+                DataAccessRequest.created_on > cursor_created_on,
+                sqlalchemy.and_(
+                    DataAccessRequest.created_on == cursor_created_on,
+                    DataAccessRequest.request_uuid > cursor_request_uuid,
+                )
+            ))
+    if newest_first:
+        query = query.order_by(
+            DataAccessRequest.created_on.desc(), DataAccessRequest.request_uuid.desc()
+        )
+    else:
+        query = query.order_by(
+            DataAccessRequest.created_on.asc(), DataAccessRequest.request_uuid.asc()
+        )
+
+    # One extra row tells whether there is a next page
+    selected_requests = query.limit(limit + 1).all()
+    next_cursor = None
+    if len(selected_requests) > limit:
+        selected_requests = selected_requests[:limit]
+        next_cursor = encode_keyset_cursor(
+            selected_requests[-1].created_on.isoformat(), selected_requests[-1].request_uuid
+        )
+    return {
+        "items": selected_requests,
+        "next_cursor": next_cursor,
+    }
+
 
 @requests_router.get("/requests")
 async def get_requests(
+    cursor: str | None = None,
+    limit: int = Query(default=50, ge=1, le=500),
+    status: RequestStatusOptions | None = None,
+    workspace_uuid: uuid.UUID | None = None,
+    creator_uuid: uuid.UUID | None = None,
+    created_from: datetime.datetime | None = None,
+    created_to: datetime.datetime | None = None,
+    sort_order: RequestListSortOrder = RequestListSortOrder.newest_first,
     user: AADUserModel = Depends(validator_is_researcher_or_data_manager)
-) -> list[RequestListModel]:
-    with SessionManager() as session:
-        if user.is_data_manager:
-            # Data manager can see all requests
-            return session.query(DataAccessRequest).all()
-        elif user.is_researcher:
-            # Researcher can only see requests where the researcher is creator
-            return session.query(DataAccessRequest).filter(
-                DataAccessRequest.creator_uuid == user.user_uuid
-            ).all()
-        # no more options
+) -> RequestListPageModel:
+    """Return one page of requests (data managers see all, researchers only their own).
+    Use the returned next_cursor (with the same filters) to get the following page."""
+    filters = []
+    if status is not None:
+        filters.append(DataAccessRequest.status == str(status))
+    if workspace_uuid is not None:
+        filters.append(DataAccessRequest.workspace_uuid == workspace_uuid)
+    if creator_uuid is not None:
+        filters.append(DataAccessRequest.creator_uuid == creator_uuid)
+    if created_from is not None:
+        filters.append(DataAccessRequest.created_on >= created_from)
+    if created_to is not None:
+        filters.append(DataAccessRequest.created_on < created_to)
+    return await SessionManager.run_sync(
+        _select_requests_page, user, filters, cursor, limit, sort_order
+    )
+
+
+def _select_request(
+    session: Session, request_uuid: uuid.UUID, user: AADUserModel
+) -> DataAccessRequest:
+    """Select the request if the user can see it (runs in the database thread pool)."""
+    query = session.query(DataAccessRequest).options(
+        *REQUEST_DETAIL_LOADING
+    ).filter(
+        DataAccessRequest.request_uuid == request_uuid
+    )
+    if not user.is_data_manager:
+        # Researcher can only see requests where the researcher is creator
+        query = query.filter(DataAccessRequest.creator_uuid == user.user_uuid)
+    # Find and return the item, raise error if nothing is found
+    selected_request = select_one_or_404(query)
+    if not user.is_data_manager:
+        # Remove info about Azure Data Factory link and errors (as it is only for Data
+        #   Managers).
+        selected_request.adf_link = None
+        selected_request.adf_run_error = None
+
+    return selected_request
 
 
 @requests_router.get("/request")
 async def get_request(
     request_uuid: uuid.UUID,
-    user: AADUserModel = Depends(validator_is_researcher_or_data_manager)
+    user: AADUserModel = Depends(validator_is_researcher_or_data_manager),
+    catalogue: CatalogueSnapshot = Depends(active_catalogue)
 ) -> RequestDetailModel:
-    with SessionManager() as session:
-        if user.is_data_manager:
-            # Raise error if nothing is found
-            if session.query(DataAccessRequest).filter(
-                DataAccessRequest.request_uuid == request_uuid
-            ).count() < 1:
-                raise HTTPException(status_code=404, detail="not found")
-            # Find and return the item if exits
-            selected_request = session.query(DataAccessRequest).filter(
-                DataAccessRequest.request_uuid == request_uuid
-            ).first()
-        elif user.is_researcher:
-            # Raise error if nothing is found
-            if session.query(DataAccessRequest).filter(
-                    DataAccessRequest.request_uuid == request_uuid,
-                    DataAccessRequest.creator_uuid == user.user_uuid
-            ).count() < 1:
-                raise HTTPException(status_code=404, detail="not found")
-            # Find and return the item if exits
-            selected_request = session.query(DataAccessRequest).filter(
-                DataAccessRequest.request_uuid == request_uuid,
-                DataAccessRequest.creator_uuid == user.user_uuid
-            ).first()
-            # Remove info about Azure Data Factory link (as it is only for Data Managers).
-            selected_request.adf_link = None
-
-        return selected_request
+    selected_request = await SessionManager.run_sync(_select_request, request_uuid, user)
+    if selected_request.estimate_version != catalogue.version:
+        # The cached estimate was computed from another version of the catalogue
+        estimate = estimate_request_size(
+            requested_tables_of(selected_request), catalogue.catalogue
+        )
+        await SessionManager.run_sync(
+            store_request_estimates, [(selected_request.request_uuid, estimate)],
+            catalogue.version
+        )
+        selected_request.estimated_rows, selected_request.estimated_bytes = estimate
+    return selected_request
+
+
+def _insert_request(session: Session, request: RequestInsertModel, user: AADUserModel,
+                    catalogue: CatalogueSnapshot) -> None:
+    """Insert the new data access request (runs in the database thread pool)."""
+    # Check if the Data Manager is registered as a user and create a DM entry in system
+    if user.is_data_manager:
+        register_user_if_missing(session, user)
+    # Create a new DAR UUID for the new DAR
+    request_uuid = uuid.uuid4()
+    # 1) Insert DAR
+    dump_dar = request.model_dump()
+    # remove nested values for tables and columns
+    del dump_dar["tables_and_columns"]
+
+    # Re-format workspace
+    workspace_uuid = dump_dar['workspace']['workspace_uuid']
+    del dump_dar['workspace']
+    dump_dar['workspace_uuid'] = workspace_uuid
+
+    # Use NULL value for the adf_link entity
+    dump_dar['creator_uuid'] = None
+
+    # Add info about the creator user
+    dump_dar['creator_uuid'] = user.user_uuid
+
+    # Add info about Request UUID:
+    dump_dar['request_uuid'] = request_uuid
+
+    # Estimate the size of the request (cached with the version of the catalogue)
+    dump_dar['estimated_rows'], dump_dar['estimated_bytes'] = estimate_request_size(
+        requested_tables_of(request), catalogue.catalogue
+    )
+    dump_dar['estimate_version'] = catalogue.version
+
+    # Insert new DataAccessRequest
+    session.execute(sqlalchemy.insert(DataAccessRequest).values(**dump_dar))
+
+    # 2) Insert requested tables
+    dump_tables = request.model_dump()['tables_and_columns']
+    # Rows of DataAccessRequestTables and DataAccessRequestColumns (as plain dictionaries)
+    dar_tables_rows = []
+    dar_columns_rows = []
+    for _dump_table in dump_tables:
+        dar_columns = _dump_table.pop("columns")
+        # Generate the new UUID for the table
+        dar_table_uuid = uuid.uuid4()
+        dar_tables_rows.append(
+            _dump_table | {"request_uuid": request_uuid, "dar_tables_uuid": dar_table_uuid}
+        )
+        # 3) Prepare requested columns of the table
+        for dar_column in dar_columns:
+            dar_columns_rows.append(
+                dar_column | {"dar_tables_uuid": dar_table_uuid, "dar_columns_uuid": uuid.uuid4()}
+            )
+    # Insert new tables and columns, each by a single executemany (with fast_executemany
+    #   on the engine, all rows are sent to SQL Server in one batch)
+    if dar_tables_rows:
+        session.execute(sqlalchemy.insert(DataAccessRequestTables), dar_tables_rows)
+    if dar_columns_rows:
+        session.execute(sqlalchemy.insert(DataAccessRequestColumns), dar_columns_rows)
+
+    # Everything (including the user registration) is committed in one transaction
+    session.commit()
 
 
 @requests_router.post("/request")
 async def post_request(
     request: RequestInsertModel,
-    user: AADUserModel = Depends(validator_is_researcher_or_data_manager)
+    user: AADUserModel = Depends(validator_is_researcher_or_data_manager),
+    catalogue: CatalogueSnapshot = Depends(active_catalogue),
+    acl: WorkspaceAclIndex = Depends(workspace_acl)
 ) -> RequestInsertModel:
     """Insert the new data access request"""
-    with SessionManager() as session:
-        # Check if the Data Manager is registered as a user and create a DM entry in system
-        if user.is_data_manager and session.query(DataAccessRequestUser).filter(
-                DataAccessRequestUser.user_uuid == user.user_uuid
-        ).count() < 1:
-            # If needed, create a new entry for the data manager as a user in the system
-            session.add(DataAccessRequestUser(
-                user_uuid=user.user_uuid,
-                user_full_name=user.user_full_name,
-                user_username=user.user_username,
-            ))
-            session.commit()
-        # Verify if the user has a permission on the workspace level
-        if user.is_researcher and not user.is_data_manager:
-            if session.query(DataAccessRequestWorkspaceVisibility).filter(
-                    DataAccessRequestWorkspaceVisibility.user_uuid == user.user_uuid,
-                    DataAccessRequestWorkspaceVisibility.workspace_uuid ==
-                    request.workspace.workspace_uuid
-            ).count() < 1:
-                raise HTTPException(status_code=403, detail="forbidden")
-        # Create a new DAR UUID for the new DAR
-        request_uuid = uuid.uuid4()
-        # 1) Insert DAR
-        dump_dar = request.model_dump()
-        # remove nested values for tables and columns
-        del dump_dar["tables_and_columns"]
-
-        # Re-format workspace
-        workspace_uuid = dump_dar['workspace']['workspace_uuid']
-        del dump_dar['workspace']
-        dump_dar['workspace_uuid'] = workspace_uuid
-
-        # Use NULL value for the adf_link entity
-        dump_dar['creator_uuid'] = None
-
-        # Add info about the creator user
-        dump_dar['creator_uuid'] = user.user_uuid
-
-        # Add info about Request UUID:
-        dump_dar['request_uuid'] = request_uuid
-
-        # Insert new DataAccessRequest
-        session.add(DataAccessRequest(**dump_dar))
-        session.commit()
-
-        # 2) Insert requested tables
-        dump_tables = request.model_dump()['tables_and_columns']
-        # remove related columns and prepare fields of DataAccessRequestTables objects
-        dar_tables_orm = []
-        # Contains UUID generated for each table
-        dar_table_uuids = []
-        # The following contains lists of list of columns for each table
-        dar_columns_list = []
-        for _dump_table in dump_tables:
-            dar_columns_list.append(_dump_table["columns"])
-            del _dump_table["columns"]
-            # Generate the new UUID for the table
-            dar_table_uuid = uuid.uuid4()
-            dar_tables_orm.append(
-                DataAccessRequestTables(
-                    **_dump_table, request_uuid=request_uuid, dar_tables_uuid=dar_table_uuid
-                )
-            )
-            dar_table_uuids.append(dar_table_uuid)
-        # insert new DataAccessRequestTables tables
-        session.add_all(dar_tables_orm)
-        session.commit()
+    # Verify if the user has a permission on the workspace level
+    if user.is_researcher and not user.is_data_manager:
+        if not acl.can_view(user.user_uuid, request.workspace.workspace_uuid):
+            raise HTTPException(status_code=403, detail="forbidden")
+    await SessionManager.run_sync(_insert_request, request, user, catalogue)
 
-        # 3) Insert requested columns
-        # create the list of DataAccessRequestColumns objects to be inserted
-        dar_columns_orm = []
-        for table_index, dar_columns in enumerate(dar_columns_list):
-            for dar_column in dar_columns:
-                dar_columns_orm.append(
-                    DataAccessRequestColumns(
-                        **(dar_column | {
-                            "dar_tables_uuid": dar_table_uuids[table_index],
-                            "dar_columns_uuid": uuid.uuid4()
-                        })
-                    )
-                )
+    return request
 
-        # insert new DataAccessRequestColumns tables
-        session.add_all(dar_columns_orm)
-        session.commit()
 
-    return request
+def _delete_request(session: Session, request_uuid: uuid.UUID, user: AADUserModel) -> None:
+    """Delete the request if the user can see it (runs in the database thread pool)."""
+    statement = sqlalchemy.delete(DataAccessRequest).where(
+        DataAccessRequest.request_uuid == request_uuid
+    )
+    if not user.is_data_manager:
+        # Researcher can only delete requests where the researcher is creator
+        statement = statement.where(DataAccessRequest.creator_uuid == user.user_uuid)
+    # Raise error if nothing is found
+    # Note: everything should be delete by cascade
+    delete_or_404(session, statement)
+    session.commit()
 
 
 @requests_router.delete("/request")
@@ -184,28 +320,31 @@ async def delete_request(
     user: AADUserModel = Depends(validator_is_researcher_or_data_manager),
     status_code=HTTPStatusCode.HTTP_204_NO_CONTENT
 ):
-    with SessionManager() as session:
-        if user.is_data_manager:
-            # Raise error if nothing is found
-            if session.query(DataAccessRequest).filter(
-                DataAccessRequest.request_uuid == request_uuid
-            ).count() < 1:
-                raise HTTPException(status_code=404, detail="not found")
-        elif user.is_researcher:
-            # Raise error if nothing is found
-            if session.query(DataAccessRequest).filter(
-                    DataAccessRequest.request_uuid == request_uuid,
-                    DataAccessRequest.creator_uuid == user.user_uuid
-            ).count() < 1:
-                raise HTTPException(status_code=404, detail="not found")
-        # If everything is alright permission wise, perform the delete operation
-        session.execute(
-            sqlalchemy.delete(DataAccessRequest).where(
-                DataAccessRequest.request_uuid == request_uuid
-            )
-            # Note: everything should be delete by cascade
-        )
-        session.commit()
+    await SessionManager.run_sync(_delete_request, request_uuid, user)
+
+
+def _update_review(
+    session: Session, review_decision: RequestSendReviewerDecision, user: AADUserModel
+) -> None:
+    """Store the reviewer decision (runs in the database thread pool)."""
+    submitted_on = datetime.datetime.now().isoformat(' ')
+    # Check if the reviewer is registered as a user and create a DM entry in system
+    register_user_if_missing(session, user)
+    # Prepare the values to be updated
+    decision = review_decision.model_dump()
+    decision["reviewed_on"] = submitted_on
+    decision["reviewer_uuid"] = user.user_uuid
+    request_uuid = decision.pop("request_uuid")
+    # Perform update, raise error if nothing is found
+    update_or_404(
+        session,
+        sqlalchemy.update(
+            DataAccessRequest
+        ).where(
+            DataAccessRequest.request_uuid == request_uuid
+        ).values(**decision)
+    )
+    session.commit()
 
 
 @requests_router.put("/review-request")
@@ -215,81 +354,105 @@ async def review_request(
     status_code=HTTPStatusCode.HTTP_204_NO_CONTENT
 ):
     """Submits the reviewer decision on the request"""
-    submitted_on = datetime.datetime.now().isoformat(' ')
-    with SessionManager() as session:
-        # Check if the reviewer is registered as a user and create a DM entry in system
-        if session.query(DataAccessRequestUser).filter(
-                DataAccessRequestUser.user_uuid == user.user_uuid
-        ).count() < 1:
-            # If needed, create a new entry for the data manager as a user in the system
-            session.add(DataAccessRequestUser(
-                user_uuid=user.user_uuid,
-                user_full_name=user.user_full_name,
-                user_username=user.user_username,
-            ))
-            session.commit()
-        # Double check that user is DataManager
-        if not user.is_data_manager:
-            raise HTTPException(status_code=403, detail="not permitted")
-        # Prepare the values to be updated
-        decision = review_decision.model_dump()
-        decision["reviewed_on"] = submitted_on
-        decision["reviewer_uuid"] = user.user_uuid
-        request_uuid = decision.pop("request_uuid")
-        # Perform update
-        session.execute(
-            sqlalchemy.update(
-                DataAccessRequest
-            ).where(
-                DataAccessRequest.request_uuid == request_uuid
-            ).values(**decision)
+    # Double check that user is DataManager
+    if not user.is_data_manager:
+        raise HTTPException(status_code=403, detail="not permitted")
+    await SessionManager.run_sync(_update_review, review_decision, user)
+
+
+def _select_active_provisioning_job(
+    session: Session, request_uuid: uuid.UUID
+) -> DataAccessRequestProvisioningJob | None:
+    """Select the job of the request that is still queued or running (if any)."""
+    return session.query(DataAccessRequestProvisioningJob).options(
+        *PROVISIONING_JOB_LOADING
+    ).filter(
+        DataAccessRequestProvisioningJob.request_uuid == request_uuid,
+        DataAccessRequestProvisioningJob.status.in_(
+            [str(ProvisioningJobStatus.queued), str(ProvisioningJobStatus.running)]
         )
+    ).first()
+
+
+def _insert_provisioning_job(
+    session: Session, request_uuid: uuid.UUID
+) -> DataAccessRequestProvisioningJob:
+    """Create the provisioning job for the approved request, or return its job that is still
+    queued or running (runs in the database thread pool)."""
+    # Raise error if nothing is found or is not reviewed
+    if not row_exists(session.query(DataAccessRequest).filter(
+        DataAccessRequest.request_uuid == request_uuid,
+        DataAccessRequest.status == str(RequestStatusOptions.approved)
+    )):
+        raise HTTPException(status_code=404, detail="not found")
+    active_job = _select_active_provisioning_job(session, request_uuid)
+    if active_job is not None:
+        return active_job
+    now = datetime.datetime.now()
+    job = DataAccessRequestProvisioningJob(
+        job_uuid=str(uuid.uuid4()),
+        request_uuid=str(request_uuid),
+        status=str(ProvisioningJobStatus.queued),
+        attempts=0,
+        created_on=now,
+        updated_on=now,
+        next_attempt_on=now,
+    )
+    session.add(job)
+    try:
         session.commit()
+    except sqlalchemy.exc.IntegrityError:
+        # A concurrent call created the active job first (the unique index on active jobs
+        #   of the request)
+        session.rollback()
+        active_job = _select_active_provisioning_job(session, request_uuid)
+        if active_job is None:
+            raise
+        return active_job
+    return session.query(DataAccessRequestProvisioningJob).options(
+        *PROVISIONING_JOB_LOADING
+    ).filter(
+        DataAccessRequestProvisioningJob.job_uuid == job.job_uuid
+    ).one()
 
 
-@requests_router.put("/request-adf-commit")
+@requests_router.put("/request-adf-commit", status_code=HTTPStatusCode.HTTP_202_ACCEPTED)
 async def put_request_commit_adf(
     request_uuid: uuid.UUID,
     user: AADUserModel = Depends(validator_is_data_manager)
-) -> RequestADFCommitModel:
-    """This request commits the Azure Data Factory (aka ADF) and returns the ADF link."""
+) -> ProvisioningJobModel:
+    """This request queues the job committing the Azure Data Factory (aka ADF) pipeline and
+    returns it immediately, the ADF link is available from the job once it is submitted
+    (see GET /provisioning-job)."""
     # Double check that user is DataManager
     if not user.is_data_manager:
         raise HTTPException(status_code=403, detail="not permitted")
 
-    with SessionManager() as session:
-        # Find the related DAR
-        _dar = session.query(DataAccessRequest).filter(
-            DataAccessRequest.request_uuid == request_uuid,
-            DataAccessRequest.status == str(RequestStatusOptions.approved)
-        )
-        # Raise error if nothing is found or is not reviewed
-        if _dar.count() < 1:
-            raise HTTPException(status_code=404, detail="not found")
-        # Selects the DAR
-        _request = _dar.first()
-        # Select the related tables and columns
-        _requested_tables = _request.tables_and_columns
-        request_definition = {}
-        for _requested_table in _requested_tables:
-            _table_cols_req_def = {
-                "columns": [_col.column_name for _col in _requested_table.columns],
-                "where_statement": _requested_table.where_statement
-            }
-            request_definition[_requested_table.table_name] = _table_cols_req_def
-        # Run the ADF pipeline
-        adf_link: str = run_data_pipeline(request_definition, _request.workspace_uuid)
-        # Perform update of the table
-        session.execute(
-            sqlalchemy.update(
-                DataAccessRequest
-            ).where(
-                DataAccessRequest.request_uuid == request_uuid
-            ).values(adf_link=adf_link)
-        )
-        session.commit()
-        # Serialize and return
-        return {
-            "request_uuid": request_uuid,
-            "adf_link": adf_link,
-        }
+    job = await SessionManager.run_sync(_insert_provisioning_job, request_uuid)
+    PROVISIONING_WORKER.wake_up()
+    return job
+
+
+def _select_provisioning_job(
+    session: Session, job_uuid: uuid.UUID
+) -> DataAccessRequestProvisioningJob:
+    """Select the provisioning job (runs in the database thread pool)."""
+    # Find and return the item, raise error if nothing is found
+    return select_one_or_404(session.query(DataAccessRequestProvisioningJob).options(
+        *PROVISIONING_JOB_LOADING
+    ).filter(
+        DataAccessRequestProvisioningJob.job_uuid == job_uuid
+    ))
+
+
+@requests_router.get("/provisioning-job")
+async def get_provisioning_job(
+    job_uuid: uuid.UUID,
+    user: AADUserModel = Depends(validator_is_data_manager)
+) -> ProvisioningJobModel:
+    """Return the state of the provisioning job (see PUT /request-adf-commit)."""
+    # Double check that user is DataManager
+    if not user.is_data_manager:
+        raise HTTPException(status_code=403, detail="not permitted")
+
+    return await SessionManager.run_sync(_select_provisioning_job, job_uuid)
@@ -1,8 +1,8 @@
 import uuid
-from collections import defaultdict
 
 import sqlalchemy
-from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy.orm import Session
+from fastapi import APIRouter, Depends
 
 from ..pydantic_models.pd_aad_auth_models import AADUserModel
 from ..pydantic_models.pd_models import UserModel
@@ -10,11 +10,15 @@ from ..authentication.role_validators import (
     validator_is_researcher_or_data_manager,
     validator_is_data_manager,
 )
-from ..sql_models.db_models import (
-    DataAccessRequestUser,
-    DataAccessRequestWorkspaceVisibility,
-)
+from ..sql_models.db_models import DataAccessRequestUser
 from ..utils.session_manager import SessionManager
+from ..utils.data_access import KNOWN_USERS, select_one_or_404, update_or_404
+from ..utils.workspace_acl import (
+    WORKSPACE_ACL,
+    WorkspaceAclIndex,
+    bump_acl_version,
+    workspace_acl,
+)
 from ..pydantic_models.pd_management_models import (
     WorkspacesVisibilityPerUserAndViceVersa,
     UsersPerWorkspace,
@@ -31,32 +35,34 @@ async def get_user(
     return user
 
 
+def _select_users(session: Session) -> list[DataAccessRequestUser]:
+    """Select all users (runs in the database thread pool)."""
+    return session.query(DataAccessRequestUser).all()
+
+
 @users_router.get("/list-users")
 async def get_list_users(
     user: AADUserModel = Depends(validator_is_data_manager)
 ) -> list[UserModel]:
     """List all users in the system."""
-    with SessionManager() as session:
-        return session.query(DataAccessRequestUser).all()
+    return await SessionManager.run_sync(_select_users)
 
 
 @users_router.get("/workspaces-visibility-per-user-and-vice-versa")
 async def get_workspaces_visibility_per_user_and_vice_versa(
-    user: AADUserModel = Depends(validator_is_data_manager)
+    user: AADUserModel = Depends(validator_is_data_manager),
+    acl: WorkspaceAclIndex = Depends(workspace_acl)
 ) -> WorkspacesVisibilityPerUserAndViceVersa:
     """Get the map of available workspaces for each user and vice versa (based on visibility).
     """
-    with SessionManager() as session:
-        user_to_workspaces = defaultdict(list)
-        workspace_to_users = defaultdict(list)
-        visibility_list = session.query(DataAccessRequestWorkspaceVisibility).all()
-        for visibility_entry in visibility_list:
-            user_to_workspaces[visibility_entry.user_uuid].append(visibility_entry.workspace_uuid)
-            workspace_to_users[visibility_entry.workspace_uuid].append(visibility_entry.user_uuid)
-        return {
-            "user_to_workspaces": user_to_workspaces,
-            "workspace_to_users": workspace_to_users,
-        }
+    return acl.visibility_maps()
+
+
+def _select_user(session: Session, user_uuid: uuid.UUID) -> DataAccessRequestUser:
+    """Select the user or raise 404 (runs in the database thread pool)."""
+    return select_one_or_404(session.query(
+        DataAccessRequestUser
+    ).filter(DataAccessRequestUser.user_uuid == user_uuid))
 
 
 @users_router.get("/user")
@@ -64,13 +70,22 @@ async def get_user(
     user_uuid: uuid.UUID,
     user: AADUserModel = Depends(validator_is_data_manager)
 ) -> UserModel:
-    with SessionManager() as session:
-        select_users = session.query(
+    return await SessionManager.run_sync(_select_user, user_uuid)
+
+
+def _update_user(session: Session, user_uuid: uuid.UUID, user_body: UserModel) -> None:
+    """Update the user or raise 404 (runs in the database thread pool)."""
+    # Perform update
+    data_to_update = user_body.model_dump(exclude={'user_uuid'})
+    update_or_404(
+        session,
+        sqlalchemy.update(
             DataAccessRequestUser
-        ).filter(DataAccessRequestUser.user_uuid == user_uuid)
-        if select_users.count() < 1:
-            raise HTTPException(status_code=404, detail="not found")
-        return select_users.first()
+        ).where(
+            DataAccessRequestUser.user_uuid == user_uuid
+        ).values(**data_to_update)
+    )
+    session.commit()
 
 
 @users_router.put("/user")
@@ -79,22 +94,14 @@ async def put_user(
     user_body: UserModel,
     user: AADUserModel = Depends(validator_is_data_manager)
 ):
-    with SessionManager() as session:
-        select_users = session.query(
-            DataAccessRequestUser
-        ).filter(DataAccessRequestUser.user_uuid == user_uuid)
-        if select_users.count() < 1:
-            raise HTTPException(status_code=404, detail="not found")
-        # Perform update
-        data_to_update = user_body.model_dump(exclude={'user_uuid'})
-        session.execute(
-            sqlalchemy.update(
-                DataAccessRequestUser
-            ).where(
-                DataAccessRequestUser.user_uuid == user_uuid
-            ).values(**data_to_update)
-        )
-        session.commit()
+    await SessionManager.run_sync(_update_user, user_uuid, user_body)
+
+
+def _insert_user(session: Session, user_body: UserModel) -> None:
+    """Insert the new user (runs in the database thread pool)."""
+    data_to_update = user_body.model_dump()
+    session.add(DataAccessRequestUser(**data_to_update))
+    session.commit()
 
 
 @users_router.post("/user")
@@ -102,30 +109,34 @@ async def post_user(
     user_body: UserModel,
     user: AADUserModel = Depends(validator_is_data_manager)
 ):
-    with SessionManager() as session:
-        # Perform update
-        data_to_update = user_body.model_dump()
-        session.add(DataAccessRequestUser(**data_to_update))
-        session.commit()
+    await SessionManager.run_sync(_insert_user, user_body)
 
 
 @users_router.get("/users-per-workspace")
 async def get_users_per_workspace(
     workspace_uuid: uuid.UUID,
-    user: AADUserModel = Depends(validator_is_data_manager)
+    user: AADUserModel = Depends(validator_is_data_manager),
+    acl: WorkspaceAclIndex = Depends(workspace_acl)
 ) -> UsersPerWorkspace:
     """Get the list of users that can see a concrete workspace.
     """
-    with SessionManager() as session:
-        workspace_to_users = []
-        visibility_list = session.query(DataAccessRequestWorkspaceVisibility).filter(
-            DataAccessRequestWorkspaceVisibility.workspace_uuid == workspace_uuid
-        ).all()
-        for visibility_entry in visibility_list:
-            workspace_to_users.append(visibility_entry.user_uuid)
-        return {
-            "available_workspaces": workspace_to_users,
-        }
+    return {
+        "available_workspaces": list(acl.users_of(workspace_uuid)),
+    }
+
+
+def _delete_user(session: Session, user_uuid: uuid.UUID) -> None:
+    """Delete the user (runs in the database thread pool)."""
+    session.execute(
+        sqlalchemy.delete(DataAccessRequestUser).where(
+            DataAccessRequestUser.user_uuid == user_uuid
+        )
+        # Note: everything should be delete by cascade
+    )
+    acl_version = bump_acl_version(session)
+    session.commit()
+    KNOWN_USERS.discard(user_uuid)
+    WORKSPACE_ACL.remove_user(user_uuid, acl_version)
 
 
 @users_router.delete("/user")
@@ -133,12 +144,4 @@ async def delete_user(
     user_uuid: uuid.UUID,
     user: AADUserModel = Depends(validator_is_data_manager)
 ):
-    with SessionManager() as session:
-        # Perform delete
-        session.execute(
-            sqlalchemy.delete(DataAccessRequestUser).where(
-                DataAccessRequestUser.user_uuid == user_uuid
-            )
-            # Note: everything should be delete by cascade
-        )
-        session.commit()
+    await SessionManager.run_sync(_delete_user, user_uuid)
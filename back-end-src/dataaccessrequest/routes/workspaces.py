@@ -1,16 +1,27 @@
 import uuid
 
 import sqlalchemy
+from sqlalchemy.orm import Session
 from fastapi import APIRouter, Depends, HTTPException
 from fastapi import status as HTTPStatusCode
 
 from ..utils.session_manager import SessionManager
+from ..utils.data_access import row_exists, select_one_or_404, update_or_404
+from ..utils.workspace_acl import (
+    WORKSPACE_ACL,
+    WorkspaceAclIndex,
+    bump_acl_version,
+    workspace_acl,
+)
 
 from ..pydantic_models.pd_models import WorkspaceModel
-from ..pydantic_models.pd_management_models import WorkspaceWithUsersModel
+from ..pydantic_models.pd_management_models import (
+    UsersPerWorkspace,
+    WorkspaceVisibilityChangeModel,
+    WorkspaceWithUsersModel,
+)
 from ..sql_models.db_models import (
     DataAccessRequestWorkspace,
-    DataAccessRequestUser,
     DataAccessRequestWorkspaceVisibility,
 )
 from ..pydantic_models.pd_aad_auth_models import AADUserModel
@@ -22,31 +33,39 @@ from ..authentication.role_validators import (
 workspaces_router = APIRouter()
 
 
+def _select_workspaces(
+    session: Session, workspace_uuids: frozenset[uuid.UUID] | None
+) -> list[DataAccessRequestWorkspace]:
+    """Select the workspaces (all if None, runs in the database thread pool)."""
+    query = session.query(DataAccessRequestWorkspace)
+    if workspace_uuids is not None:
+        query = query.filter(DataAccessRequestWorkspace.workspace_uuid.in_(
+            [str(_workspace_uuid) for _workspace_uuid in workspace_uuids]
+        ))
+    return query.all()
+
+
 @workspaces_router.get("/workspaces")
 async def get_workspaces(
-    user: AADUserModel = Depends(validator_is_researcher_or_data_manager)
+    user: AADUserModel = Depends(validator_is_researcher_or_data_manager),
+    acl: WorkspaceAclIndex = Depends(workspace_acl)
 ) -> list[WorkspaceModel]:
     """Returns the list of workspaces"""
-    with SessionManager() as session:
-        if user.is_data_manager:
-            return session.query(DataAccessRequestWorkspace).all()
-        elif user.is_researcher:
-            if session.query(DataAccessRequestUser).filter(
-                    DataAccessRequestUser.user_uuid == user.user_uuid
-            ).count() < 1:
-                return []
-            # Select only workspaces where user has permission
-            return session.query(
-                DataAccessRequestWorkspace
-            ).join(
-                DataAccessRequestWorkspaceVisibility
-            ).filter(
-                DataAccessRequestWorkspaceVisibility.user_uuid == user.user_uuid
-            ).filter(
-                DataAccessRequestWorkspace.workspace_uuid ==
-                DataAccessRequestWorkspaceVisibility.workspace_uuid
-            ).all()
-        # no more options
+    if user.is_data_manager:
+        return await SessionManager.run_sync(_select_workspaces, None)
+    # Select only workspaces where user has permission
+    #   (unregistered user has no visibility entries, hence gets an empty list)
+    visible_workspaces = acl.workspaces_of(user.user_uuid)
+    if not visible_workspaces:
+        return []
+    return await SessionManager.run_sync(_select_workspaces, visible_workspaces)
+
+
+def _select_workspace(session: Session, workspace_uuid: uuid.UUID) -> DataAccessRequestWorkspace:
+    """Select the workspace or raise 404 (runs in the database thread pool)."""
+    return select_one_or_404(session.query(
+        DataAccessRequestWorkspace
+    ).filter(DataAccessRequestWorkspace.workspace_uuid == workspace_uuid))
 
 
 @workspaces_router.get("/workspace")
@@ -54,13 +73,59 @@ async def get_workspace(
     workspace_uuid: uuid.UUID,
     user: AADUserModel = Depends(validator_is_data_manager)
 ) -> WorkspaceModel:
-    with SessionManager() as session:
-        select_workspaces = session.query(
-            DataAccessRequestWorkspace
-        ).filter(DataAccessRequestWorkspace.workspace_uuid == workspace_uuid)
-        if select_workspaces.count() < 1:
-            raise HTTPException(status_code=404, detail="not found")
-        return select_workspaces.first()
+    return await SessionManager.run_sync(_select_workspace, workspace_uuid)
+
+
+def _select_visible_users(session: Session, workspace_uuid: uuid.UUID) -> set[uuid.UUID]:
+    """Select users that can see the workspace."""
+    return {
+        uuid.UUID(str(_user_uuid)) for _user_uuid in session.execute(
+            sqlalchemy.select(DataAccessRequestWorkspaceVisibility.user_uuid).where(
+                DataAccessRequestWorkspaceVisibility.workspace_uuid == workspace_uuid
+            )
+        ).scalars()
+    }
+
+
+def _change_visibility(session: Session, workspace_uuid: uuid.UUID,
+                       added_users: set[uuid.UUID], removed_users: set[uuid.UUID]) -> None:
+    """Insert and delete visibility entries of the workspace, each by a single executemany
+    (without commit).
+    Args:
+        session (Session): Session for SQL Server.
+        workspace_uuid (uuid.UUID): The workspace.
+        added_users (set[uuid.UUID]): Users that newly see the workspace.
+        removed_users (set[uuid.UUID]): Users that no longer see the workspace.
+    """
+    if removed_users:
+        visibility_table = DataAccessRequestWorkspaceVisibility.__table__
+        session.execute(
+            sqlalchemy.delete(visibility_table).where(
+                visibility_table.c.workspace_uuid == str(workspace_uuid),
+                visibility_table.c.user_uuid == sqlalchemy.bindparam("removed_user_uuid"),
+            ),
+            [{"removed_user_uuid": str(_user_uuid)} for _user_uuid in removed_users]
+        )
+    if added_users:
+        session.execute(
+            sqlalchemy.insert(DataAccessRequestWorkspaceVisibility),
+            [{"workspace_uuid": str(workspace_uuid), "user_uuid": str(_user_uuid)}
+             for _user_uuid in added_users]
+        )
+
+
+def _insert_workspace(session: Session, workspace: WorkspaceWithUsersModel) -> None:
+    """Insert the new workspace and its visibility (runs in the database thread pool)."""
+    session.execute(sqlalchemy.insert(DataAccessRequestWorkspace).values(
+        **workspace.model_dump(exclude={'visible_for_users'})
+    ))
+    # Now add users that can view this workspace (a new workspace has no visibility yet)
+    visible_users = set(workspace.visible_for_users)
+    _change_visibility(session, workspace.workspace_uuid, visible_users, set())
+    # The workspace and its visibility (with its new version) are committed together
+    acl_version = bump_acl_version(session)
+    session.commit()
+    WORKSPACE_ACL.set_workspace_users(workspace.workspace_uuid, visible_users, acl_version)
 
 
 @workspaces_router.post("/workspace")
@@ -69,31 +134,35 @@ async def post_workspace(
     user: AADUserModel = Depends(validator_is_data_manager),
     status_code=HTTPStatusCode.HTTP_204_NO_CONTENT
 ):
-    with SessionManager() as session:
-        session.add(DataAccessRequestWorkspace(
-            **workspace.model_dump(exclude={'visible_for_users'})
-        ))
-        session.commit()
-        # Now add users that can view this workspace
-        #   a) remove all existing visibility conditions
-        session.execute(
-            sqlalchemy.delete(DataAccessRequestWorkspaceVisibility).where(
-                DataAccessRequestWorkspaceVisibility.workspace_uuid == workspace.workspace_uuid
-            )
-        )
-        session.commit()
-        #   b) insert new values
-        visibility_values = []
-        for user_uuid_visible in workspace.visible_for_users:
-            visibility_values.append(
-                DataAccessRequestWorkspaceVisibility(
-                    workspace_uuid=workspace.workspace_uuid,
-                    user_uuid=user_uuid_visible
-                )
-            )
-        if visibility_values:
-            session.add_all(visibility_values)
-            session.commit()
+    await SessionManager.run_sync(_insert_workspace, workspace)
+
+
+def _update_workspace(
+    session: Session, workspace_uuid: uuid.UUID, workspace: WorkspaceWithUsersModel
+) -> None:
+    """Update the workspace and its visibility (runs in the database thread pool)."""
+    # Perform update, raise error if nothing is found
+    data_to_update = workspace.model_dump(exclude={'workspace_uuid', 'visible_for_users'})
+    update_or_404(
+        session,
+        sqlalchemy.update(
+            DataAccessRequestWorkspace
+        ).where(
+            DataAccessRequestWorkspace.workspace_uuid == workspace_uuid
+        ).values(**data_to_update)
+    )
+
+    # Now change only the visibility of users added or removed
+    #   (the version is bumped first, its lock orders concurrent changes of the visibility)
+    acl_version = bump_acl_version(session)
+    current_users = _select_visible_users(session, workspace_uuid)
+    visible_users = set(workspace.visible_for_users)
+    _change_visibility(
+        session, workspace_uuid, visible_users - current_users, current_users - visible_users
+    )
+    # The workspace and its visibility are committed together
+    session.commit()
+    WORKSPACE_ACL.set_workspace_users(workspace_uuid, visible_users, acl_version)
 
 
 @workspaces_router.put("/workspace")
@@ -103,43 +172,59 @@ async def put_workspace(
     user: AADUserModel = Depends(validator_is_data_manager),
     status_code=HTTPStatusCode.HTTP_204_NO_CONTENT
 ):
-    with SessionManager() as session:
-        select_workspace = session.query(
-            DataAccessRequestWorkspace
-        ).filter(DataAccessRequestWorkspace.workspace_uuid == workspace_uuid)
-        if select_workspace.count() < 1:
-            raise HTTPException(status_code=404, detail="not found")
-        # Perform update
-        data_to_update = workspace.model_dump(exclude={'workspace_uuid', 'visible_for_users'})
-        session.execute(
-            sqlalchemy.update(
-                DataAccessRequestWorkspace
-            ).where(
-                DataAccessRequestWorkspace.workspace_uuid == workspace_uuid
-            ).values(**data_to_update)
-        )
+    await SessionManager.run_sync(_update_workspace, workspace_uuid, workspace)
+
+
+def _patch_visibility(
+    session: Session, workspace_uuid: uuid.UUID, change: WorkspaceVisibilityChangeModel
+) -> dict[str, list]:
+    """Add and remove users in the visibility of the workspace or raise 404 (runs in the
+    database thread pool)."""
+    if not row_exists(session.query(DataAccessRequestWorkspace).filter(
+            DataAccessRequestWorkspace.workspace_uuid == workspace_uuid
+    )):
+        raise HTTPException(status_code=404, detail="not found")
+    acl_version = bump_acl_version(session)
+    current_users = _select_visible_users(session, workspace_uuid)
+    added_users = set(change.add_users) - current_users
+    removed_users = set(change.remove_users) & current_users
+    if added_users or removed_users:
+        _change_visibility(session, workspace_uuid, added_users, removed_users)
         session.commit()
+        current_users = (current_users | added_users) - removed_users
+        WORKSPACE_ACL.set_workspace_users(workspace_uuid, current_users, acl_version)
+    else:
+        # Nothing changes, the version stays the same
+        session.rollback()
+    return {
+        "available_workspaces": list(current_users),
+    }
 
-        # Now add users that can view this workspace
-        #   a) remove all existing visibility conditions
-        session.execute(
-            sqlalchemy.delete(DataAccessRequestWorkspaceVisibility).where(
-                DataAccessRequestWorkspaceVisibility.workspace_uuid == workspace.workspace_uuid
-            )
+
+@workspaces_router.patch("/workspace-visibility")
+async def patch_workspace_visibility(
+    workspace_uuid: uuid.UUID,
+    change: WorkspaceVisibilityChangeModel,
+    user: AADUserModel = Depends(validator_is_data_manager)
+) -> UsersPerWorkspace:
+    """Add or remove individual users that can see the workspace (other users are kept).
+    Returns the resulting list of users that can see the workspace."""
+    if set(change.add_users) & set(change.remove_users):
+        raise HTTPException(status_code=422, detail="user both added and removed")
+    return await SessionManager.run_sync(_patch_visibility, workspace_uuid, change)
+
+
+def _delete_workspace(session: Session, workspace_uuid: uuid.UUID) -> None:
+    """Delete the workspace (runs in the database thread pool)."""
+    session.execute(
+        sqlalchemy.delete(DataAccessRequestWorkspace).where(
+            DataAccessRequestWorkspace.workspace_uuid == workspace_uuid
         )
-        session.commit()
-        #   b) insert new values
-        visibility_values = []
-        for user_uuid_visible in workspace.visible_for_users:
-            visibility_values.append(
-                DataAccessRequestWorkspaceVisibility(
-                    workspace_uuid=workspace.workspace_uuid,
-                    user_uuid=user_uuid_visible
-                )
-            )
-        if visibility_values:
-            session.add_all(visibility_values)
-            session.commit()
+        # Note: everything should be delete by cascade
+    )
+    acl_version = bump_acl_version(session)
+    session.commit()
+    WORKSPACE_ACL.set_workspace_users(workspace_uuid, (), acl_version)
 
 
 @workspaces_router.delete("/workspace")
@@ -147,12 +232,4 @@ async def delete_workspace(
     workspace_uuid: uuid.UUID,
     user: AADUserModel = Depends(validator_is_data_manager)
 ):
-    with SessionManager() as session:
-        # Perform delete
-        session.execute(
-            sqlalchemy.delete(DataAccessRequestWorkspace).where(
-                DataAccessRequestWorkspace.workspace_uuid == workspace_uuid
-            )
-            # Note: everything should be delete by cascade
-        )
-        session.commit()
+    await SessionManager.run_sync(_delete_workspace, workspace_uuid)
@@ -1,7 +1,7 @@
 import datetime
 import uuid
 
-from sqlalchemy import Column, ForeignKey
+from sqlalchemy import Column, ForeignKey, Index, text
 
 from sqlalchemy.ext.declarative import declarative_base
 import sqlalchemy.dialects.mssql as ms
@@ -20,8 +20,7 @@ class DataAccessRequest(Base):
     )
     title = Column(ms.VARCHAR(length=1024), nullable=False)
     status = Column(ms.VARCHAR(length=128), nullable=False, default="pending")
-    created_on = Column(ms.DATETIME2, nullable=False,
-                        default=datetime.datetime.now().isoformat(' '))
+    created_on = Column(ms.DATETIME2, nullable=False, default=datetime.datetime.now)
     justification = Column(ms.TEXT, nullable=False)
     comment = Column(ms.TEXT, nullable=True)
 
@@ -38,6 +37,16 @@ class DataAccessRequest(Base):
     reviewed_on = Column(ms.DATETIME2, nullable=True)
 
     adf_link = Column(ms.VARCHAR(length=1024), nullable=True)
+    # State of the pipeline run (updated by the run status poller)
+    adf_run_id = Column(ms.VARCHAR(length=64), nullable=True)
+    adf_run_status = Column(ms.VARCHAR(length=32), nullable=True)
+    adf_run_duration_ms = Column(ms.BIGINT, nullable=True)
+    adf_run_error = Column(ms.VARCHAR(length=1024), nullable=True)
+    # Estimated size of the provisioned data (see request_estimate) and the version of the
+    #   catalogue it was computed from
+    estimated_rows = Column(ms.BIGINT, nullable=True)
+    estimated_bytes = Column(ms.BIGINT, nullable=True)
+    estimate_version = Column(ms.VARCHAR(length=64), nullable=True)
 
     creator_uuid = Column(ms.UNIQUEIDENTIFIER(as_uuid=False),
                           ForeignKey('DataAccessRequestUser.user_uuid',
@@ -45,11 +54,13 @@ class DataAccessRequest(Base):
                           nullable=False)
 
     # External linkage
-    tables_and_columns = relationship("DataAccessRequestTables", lazy='subquery')
-    workspace = relationship("DataAccessRequestWorkspace", lazy='subquery')
-    creator = relationship("DataAccessRequestUser", lazy='subquery',
+    #   - nothing is loaded implicitly, each endpoint selects its loading strategy
+    #     (see the query options in routes), so an unplanned lazy load fails loudly
+    tables_and_columns = relationship("DataAccessRequestTables", lazy='raise_on_sql')
+    workspace = relationship("DataAccessRequestWorkspace", lazy='raise_on_sql')
+    creator = relationship("DataAccessRequestUser", lazy='raise_on_sql',
                            foreign_keys="DataAccessRequest.creator_uuid", uselist=False)
-    reviewer = relationship("DataAccessRequestUser", lazy='subquery',
+    reviewer = relationship("DataAccessRequestUser", lazy='raise_on_sql',
                             foreign_keys="DataAccessRequest.reviewer_uuid", uselist=False)
 
 
@@ -68,7 +79,7 @@ class DataAccessRequestTables(Base):
 
     # External linkage
     data_access_request = relationship("DataAccessRequest", back_populates="tables_and_columns")
-    columns = relationship("DataAccessRequestColumns", lazy='subquery')
+    columns = relationship("DataAccessRequestColumns", lazy='raise_on_sql')
 
 
 class DataAccessRequestColumns(Base):
@@ -118,4 +129,60 @@ class DataAccessRequestWorkspaceVisibility(Base):
                                   ondelete="CASCADE", onupdate="CASCADE"),
                        nullable=False, primary_key=True)
 
+
+class DataAccessRequestProvisioningJob(Base):
+    __tablename__ = "DataAccessRequestProvisioningJob"
+
+    job_uuid = Column(ms.UNIQUEIDENTIFIER(as_uuid=False), nullable=False, primary_key=True,
+                      default=uuid.uuid4)
+    request_uuid = Column(ms.UNIQUEIDENTIFIER(as_uuid=False),
+                          ForeignKey('DataAccessRequest.request_uuid',
+                                     ondelete="CASCADE", onupdate="CASCADE"),
+                          nullable=False)
+    status = Column(ms.VARCHAR(length=32), nullable=False, default="queued")
+    attempts = Column(ms.INTEGER, nullable=False, default=0)
+    created_on = Column(ms.DATETIME2, nullable=False, default=datetime.datetime.now)
+    updated_on = Column(ms.DATETIME2, nullable=False, default=datetime.datetime.now)
+    next_attempt_on = Column(ms.DATETIME2, nullable=False, default=datetime.datetime.now)
+    adf_link = Column(ms.VARCHAR(length=1024), nullable=True)
+    error = Column(ms.VARCHAR(length=1024), nullable=True)
+
+    # External linkage
+    runs = relationship("DataAccessRequestPipelineRun", lazy='raise_on_sql',
+                        order_by="DataAccessRequestPipelineRun.group_number")
+
+    # At most one active (queued or running) job of each request
+    __table_args__ = (
+        Index("index_on_DataAccessRequestProvisioningJob_active_request_uuid", request_uuid,
+              unique=True, mssql_where=text("status IN ('queued', 'running')"),
+              sqlite_where=text("status IN ('queued', 'running')")),
+    )
+
+
+class DataAccessRequestPipelineRun(Base):
+    __tablename__ = "DataAccessRequestPipelineRun"
+
+    run_id = Column(ms.VARCHAR(length=64), nullable=False, primary_key=True)
+    job_uuid = Column(ms.UNIQUEIDENTIFIER(as_uuid=False),
+                      ForeignKey('DataAccessRequestProvisioningJob.job_uuid',
+                                 ondelete="CASCADE", onupdate="CASCADE"),
+                      nullable=False)
+    group_number = Column(ms.INTEGER, nullable=False)
+    # Names of the tables of the group (JSON list)
+    table_names = Column(ms.TEXT, nullable=False)
+    number_of_rows = Column(ms.BIGINT, nullable=False)
+    created_on = Column(ms.DATETIME2, nullable=False, default=datetime.datetime.now)
+    # State of the run (updated by the run status poller)
+    status = Column(ms.VARCHAR(length=32), nullable=False)
+    duration_ms = Column(ms.BIGINT, nullable=True)
+    error = Column(ms.VARCHAR(length=1024), nullable=True)
+
+
+class DataAccessRequestAclVersion(Base):
+    __tablename__ = "DataAccessRequestAclVersion"
+
+    acl_name = Column(ms.VARCHAR(length=64), nullable=False, primary_key=True)
+    # Incremented by each change of the list (see workspace_acl)
+    version = Column(ms.BIGINT, nullable=False)
+
 # =======================
@@ -0,0 +1,165 @@
+import asyncio
+import logging
+import os
+from collections.abc import Mapping
+from datetime import datetime, timezone
+from pathlib import Path
+
+from config import CONFIG
+from riocatalogue.catalogue import CATALOGUE
+from riocatalogue.catalogue_search import CATALOGUE_SEARCH
+from riocatalogue.catalogue_binary import CatalogueArtifact, pack_catalogue
+from riocatalogue.catalogue_facets import CatalogueFacets
+from riocatalogue.catalogue_index import CatalogueSearchIndex, CatalogueFuzzyIndex
+from riocatalogue.create_catalogue import (
+    catalogue_version,
+    read_catalogue_artifact,
+    render_json,
+    create_table_summaries,
+    create_search_index,
+    create_fuzzy_index,
+    create_facets,
+)
+from .encoded_response import PreEncodedJSON
+
+logger = logging.getLogger(__name__)
+
+
+class CatalogueSnapshot:
+    """One version of the catalogue with everything derived from it (search indexes, facets
+    and pre-encoded responses). It is never modified, a new version replaces the whole
+    snapshot, so a request always works with a consistent catalogue and its indexes.
+
+    Snapshots of the artifact read the catalogue, indexes and serialized and compressed
+    responses from the memory mapped file (shared by all worker processes), only small
+    lookup structures are kept per process."""
+
+    def __init__(self, version: str, catalogue: Mapping[str, dict],
+                 search_index: CatalogueSearchIndex, fuzzy_index: CatalogueFuzzyIndex,
+                 facets: CatalogueFacets, catalogue_response: PreEncodedJSON,
+                 table_summaries_response: PreEncodedJSON):
+        self.version = version
+        self.catalogue = catalogue
+        # Inverted index over the catalogue optimized for searching
+        self.search_index = search_index
+        # Trigram index of table and column names for the fuzzy search
+        self.fuzzy_index = fuzzy_index
+        # Bitmaps of tables for filtering by column flags, data types, classification and size
+        self.facets = facets
+        # The whole catalogue and the list of tables serialized and compressed in advance
+        self.catalogue_response = catalogue_response
+        self.table_summaries_response = table_summaries_response
+        self.loaded_at = datetime.now(timezone.utc)
+
+    @classmethod
+    def from_catalogue(cls, version: str, catalogue: dict,
+                       search_catalogue: dict) -> "CatalogueSnapshot":
+        """Build the snapshot of the catalogue (outputs of create_catalogue) in memory, the
+        snapshot keeps the catalogue packed (see pack_catalogue)."""
+        return cls(version, pack_catalogue(catalogue, search_catalogue),
+                   create_search_index(catalogue, search_catalogue),
+                   create_fuzzy_index(catalogue), create_facets(catalogue),
+                   PreEncodedJSON(body=render_json(catalogue), version=version),
+                   PreEncodedJSON(body=render_json(create_table_summaries(catalogue)),
+                                  version=version))
+
+    @classmethod
+    def from_artifact(cls, artifact: CatalogueArtifact) -> "CatalogueSnapshot":
+        """Create the snapshot reading from the artifact (see write_catalogue_artifact), the
+        responses are served from the mapped documents (the version is their ETag)."""
+        catalogue_response, table_summaries_response = (
+            PreEncodedJSON(body=artifact.document(_name),
+                           encoded_bodies=artifact.encoded_documents(_name),
+                           version=artifact.version)
+            for _name in ("catalogue", "table_summaries")
+        )
+        return cls(artifact.version, artifact.catalogue, artifact.search_index(),
+                   artifact.fuzzy_index(), artifact.facets(), catalogue_response,
+                   table_summaries_response)
+
+
+class CatalogueLoader:
+    """Holds the active catalogue snapshot and replaces it when the artifact changes.
+    New snapshots are built in a worker thread and swapped by a single assignment, hence
+    requests are served from the previous version until the new one is complete.
+
+    Each (uvicorn) worker process has its own loader, the reload end-point affects only
+    the process handling it, the periodic check (watch) covers all of them."""
+
+    def __init__(self, artifact_path: str | None):
+        self.artifact_path = Path(artifact_path) if artifact_path else None
+        # Modification time and size of the last loaded (or rejected) artifact
+        self._artifact_signature: tuple[int, int] | None = None
+        self._reload_lock = asyncio.Lock()
+        self.snapshot = self._build_snapshot()
+
+    def _read_signature(self) -> tuple[int, int] | None:
+        """Modification time and size of the artifact (None if it does not exist)."""
+        try:
+            artifact_stat = os.stat(self.artifact_path)
+        except FileNotFoundError:
+            return None
+        return artifact_stat.st_mtime_ns, artifact_stat.st_size
+
+    def _build_snapshot(self, current_version: str | None = None) -> CatalogueSnapshot | None:
+        """Open the artifact (or the catalogue from riocatalogue package if not configured)
+        and create its snapshot (blocking).
+        Args:
+            current_version (str | None): Version of the active snapshot.
+        Returns:
+            CatalogueSnapshot | None: New snapshot, None if the version is the current one.
+        """
+        if self.artifact_path is None:
+            return CatalogueSnapshot.from_catalogue(
+                catalogue_version(CATALOGUE, CATALOGUE_SEARCH), CATALOGUE, CATALOGUE_SEARCH
+            )
+        self._artifact_signature = self._read_signature()
+        artifact = read_catalogue_artifact(self.artifact_path)
+        if artifact.version == current_version:
+            return None
+        return CatalogueSnapshot.from_artifact(artifact)
+
+    async def reload(self, force: bool = False) -> bool:
+        """Replace the active snapshot if the artifact changed.
+        Args:
+            force (bool): Load the artifact even if its modification time and size are the
+                same as the last time (the version is compared anyway).
+        Raises:
+            OSError | ValueError: If the artifact cannot be loaded (the active snapshot
+                stays in place).
+        Returns:
+            bool: True if a new version was activated.
+        """
+        if self.artifact_path is None:
+            return False
+        async with self._reload_lock:
+            if not force and self._read_signature() == self._artifact_signature:
+                return False
+            snapshot = await asyncio.to_thread(self._build_snapshot, self.snapshot.version)
+            if snapshot is None:
+                return False
+            self.snapshot = snapshot
+        logger.info("Catalogue version %s activated", snapshot.version)
+        return True
+
+    async def watch(self, interval: int) -> None:
+        """Check the artifact every interval seconds and reload it when it changes (runs
+        until cancelled, errors are only logged)."""
+        while True:
+            await asyncio.sleep(interval)
+            try:
+                await self.reload()
+            except (OSError, ValueError) as error:
+                logger.error("Catalogue artifact cannot be loaded: %s", error)
+
+
+# Single (process-wide) holder of the catalogue
+CATALOGUE_LOADER = CatalogueLoader(CONFIG.CATALOGUE_ARTIFACT_PATH)
+
+
+async def active_catalogue() -> CatalogueSnapshot:
+    """Dependency providing the catalogue snapshot for the whole request.
+    Returns:
+        CatalogueSnapshot: Snapshot active when the request started.
+    """
+    return CATALOGUE_LOADER.snapshot
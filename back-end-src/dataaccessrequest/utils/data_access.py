@@ -0,0 +1,106 @@
+from typing import Any
+
+import sqlalchemy
+from fastapi import HTTPException
+from sqlalchemy.orm import Query, Session
+
+from config import CONFIG
+from ..pydantic_models.pd_aad_auth_models import AADUserModel
+from ..sql_models.db_models import DataAccessRequestUser
+from .ttl_cache import TTLCache
+
+# Shared data-access helpers, each lookup / modification is a single round-trip to SQL Server
+#   (no separate COUNT(*) to check the existence first).
+
+
+def select_one_or_404(query: Query) -> Any:
+    """Fetch the only row matching the query.
+    Args:
+        query (Query): Query filtered by the (primary) key, with its loading options.
+    Raises:
+        HTTPException: 404 error if nothing is found.
+    Returns:
+        Any: The selected entity.
+    """
+    selected_entity = query.one_or_none()
+    if selected_entity is None:
+        raise HTTPException(status_code=404, detail="not found")
+    return selected_entity
+
+
+def _execute_or_404(session: Session, statement: sqlalchemy.Executable) -> int:
+    """Execute the modifying statement, raise 404 error if it does not match any row."""
+    matched_rows = session.execute(statement).rowcount
+    if matched_rows < 1:
+        raise HTTPException(status_code=404, detail="not found")
+    return matched_rows
+
+
+def update_or_404(session: Session, statement: sqlalchemy.Update) -> int:
+    """Execute the UPDATE ... WHERE statement (without commit).
+    Args:
+        session (Session): Session for SQL Server.
+        statement (sqlalchemy.Update): Update statement with the where clause.
+    Raises:
+        HTTPException: 404 error if no row is matched.
+    Returns:
+        int: Number of matched rows.
+    """
+    return _execute_or_404(session, statement)
+
+
+def delete_or_404(session: Session, statement: sqlalchemy.Delete) -> int:
+    """Execute the DELETE ... WHERE statement (without commit).
+    Args:
+        session (Session): Session for SQL Server.
+        statement (sqlalchemy.Delete): Delete statement with the where clause.
+    Raises:
+        HTTPException: 404 error if no row is matched.
+    Returns:
+        int: Number of deleted rows.
+    """
+    return _execute_or_404(session, statement)
+
+
+def row_exists(query: Query) -> bool:
+    """Check whether any row matches the query (SELECT TOP 1 instead of COUNT(*)).
+    Args:
+        query (Query): Filtered query.
+    Returns:
+        bool: True if at least one row exists.
+    """
+    return query.with_entities(sqlalchemy.literal(1)).limit(1).first() is not None
+
+
+# UUIDs of users known to be registered (by this process), entries expire so users deleted
+#   by another process get registered again
+KNOWN_USERS = TTLCache(CONFIG.AUTH_CACHE_SIZE, CONFIG.AUTH_CACHE_TTL)
+
+
+def register_user_if_missing(session: Session, user: AADUserModel) -> None:
+    """Insert the user into the system unless already registered, in a single
+    INSERT ... SELECT ... WHERE NOT EXISTS statement (without commit). Users registered
+    by this process recently are skipped without any statement.
+    Args:
+        session (Session): Session for SQL Server.
+        user (AADUserModel): Authenticated user.
+    """
+    if KNOWN_USERS.get(user.user_uuid):
+        return
+    user_values = sqlalchemy.select(
+        sqlalchemy.literal(str(user.user_uuid), DataAccessRequestUser.user_uuid.type),
+        sqlalchemy.literal(user.user_full_name, DataAccessRequestUser.user_full_name.type),
+        sqlalchemy.literal(user.user_username, DataAccessRequestUser.user_username.type),
+    ).where(
+        ~sqlalchemy.exists().where(DataAccessRequestUser.user_uuid == user.user_uuid)
+    )
+    session.execute(
+        sqlalchemy.insert(DataAccessRequestUser).from_select(
+            ["user_uuid", "user_full_name", "user_username"], user_values
+        )
+    )
+    # Remembered only once committed (a rollback leaves the user unregistered)
+    sqlalchemy.event.listen(
+        session, "after_commit", lambda _session: KNOWN_USERS.put(user.user_uuid, True),
+        once=True
+    )
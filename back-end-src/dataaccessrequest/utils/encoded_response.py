@@ -0,0 +1,147 @@
+import hashlib
+from collections.abc import Collection, Mapping
+from typing import Any
+
+from fastapi import Request, Response
+from fastapi.responses import JSONResponse
+
+from riocatalogue.catalogue_binary import encode_document
+
+# Supported content codings in the order of preference
+CONTENT_CODINGS = ("br", "gzip")
+# No content coding
+IDENTITY_CODING = "identity"
+# Names of codings equivalent to the supported ones
+CODING_ALIASES = {"x-gzip": "gzip"}
+# Q-value of the identity not listed in Accept-Encoding (lower than any listed coding)
+FALLBACK_WEIGHT = 0.0001
+
+
+def content_coding_weights(accept_encoding: str) -> dict[str, float]:
+    """Parse the Accept-Encoding header (RFC 9110, section 12.5.3).
+    Args:
+        accept_encoding (str): Value of the header (e.g. "gzip, deflate, br;q=0.9").
+    Returns:
+        dict[str, float]: Lowercase codings (including "identity" and "*" if listed) and
+            their q-values (0 for refused codings and for invalid q-values).
+    """
+    weights = {}
+    for _item in accept_encoding.split(","):
+        coding, *parameters = [_part.strip() for _part in _item.split(";")]
+        coding = CODING_ALIASES.get(coding.lower(), coding.lower())
+        weight = 1.0
+        for _parameter in parameters:
+            name, _, value = _parameter.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    weight = min(max(float(value), 0.0), 1.0)
+                except ValueError:
+                    weight = 0.0
+        if coding:
+            weights[coding] = weight
+    return weights
+
+
+def negotiate_content_coding(accept_encoding: str | None,
+                             available_codings: Collection[str]) -> str | None:
+    """Select the coding of the response for the Accept-Encoding header: the available
+    coding with the highest q-value (ties in the order of CONTENT_CODINGS). "*" stands for
+    codings not listed. The identity (no coding) is used if no coding is acceptable, or if
+    it is listed with a higher q-value, unless refused by "identity;q=0" or "*;q=0".
+    Args:
+        accept_encoding (str | None): Value of the header (None if missing, then the
+            identity is used).
+        available_codings (Collection[str]): Codings the body is available in.
+    Returns:
+        str | None: Selected coding ("identity" for none), None if nothing is acceptable.
+    """
+    if accept_encoding is None:
+        return IDENTITY_CODING
+    weights = content_coding_weights(accept_encoding)
+    any_coding_weight = weights.get("*", 0.0)
+    candidates = [
+        (_coding, weights.get(_coding, any_coding_weight))
+        for _coding in CONTENT_CODINGS if _coding in available_codings
+    ]
+    # The identity competes with the codings only if listed, otherwise it is the fallback
+    identity_weight = weights.get(IDENTITY_CODING, weights.get("*", 1.0))
+    if IDENTITY_CODING not in weights:
+        identity_weight = min(identity_weight, FALLBACK_WEIGHT)
+    candidates.append((IDENTITY_CODING, identity_weight))
+    selected_coding, selected_weight = None, 0.0
+    for _coding, _weight in candidates:
+        if _weight > selected_weight:
+            selected_coding, selected_weight = _coding, _weight
+    return selected_coding
+
+
+class BufferResponse(Response):
+    """Response sending the body buffer as it is (a memory mapped memoryview is not copied
+    into bytes)."""
+
+    def render(self, content: Any) -> bytes | memoryview:
+        if isinstance(content, memoryview):
+            return content
+        return super().render(content)
+
+
+class PreEncodedJSON:
+    """JSON payload serialized and compressed only once, served in the coding preferred by
+    the client and with a strong ETag (derived from the version or the content hash)."""
+
+    def __init__(self, content: Any = None, body: bytes | memoryview | None = None,
+                 encoded_bodies: Mapping[str, bytes | memoryview] | None = None,
+                 version: str | None = None):
+        """Either the content, or its already serialized body (e.g. a memory mapped buffer)
+        has to be given. The body is compressed unless its compressed bodies are given (see
+        encode_document), the content is hashed unless its version is given."""
+        # Exactly the bytes FastAPI would render for the content
+        self.body: bytes | memoryview = JSONResponse(content).body if body is None else body
+        self.content_hash: str = hashlib.sha256(self.body).hexdigest() if version is None \
+            else version
+        # Compressed bodies (only if smaller than the plain one)
+        self.encoded_bodies: Mapping[str, bytes | memoryview] = \
+            encode_document(self.body) if encoded_bodies is None else encoded_bodies
+
+    def etag(self, coding: str | None = None) -> str:
+        """Strong ETag of the representation (each coding is a different representation)."""
+        if coding is None:
+            return f'"{self.content_hash}"'
+        return f'"{self.content_hash}-{coding}"'
+
+    def _is_not_modified(self, if_none_match: str) -> bool:
+        """Check if the client already has any representation of this content."""
+        for _etag in if_none_match.split(","):
+            _etag = _etag.strip().removeprefix("W/")
+            if _etag == "*" or _etag.strip('"').split("-")[0] == self.content_hash:
+                return True
+        return False
+
+    def response(self, request: Request) -> Response:
+        """Create response for the request, 304 if the client has the current content.
+        Args:
+            request (Request): Request with the Accept-Encoding and If-None-Match headers.
+        Returns:
+            Response: Response with the (compressed) body, 304 Not Modified or 406 Not
+                Acceptable (if the client refuses the identity and the available codings).
+        """
+        coding = negotiate_content_coding(
+            request.headers.get("accept-encoding"), self.encoded_bodies.keys()
+        )
+        if coding is None:
+            return Response(status_code=406, headers={"Vary": "Accept-Encoding"})
+        if coding == IDENTITY_CODING:
+            coding = None
+        headers = {
+            "ETag": self.etag(coding),
+            "Vary": "Accept-Encoding",
+            # Browsers can keep the payload, but must revalidate it each time
+            "Cache-Control": "private, no-cache",
+        }
+        if self._is_not_modified(request.headers.get("if-none-match", "")):
+            return Response(status_code=304, headers=headers)
+        if coding is not None:
+            headers["Content-Encoding"] = coding
+            return BufferResponse(self.encoded_bodies[coding], headers=headers,
+                                  media_type="application/json")
+        return BufferResponse(self.body, headers=headers, media_type="application/json")
@@ -0,0 +1,38 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from typing import Any
+
+from fastapi import HTTPException
+
+
+def encode_keyset_cursor(*values: Any) -> str:
+    """Serialize the sort key of the last returned row into an opaque cursor.
+    Args:
+        *values: Values of the sort key (must be JSON serializable after str()).
+    Returns:
+        str: URL safe cursor for the next page.
+    """
+    return urlsafe_b64encode(
+        json.dumps([str(_value) for _value in values]).encode('utf-8')
+    ).decode('ascii')
+
+
+def decode_keyset_cursor(cursor: str, number_of_values: int) -> list[str]:
+    """Deserialize the cursor created by encode_keyset_cursor.
+    Args:
+        cursor (str): Cursor received from the client.
+        number_of_values (int): Expected number of values of the sort key.
+    Raises:
+        HTTPException: 400 error if the cursor is malformed.
+    Returns:
+        list[str]: Values of the sort key (as strings).
+    """
+    try:
+        values = json.loads(urlsafe_b64decode(cursor.encode('ascii')))
+    except (BinasciiError, UnicodeError, ValueError):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    if not isinstance(values, list) or len(values) != number_of_values \
+            or not all(isinstance(_value, str) for _value in values):
+        raise HTTPException(status_code=400, detail="invalid cursor")
+    return values
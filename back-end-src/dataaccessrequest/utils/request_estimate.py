@@ -0,0 +1,142 @@
+import logging
+from collections.abc import Iterable, Mapping
+
+import sqlalchemy
+from sqlalchemy.orm import Session, load_only, selectinload
+
+from ..pydantic_models.pd_models import RequestInsertModel
+from ..sql_models.db_models import DataAccessRequest, DataAccessRequestTables
+from .catalogue_snapshot import CatalogueSnapshot
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# Bytes of one value of fixed-size data types (as reported by INFORMATION_SCHEMA)
+DATA_TYPE_BYTES = {
+    "bit": 1, "tinyint": 1, "smallint": 2, "int": 4, "bigint": 8,
+    "real": 4, "float": 8, "decimal": 9, "numeric": 9, "smallmoney": 4, "money": 8,
+    "date": 3, "time": 5, "smalldatetime": 4, "datetime": 8, "datetime2": 8,
+    "datetimeoffset": 10, "uniqueidentifier": 16,
+    # Variable-size types: an assumed average (the catalogue holds no lengths)
+    "char": 16, "nchar": 32, "varchar": 32, "nvarchar": 64, "text": 512, "ntext": 1024,
+    "binary": 16, "varbinary": 256, "image": 1024, "xml": 1024,
+}
+# Bytes of a value of other (or unknown) data types
+DEFAULT_VALUE_BYTES = 16
+# Number of requests whose estimate is refreshed by one query
+ESTIMATE_BATCH_SIZE = 500
+
+
+def estimate_request_size(requested_tables: Iterable[tuple[str, Iterable[str]]],
+                          catalogue: Mapping[str, dict]) -> tuple[int, int]:
+    """Predict the number of rows and bytes provisioned for the request from the number of
+    rows of the tables and data types of the selected columns. WHERE statements are not
+    evaluated (hence it is an upper bound), tables not in the catalogue are not counted.
+    Args:
+        requested_tables (Iterable[tuple[str, Iterable[str]]]): Name of each requested
+            table with names of its selected columns.
+        catalogue (Mapping[str, dict]): The catalogue (see create_catalogue).
+    Returns:
+        tuple[int, int]: Estimated number of rows and bytes.
+    """
+    estimated_rows = 0
+    estimated_bytes = 0
+    for _table_name, _column_names in requested_tables:
+        table_entry = catalogue.get(_table_name)
+        if table_entry is None:
+            continue
+        columns = table_entry["columns"]
+        row_bytes = sum(
+            DATA_TYPE_BYTES.get(columns[_column]["data_type"], DEFAULT_VALUE_BYTES)
+            if _column in columns else DEFAULT_VALUE_BYTES
+            for _column in _column_names
+        )
+        estimated_rows += table_entry["number_of_rows"]
+        estimated_bytes += table_entry["number_of_rows"] * row_bytes
+    return estimated_rows, estimated_bytes
+
+
+def requested_tables_of(
+    request: DataAccessRequest | RequestInsertModel
+) -> list[tuple[str, list[str]]]:
+    """Tables and selected columns of the request (stored with tables_and_columns loaded,
+    or a new one)."""
+    return [
+        (_table.table_name, [_column.column_name for _column in _table.columns])
+        for _table in request.tables_and_columns
+    ]
+
+
+def store_request_estimates(session: Session,
+                            estimates: list[tuple[str, tuple[int, int]]],
+                            catalogue_version: str) -> None:
+    """Store the estimates of requests (by one executemany) with the catalogue version they
+    were computed from.
+    Args:
+        session (Session): Session for SQL Server.
+        estimates (list[tuple[str, tuple[int, int]]]): UUIDs of requests with their
+            estimated rows and bytes.
+        catalogue_version (str): Version of the catalogue.
+    """
+    if not estimates:
+        return
+    requests_table = DataAccessRequest.__table__
+    session.execute(
+        sqlalchemy.update(requests_table).where(
+            requests_table.c.request_uuid == sqlalchemy.bindparam("estimated_request_uuid")
+        ).values(
+            estimated_rows=sqlalchemy.bindparam("rows"),
+            estimated_bytes=sqlalchemy.bindparam("bytes"),
+            estimate_version=catalogue_version,
+        ),
+        [
+            {"estimated_request_uuid": _request_uuid, "rows": _rows, "bytes": _bytes}
+            for _request_uuid, (_rows, _bytes) in estimates
+        ]
+    )
+    session.commit()
+
+
+def refresh_request_estimates(session: Session, catalogue_version: str,
+                              catalogue: Mapping[str, dict]) -> int:
+    """Recompute estimates of all requests computed from another catalogue version (or
+    never), in batches.
+    Returns:
+        int: Number of refreshed requests.
+    """
+    number_of_refreshed = 0
+    while True:
+        stale_requests = session.query(DataAccessRequest).options(
+            load_only(DataAccessRequest.request_uuid),
+            selectinload(
+                DataAccessRequest.tables_and_columns
+            ).selectinload(
+                DataAccessRequestTables.columns
+            ),
+        ).filter(sqlalchemy.or_(
+            DataAccessRequest.estimate_version.is_(None),
+            DataAccessRequest.estimate_version != catalogue_version,
+        )).limit(ESTIMATE_BATCH_SIZE).all()
+        if not stale_requests:
+            return number_of_refreshed
+        store_request_estimates(session, [
+            (_request.request_uuid,
+             estimate_request_size(requested_tables_of(_request), catalogue))
+            for _request in stale_requests
+        ], catalogue_version)
+        # Release the loaded graph of the batch
+        session.expunge_all()
+        number_of_refreshed += len(stale_requests)
+
+
+async def refresh_stale_estimates(catalogue: CatalogueSnapshot) -> None:
+    """Refresh estimates not computed from the catalogue (on start-up, errors are only
+    logged, the detail of a request refreshes its estimate anyway)."""
+    try:
+        number_of_refreshed = await SessionManager.run_sync(
+            refresh_request_estimates, catalogue.version, catalogue.catalogue
+        )
+    except Exception as error:
+        logger.error("Estimates of requests cannot be refreshed: %s", error)
+    else:
+        logger.info("Estimates of %d requests refreshed", number_of_refreshed)
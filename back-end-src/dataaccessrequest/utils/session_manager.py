@@ -1,14 +1,74 @@
+import asyncio
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable
+
 from sqlalchemy.orm import sessionmaker
-from config import ENGINE
+from config import CONFIG, ENGINE
+
+# Single (process-wide) factory for SQL Server sessions
+SESSION_FACTORY = sessionmaker(bind=ENGINE)
+
+# Bounded pool of threads running blocking (pyodbc) database calls outside the event loop
+DATABASE_EXECUTOR = ThreadPoolExecutor(
+    max_workers=CONFIG.MSSQL_THREAD_POOL_SIZE,
+    thread_name_prefix="database",
+)
+
+logger = logging.getLogger(__name__)
 
 
 class SessionManager:
     """Context Manager for SQL Server sessions (connection and disconnection)"""
     def __init__(self):
-        self.session = sessionmaker(bind=ENGINE)()
+        self.session = SESSION_FACTORY()
 
     def __enter__(self):
         return self.session
 
     def __exit__(self, exception_type, exception_value, exception_traceback):
         self.session.close()
+
+    @classmethod
+    async def run_sync(cls, function: Callable[..., Any], *args, **kwargs) -> Any:
+        """Run the blocking database logic in the database thread pool, so the event loop
+        does not wait for the round-trip to SQL Server.
+
+        The session is opened and closed inside the worker thread, hence a connection is
+        never held by a coroutine waiting for a free thread (which would exhaust the pool).
+        Args:
+            function (Callable[..., Any]): Function receiving the session as the first argument.
+            *args: Other positional arguments for the function.
+            **kwargs: Other keyword arguments for the function.
+        Returns:
+            Any: Whatever the function returns (exceptions are propagated).
+        """
+        def _run_in_session() -> Any:
+            with cls() as session:
+                return function(session, *args, **kwargs)
+
+        return await asyncio.get_running_loop().run_in_executor(
+            DATABASE_EXECUTOR, _run_in_session
+        )
+
+
+async def warm_up_connection_pool() -> None:
+    """Open all persistent connections of the pool in parallel (on startup), so the first
+    requests after a deploy do not pay the ODBC login latency.
+
+    Failures are only logged, the pool opens connections on demand later anyway.
+    """
+    loop = asyncio.get_running_loop()
+    connections = await asyncio.gather(
+        *[
+            loop.run_in_executor(DATABASE_EXECUTOR, ENGINE.connect)
+            for _ in range(CONFIG.MSSQL_POOL_SIZE)
+        ],
+        return_exceptions=True,
+    )
+    for connection in connections:
+        if isinstance(connection, Exception):
+            logger.warning("Database connection pool warm-up failed: %s", connection)
+        else:
+            # Returns the (already opened) connection into the pool
+            connection.close()
@@ -0,0 +1,221 @@
+import asyncio
+import logging
+import threading
+import uuid
+from collections import defaultdict
+from collections.abc import Iterable
+
+import sqlalchemy
+from sqlalchemy.orm import Session
+
+from ..sql_models.db_models import (
+    DataAccessRequestAclVersion,
+    DataAccessRequestWorkspaceVisibility,
+)
+from .session_manager import SessionManager
+
+logger = logging.getLogger(__name__)
+
+# Name of the workspace visibility list in DataAccessRequestAclVersion
+WORKSPACE_ACL_NAME = "workspace_visibility"
+_NOBODY: frozenset[uuid.UUID] = frozenset()
+
+
+def _as_uuid(value: uuid.UUID | str) -> uuid.UUID:
+    """Normalize UUIDs (columns are not mapped as UUID objects)."""
+    return value if isinstance(value, uuid.UUID) else uuid.UUID(str(value))
+
+
+def read_acl_version(session: Session) -> int:
+    """Current version of the workspace visibility (0 if never changed)."""
+    version = session.execute(
+        sqlalchemy.select(DataAccessRequestAclVersion.version).where(
+            DataAccessRequestAclVersion.acl_name == WORKSPACE_ACL_NAME
+        )
+    ).scalar_one_or_none()
+    return version or 0
+
+
+def bump_acl_version(session: Session) -> int:
+    """Increment the version of the workspace visibility within the transaction changing it
+    (the row stays locked until commit, hence concurrent changes get consecutive versions).
+    Args:
+        session (Session): Session for SQL Server.
+    Returns:
+        int: The new version.
+    """
+    version = session.execute(
+        sqlalchemy.update(DataAccessRequestAclVersion).where(
+            DataAccessRequestAclVersion.acl_name == WORKSPACE_ACL_NAME
+        ).values(
+            version=DataAccessRequestAclVersion.version + 1
+        ).returning(DataAccessRequestAclVersion.version)
+    ).scalar_one_or_none()
+    if version is None:
+        # The counter is created by create-tables.sql, this covers databases created otherwise
+        version = 1
+        session.execute(sqlalchemy.insert(DataAccessRequestAclVersion).values(
+            acl_name=WORKSPACE_ACL_NAME, version=version
+        ))
+    return version
+
+
+class WorkspaceAclIndex:
+    """Process-local copy of the workspace visibility (who can see which workspace) in both
+    directions, so permission checks are memory lookups instead of queries.
+
+    Changes made by this process are applied right after their commit, changes made by other
+    worker processes are detected by the version counter in the database (see watch). Sets
+    are never modified in place (they are replaced), so lookups need no locking."""
+
+    def __init__(self):
+        # Version of the visibility the index reflects (None until loaded)
+        self.version: int | None = None
+        self._user_to_workspaces: dict[uuid.UUID, frozenset[uuid.UUID]] = {}
+        self._workspace_to_users: dict[uuid.UUID, frozenset[uuid.UUID]] = {}
+        self._lock = threading.Lock()
+
+    @property
+    def is_loaded(self) -> bool:
+        return self.version is not None
+
+    def can_view(self, user_uuid: uuid.UUID, workspace_uuid: uuid.UUID) -> bool:
+        """Check if the user can see the workspace."""
+        return workspace_uuid in self._user_to_workspaces.get(user_uuid, _NOBODY)
+
+    def workspaces_of(self, user_uuid: uuid.UUID) -> frozenset[uuid.UUID]:
+        """Workspaces the user can see."""
+        return self._user_to_workspaces.get(user_uuid, _NOBODY)
+
+    def users_of(self, workspace_uuid: uuid.UUID) -> frozenset[uuid.UUID]:
+        """Users that can see the workspace."""
+        return self._workspace_to_users.get(workspace_uuid, _NOBODY)
+
+    def visibility_maps(self) -> dict[str, dict[uuid.UUID, list[uuid.UUID]]]:
+        """Both directions of the visibility (see WorkspacesVisibilityPerUserAndViceVersa)."""
+        with self._lock:
+            return {
+                "user_to_workspaces": {
+                    _user: list(_workspaces)
+                    for _user, _workspaces in self._user_to_workspaces.items()
+                },
+                "workspace_to_users": {
+                    _workspace: list(_users)
+                    for _workspace, _users in self._workspace_to_users.items()
+                },
+            }
+
+    def load(self, session: Session) -> None:
+        """Read the whole visibility with its version (blocking).
+        Args:
+            session (Session): Session for SQL Server.
+        """
+        # The version is read first, a change committed in between only causes another reload
+        version = read_acl_version(session)
+        user_to_workspaces = defaultdict(set)
+        workspace_to_users = defaultdict(set)
+        for _user_uuid, _workspace_uuid in session.execute(sqlalchemy.select(
+            DataAccessRequestWorkspaceVisibility.user_uuid,
+            DataAccessRequestWorkspaceVisibility.workspace_uuid,
+        )):
+            user_to_workspaces[_as_uuid(_user_uuid)].add(_as_uuid(_workspace_uuid))
+            workspace_to_users[_as_uuid(_workspace_uuid)].add(_as_uuid(_user_uuid))
+        with self._lock:
+            self._user_to_workspaces = {
+                _user: frozenset(_workspaces) for _user, _workspaces in user_to_workspaces.items()
+            }
+            self._workspace_to_users = {
+                _workspace: frozenset(_users) for _workspace, _users in workspace_to_users.items()
+            }
+            self.version = version
+
+    def ensure_loaded(self, session: Session) -> None:
+        """Load the index unless already loaded (blocking)."""
+        if not self.is_loaded:
+            self.load(session)
+
+    def refresh(self, session: Session) -> bool:
+        """Reload the index if the version in the database differs (blocking).
+        Returns:
+            bool: True if the index was reloaded.
+        """
+        if self.is_loaded and read_acl_version(session) == self.version:
+            return False
+        self.load(session)
+        return True
+
+    def _advance(self, version: int) -> None:
+        """Move to the version of the change just applied (under the lock). If the change
+        skipped a version (made by another process), the version is kept, so the next
+        refresh reloads everything."""
+        if self.version is not None and version == self.version + 1:
+            self.version = version
+
+    def set_workspace_users(self, workspace_uuid: uuid.UUID | str,
+                            user_uuids: Iterable[uuid.UUID | str], version: int) -> None:
+        """Apply the committed visibility of the workspace.
+        Args:
+            workspace_uuid (uuid.UUID | str): The workspace.
+            user_uuids (Iterable[uuid.UUID | str]): All users that can see it (empty if
+                the workspace was deleted).
+            version (int): Version created by the change (see bump_acl_version).
+        """
+        workspace_uuid = _as_uuid(workspace_uuid)
+        users = frozenset(_as_uuid(_user_uuid) for _user_uuid in user_uuids)
+        with self._lock:
+            previous_users = self._workspace_to_users.get(workspace_uuid, _NOBODY)
+            for _user_uuid in previous_users - users:
+                workspaces = self._user_to_workspaces[_user_uuid] - {workspace_uuid}
+                if workspaces:
+                    self._user_to_workspaces[_user_uuid] = workspaces
+                else:
+                    del self._user_to_workspaces[_user_uuid]
+            for _user_uuid in users - previous_users:
+                self._user_to_workspaces[_user_uuid] = (
+                    self._user_to_workspaces.get(_user_uuid, _NOBODY) | {workspace_uuid}
+                )
+            if users:
+                self._workspace_to_users[workspace_uuid] = users
+            else:
+                self._workspace_to_users.pop(workspace_uuid, None)
+            self._advance(version)
+
+    def remove_user(self, user_uuid: uuid.UUID | str, version: int) -> None:
+        """Apply the committed deletion of the user (with all its visibility)."""
+        user_uuid = _as_uuid(user_uuid)
+        with self._lock:
+            for _workspace_uuid in self._user_to_workspaces.pop(user_uuid, _NOBODY):
+                users = self._workspace_to_users[_workspace_uuid] - {user_uuid}
+                if users:
+                    self._workspace_to_users[_workspace_uuid] = users
+                else:
+                    del self._workspace_to_users[_workspace_uuid]
+            self._advance(version)
+
+    async def watch(self, interval: int) -> None:
+        """Load the index, then check the version every interval seconds and reload the
+        index when it changes (runs until cancelled, errors are only logged, 0 interval
+        only loads it)."""
+        while True:
+            try:
+                if await SessionManager.run_sync(self.refresh):
+                    logger.info("Workspace visibility version %s loaded", self.version)
+            except Exception as error:
+                logger.error("Workspace visibility cannot be loaded: %s", error)
+            if interval <= 0:
+                return
+            await asyncio.sleep(interval)
+
+
+# Single (process-wide) index of the workspace visibility
+WORKSPACE_ACL = WorkspaceAclIndex()
+
+
+async def workspace_acl() -> WorkspaceAclIndex:
+    """Dependency providing the workspace visibility index (loaded on the first use).
+    Returns:
+        WorkspaceAclIndex: The loaded index.
+    """
+    if not WORKSPACE_ACL.is_loaded:
+        await SessionManager.run_sync(WORKSPACE_ACL.ensure_loaded)
+    return WORKSPACE_ACL
@@ -0,0 +1,284 @@
+"""Builds the catalogue artifact (see write_catalogue_artifact) from the source files table
+by table: entries of catalogue.json are read one at a time and kept only in the packed form
+of the artifact writer, not as dicts. The SQL structure (reduced to the fields used by the
+catalogue) is loaded upfront and the builders of indexes, the document and the table
+summaries grow with each table, so the memory still grows with the catalogue.
+Tables whose inputs did not change since the previous artifact skip the n-gram extraction,
+their postings are copied from the search index of the previous artifact (everything else
+is built again).
+
+Usage:
+    python -m riocatalogue.build_catalogue --catalogue catalogue.json \
+        --number-of-rows rows.json --table-classification classification.json \
+        --primary-keys primary_keys.json --sql-structure sql_structure.json \
+        --output catalogue.bin
+"""
+import argparse
+import hashlib
+import json
+import resource
+import sys
+import time
+from array import array
+from collections.abc import Iterator
+from pathlib import Path
+
+from .catalogue_binary import ARTIFACT_MAGIC, CatalogueArtifact, CatalogueArtifactWriter
+from .create_catalogue import (
+    TABLE_SUMMARY_FIELDS,
+    create_table_entry,
+    render_json,
+    SearchIndexBuilder,
+    FuzzyIndexBuilder,
+    FacetsBuilder,
+    CatalogueDocumentBuilder,
+)
+
+# Size of blocks of source files read at once (in characters)
+READ_CHUNK_SIZE = 1 << 20
+
+
+class BuildReport:
+    """Summary of the build (printed by the command line interface)."""
+
+    def __init__(self, version: str, number_of_tables: int, reused_tables: int,
+                 build_seconds: float, peak_rss_mb: float):
+        self.version = version
+        self.number_of_tables = number_of_tables
+        # Tables with search postings copied from the previous artifact
+        self.reused_tables = reused_tables
+        self.build_seconds = build_seconds
+        self.peak_rss_mb = peak_rss_mb
+
+    def __str__(self) -> str:
+        return (f"Catalogue version {self.version}: {self.number_of_tables} tables "
+                f"({self.number_of_tables - self.reused_tables} indexed, "
+                f"{self.reused_tables} with reused search postings) in "
+                f"{self.build_seconds:.2f} s, "
+                f"peak RSS {self.peak_rss_mb:.0f} MB")
+
+
+def _iter_json_object(json_path: Path, chunk_size: int = READ_CHUNK_SIZE) \
+        -> Iterator[tuple[str, object]]:
+    """Read members of the top level JSON object one by one (without loading the file).
+    Args:
+        json_path (Path): Path to the file with a JSON object.
+        chunk_size (int): Number of characters read at once.
+    Raises:
+        ValueError: If the file is not a JSON object.
+    Returns:
+        Iterator[tuple[str, object]]: Keys and values of the object in the file order.
+    """
+    decoder = json.JSONDecoder()
+    with json_path.open(encoding="utf-8") as json_file:
+        buffer = json_file.read(chunk_size)
+        position = 0
+        end_of_file = not buffer
+        # Expected token: "{" at first, then a key or "}", then "," or "}"
+        expected = "{"
+        while True:
+            while position < len(buffer) and buffer[position].isspace():
+                position += 1
+            if position == len(buffer):
+                if end_of_file:
+                    raise ValueError(f"{json_path} ends before the end of the object")
+                buffer, position = buffer[position:] + json_file.read(chunk_size), 0
+                end_of_file = len(buffer) == 0
+                continue
+            token = buffer[position]
+            if expected == "{":
+                if token != "{":
+                    raise ValueError(f"{json_path} does not contain a JSON object")
+                position += 1
+                expected = "key"
+                continue
+            if token == "}" and expected in ("key", ","):
+                return
+            if expected == ",":
+                if token != ",":
+                    raise ValueError(f"{json_path}: ',' expected at {position}")
+                position += 1
+                expected = "member"
+                continue
+            try:
+                key, key_end = decoder.raw_decode(buffer, position)
+                colon = buffer.index(":", key_end)
+                value_start = colon + 1
+                while value_start < len(buffer) and buffer[value_start].isspace():
+                    value_start += 1
+                value, value_end = decoder.raw_decode(buffer, value_start)
+                # A value at the very end of the buffer might be cut (e.g. a number)
+                if value_end == len(buffer) and not end_of_file:
+                    raise json.JSONDecodeError("Value may continue", buffer, value_end)
+            except (json.JSONDecodeError, ValueError):
+                if end_of_file:
+                    raise ValueError(f"{json_path}: invalid member at {position}")
+                chunk = json_file.read(chunk_size)
+                buffer, position = buffer[position:] + chunk, 0
+                end_of_file = len(chunk) == 0
+                continue
+            yield key, value
+            position = value_end
+            expected = ","
+
+
+def _compact_structure(table_structure: dict) -> dict:
+    """Keep only fields of the table structure used by the catalogue (create_table_entry)."""
+    return {"columns": {
+        _col_name: {
+            "is_nullable": sys.intern(_column["is_nullable"]),
+            "data_type": sys.intern(_column["data_type"]),
+        }
+        for _col_name, _column in table_structure["columns"].items()
+    }}
+
+
+def _table_fingerprint(table_name: str, table_inputs: list) -> str:
+    """Hash of all inputs of the table (and the artifact format)."""
+    fingerprint = hashlib.blake2b(ARTIFACT_MAGIC, digest_size=16)
+    fingerprint.update(render_json([table_name, table_inputs]))
+    return fingerprint.hexdigest()
+
+
+def _reuse_search_postings(search_index_builder: SearchIndexBuilder,
+                           previous_artifact: CatalogueArtifact,
+                           reused_table_ids: dict[int, int]) -> None:
+    """Copy postings of the reused tables from the search index of the previous artifact.
+    Args:
+        search_index_builder (SearchIndexBuilder): Builder with reused tables added
+            without n-grams.
+        previous_artifact (CatalogueArtifact): The previous artifact.
+        reused_table_ids (dict[int, int]): Table identifier in the previous artifact ->
+            identifier in the new one.
+    """
+    previous_index = previous_artifact.search_index()
+    # Previous identifier -> new identifier (or -1 if the table is not reused)
+    new_table_ids = [-1] * len(previous_artifact.catalogue)
+    for _previous_id, _new_id in reused_table_ids.items():
+        new_table_ids[_previous_id] = _new_id
+    posting_offsets = previous_index.posting_offsets
+    postings = previous_index.postings
+    for _ngram_id, _ngram in enumerate(previous_index.ngrams):
+        table_ids = [
+            _new_id for _new_id in map(new_table_ids.__getitem__, postings[
+                posting_offsets[_ngram_id]:posting_offsets[_ngram_id + 1]
+            ]) if _new_id >= 0
+        ]
+        if table_ids:
+            search_index_builder.add_postings(_ngram, table_ids)
+
+
+def build_catalogue_artifact(artifact_path: Path, catalogue_path: Path,
+                             number_of_rows_per_table_path: Path,
+                             table_classification_path: Path, primary_keys_path: Path,
+                             sql_structure_path: Path, incremental: bool = True) -> BuildReport:
+    """Build the catalogue artifact from source files (see create_catalogue) table by table.
+    Args:
+        artifact_path (Path): Path to the artifact (replaced atomically).
+        catalogue_path (Path): Path to the catalogue.json file.
+        number_of_rows_per_table_path (Path): Path to the file with number of rows per table.
+        table_classification_path (Path): To the classification of tables.
+        primary_keys_path (Path): To the primary keys lists.
+        sql_structure_path (Path): To the data types and constraints for each column.
+        incremental (bool): Copy search postings of unchanged tables from the existing
+            artifact (if any).
+    Raises:
+        ValueError: If a source file is not a JSON object.
+    Returns:
+        BuildReport: Summary of the build.
+    """
+    started = time.perf_counter()
+    previous_artifact = None
+    previous_fingerprints = {}
+    if incremental and artifact_path.exists():
+        try:
+            previous_artifact = CatalogueArtifact(artifact_path)
+        except ValueError:
+            # Unknown (e.g. older) format, everything is rebuilt
+            pass
+        else:
+            previous_fingerprints = previous_artifact.table_fingerprints()
+
+    number_of_rows_per_table: dict = json.load(number_of_rows_per_table_path.open())
+    table_classification: dict = json.load(table_classification_path.open())
+    primary_keys: dict = json.load(primary_keys_path.open())
+    sql_structure = {
+        _table: _compact_structure(_structure)
+        for _table, _structure in _iter_json_object(sql_structure_path)
+        if table_classification[_table] != "not-imported"
+    }
+
+    artifact_writer = CatalogueArtifactWriter()
+    document_builder = CatalogueDocumentBuilder()
+    search_index_builder = SearchIndexBuilder()
+    fuzzy_index_builder = FuzzyIndexBuilder()
+    facets_builder = FacetsBuilder()
+    table_summaries = []
+    reused_table_ids = {}
+    for _table, _entry in _iter_json_object(catalogue_path):
+        if table_classification[_table] == "not-imported":
+            # Table classified as not-imported are skipped
+            continue
+        table_inputs = [_entry, number_of_rows_per_table[_table], table_classification[_table],
+                        primary_keys.get(_table), sql_structure[_table]]
+        fingerprint = _table_fingerprint(_table, table_inputs)
+        search_string = create_table_entry(_table, *table_inputs)
+        is_reused = previous_fingerprints.get(_table) == fingerprint
+        table_id = search_index_builder.add_table(
+            _table, _entry["columns"], search_string, index_ngrams=not is_reused
+        )
+        if is_reused:
+            reused_table_ids[previous_artifact.catalogue.table_ids[_table]] = table_id
+        artifact_writer.add_table(_table, _entry, search_string, fingerprint)
+        document_builder.add_table(_table, _entry, search_string)
+        fuzzy_index_builder.add_table(_table, _entry["columns"])
+        facets_builder.add_table(_table, _entry)
+        table_summaries.append(
+            {"table_name": _table} | {_field: _entry.get(_field) for _field in TABLE_SUMMARY_FIELDS}
+        )
+        # The structure is not needed anymore
+        del sql_structure[_table]
+
+    if reused_table_ids:
+        _reuse_search_postings(search_index_builder, previous_artifact, reused_table_ids)
+    artifact_writer.add_search_index(search_index_builder.build())
+    artifact_writer.add_fuzzy_index(fuzzy_index_builder.build())
+    artifact_writer.add_facets(facets_builder.build())
+    artifact_writer.add_document("catalogue", document_builder.document())
+    artifact_writer.add_document("table_summaries", render_json(table_summaries))
+    artifact_writer.write(artifact_path, document_builder.version)
+    return BuildReport(
+        document_builder.version, len(table_summaries), len(reused_table_ids),
+        time.perf_counter() - started,
+        # Kilobytes on Linux
+        resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+    )
+
+
+def main(arguments: list[str] | None = None) -> None:
+    """Command line interface (see the module docstring)."""
+    parser = argparse.ArgumentParser(description="Build the catalogue artifact.")
+    parser.add_argument("--catalogue", type=Path, required=True,
+                        help="Path to the catalogue.json file.")
+    parser.add_argument("--number-of-rows", type=Path, required=True,
+                        help="Path to the file with number of rows per table.")
+    parser.add_argument("--table-classification", type=Path, required=True,
+                        help="Path to the classification of tables.")
+    parser.add_argument("--primary-keys", type=Path, required=True,
+                        help="Path to the primary keys lists.")
+    parser.add_argument("--sql-structure", type=Path, required=True,
+                        help="Path to the data types and constraints for each column.")
+    parser.add_argument("--output", type=Path, required=True,
+                        help="Path to the artifact (CATALOGUE_ARTIFACT_PATH of the service).")
+    parser.add_argument("--full", action="store_true",
+                        help="Rebuild all tables (ignore the existing artifact).")
+    parsed_arguments = parser.parse_args(arguments)
+    print(build_catalogue_artifact(
+        parsed_arguments.output, parsed_arguments.catalogue, parsed_arguments.number_of_rows,
+        parsed_arguments.table_classification, parsed_arguments.primary_keys,
+        parsed_arguments.sql_structure, incremental=not parsed_arguments.full
+    ))
+
+
+if __name__ == "__main__":
+    main()
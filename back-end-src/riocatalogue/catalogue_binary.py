@@ -0,0 +1,434 @@
+import gzip
+import json
+import mmap
+import os
+import struct
+import sys
+from array import array
+from collections.abc import Iterator, Mapping
+from pathlib import Path
+
+import brotli
+
+from .catalogue_index import CatalogueSearchIndex, CatalogueFuzzyIndex
+from .catalogue_facets import CatalogueFacets
+
+# Identification of the file format (changes with the layout)
+ARTIFACT_MAGIC = b"RIOCAT05"
+# Sections start at multiples of 8 bytes (aligned for all array types)
+SECTION_ALIGNMENT = 8
+# Flags of columns packed into one byte (bit i stands for COLUMN_FLAGS[i])
+COLUMN_FLAGS = ("is_free_text", "is_identifiable", "is_client_id", "is_date_time", "is_date",
+                "is_nullable")
+# Fields of tables stored in arrays (the others are kept as JSON of each table)
+TABLE_ARRAY_FIELDS = ("number_of_rows", "table_classification", "primary_keys", "columns")
+# Bit of table flags set if the table has primary keys (otherwise they are None)
+TABLE_HAS_PRIMARY_KEYS = 1
+# Prefixes of sections with bitmaps of facets (followed by the facet value)
+FACET_BITMAP_PREFIXES = ("facet_flag:", "facet_data_type:", "facet_classification:")
+# Compression levels of documents (brotli above 9 is too slow for payloads of tens of MB)
+GZIP_COMPRESS_LEVEL = 9
+BROTLI_QUALITY = 7
+
+
+def encode_document(body: bytes | memoryview) -> dict[str, bytes]:
+    """Compress the serialized document in each supported content coding.
+    Args:
+        body (bytes | memoryview): Serialized document (e.g. the JSON response).
+    Returns:
+        dict[str, bytes]: Compressed bodies by their coding ("br", "gzip"), only those
+            smaller than the plain body.
+    """
+    encoded_bodies = {}
+    for _coding, _encoded_body in (
+        ("br", brotli.compress(body, quality=BROTLI_QUALITY)),
+        ("gzip", gzip.compress(body, compresslevel=GZIP_COMPRESS_LEVEL)),
+    ):
+        if len(_encoded_body) < len(body):
+            encoded_bodies[_coding] = _encoded_body
+    return encoded_bodies
+
+
+class StringTable:
+    """Strings stored back to back in UTF-8, offsets[i]:offsets[i + 1] delimits the string i.
+    """
+
+    def __init__(self, offsets: memoryview, data: memoryview):
+        self.offsets = offsets
+        self.data = data
+
+    def __getitem__(self, string_id: int) -> str:
+        return str(self.data[self.offsets[string_id]:self.offsets[string_id + 1]], "utf-8")
+
+
+class StringList:
+    """Read-only sequence of strings given by their identifiers in the string table (decoded
+    on access, so it can replace lists of strings in the indexes, including bisection)."""
+
+    def __init__(self, strings: StringTable, string_ids: memoryview):
+        self.strings = strings
+        self.string_ids = string_ids
+
+    def __len__(self) -> int:
+        return len(self.string_ids)
+
+    def __getitem__(self, position: int) -> str:
+        return self.strings[self.string_ids[position]]
+
+    def __iter__(self) -> Iterator[str]:
+        for _string_id in self.string_ids:
+            yield self.strings[_string_id]
+
+
+class _StringTableBuilder:
+    """Collects distinct strings for the string table (repeated strings, e.g. data types or
+    common column names, are stored only once)."""
+
+    def __init__(self):
+        self.string_ids: dict[str, int] = {}
+        self.offsets = array('I', [0])
+        self.data = bytearray()
+
+    def add(self, string: str) -> int:
+        """Return the identifier of the string (adds it if it is new)."""
+        string_id = self.string_ids.get(string)
+        if string_id is None:
+            string_id = self.string_ids[string] = len(self.offsets) - 1
+            self.data += string.encode("utf-8")
+            self.offsets.append(len(self.data))
+        return string_id
+
+    def add_all(self, strings) -> array:
+        """Return the array of identifiers of the strings."""
+        return array('I', map(self.add, strings))
+
+
+class CatalogueArtifactWriter:
+    """Creates the binary catalogue artifact: a header (ARTIFACT_MAGIC, length of the JSON
+    directory and the directory with the version and position, length and array type of
+    each section) followed by the sections (arrays of numbers or bytes). Tables and columns
+    are stored as arrays of fields (strings by identifiers in a shared string table)."""
+
+    def __init__(self):
+        self.strings = _StringTableBuilder()
+        # Sections of tables and columns are filled table by table (see add_table)
+        self.sections: dict[str, array | bytes] = {
+            "table_names": array('I'),
+            "table_other_fields": array('I'),
+            "table_rows": array('q'),
+            "table_classifications": array('I'),
+            "table_flags": array('B'),
+            "table_fingerprints": array('I'),
+            "primary_key_offsets": array('I', [0]),
+            "primary_keys": array('I'),
+            "column_offsets": array('I', [0]),
+            "column_names": array('I'),
+            "column_descriptions": array('I'),
+            "column_data_types": array('I'),
+            "column_flags": array('B'),
+            "search_strings": array('I'),
+        }
+
+    def add_table(self, table_name: str, table_entry: dict, search_string: str,
+                  fingerprint: str = "") -> None:
+        """Add the table with its columns and search string.
+        Args:
+            table_name (str): Name of the table.
+            table_entry (dict): Entry of the table in the shape of create_catalogue output.
+            search_string (str): Search string of the table (see create_catalogue).
+            fingerprint (str): Fingerprint of inputs the entry was created from (allows
+                incremental builds to copy search postings of the table, see
+                build_catalogue).
+        """
+        sections = self.sections
+        sections["table_names"].append(self.strings.add(table_name))
+        sections["table_other_fields"].append(self.strings.add(json.dumps({
+            _field: _value for _field, _value in table_entry.items()
+            if _field not in TABLE_ARRAY_FIELDS
+        }, ensure_ascii=False)))
+        sections["table_rows"].append(table_entry["number_of_rows"])
+        sections["table_classifications"].append(
+            self.strings.add(table_entry["table_classification"])
+        )
+        sections["table_flags"].append(
+            0 if table_entry["primary_keys"] is None else TABLE_HAS_PRIMARY_KEYS
+        )
+        sections["table_fingerprints"].append(self.strings.add(fingerprint))
+        sections["primary_keys"].extend(self.strings.add_all(table_entry["primary_keys"] or []))
+        sections["primary_key_offsets"].append(len(sections["primary_keys"]))
+        for _col_name, _column in table_entry["columns"].items():
+            sections["column_names"].append(self.strings.add(_col_name))
+            sections["column_descriptions"].append(self.strings.add(_column["description"]))
+            sections["column_data_types"].append(self.strings.add(_column["data_type"]))
+            sections["column_flags"].append(sum(
+                1 << _bit for _bit, _flag in enumerate(COLUMN_FLAGS) if _column[_flag]
+            ))
+        sections["column_offsets"].append(len(sections["column_names"]))
+        sections["search_strings"].append(self.strings.add(search_string))
+
+    def add_catalogue(self, catalogue: dict, search_catalogue: dict) -> None:
+        """Add tables and columns of the catalogue and search strings of tables.
+        Args:
+            catalogue (dict): First output of create_catalogue (the full catalogue).
+            search_catalogue (dict): Second output of create_catalogue (table -> search string).
+        """
+        for _table, _entry in catalogue.items():
+            self.add_table(_table, _entry, search_catalogue[_table])
+
+    def add_search_index(self, search_index: CatalogueSearchIndex) -> None:
+        """Add arrays of the inverted index (n-grams to the string table)."""
+        self.sections.update({
+            "search_ngrams": self.strings.add_all(search_index.ngrams),
+            "search_posting_offsets": search_index.posting_offsets,
+            "search_postings": search_index.postings,
+            "search_table_field_offsets": search_index.table_field_offsets,
+            "search_field_offsets": search_index.field_offsets,
+        })
+
+    def add_fuzzy_index(self, fuzzy_index: CatalogueFuzzyIndex) -> None:
+        """Add arrays of the trigram index (names and trigrams to the string table)."""
+        self.sections.update({
+            "fuzzy_names": self.strings.add_all(fuzzy_index.names),
+            "fuzzy_name_trigram_counts": fuzzy_index.name_trigram_counts,
+            "fuzzy_trigrams": self.strings.add_all(fuzzy_index.trigrams),
+            "fuzzy_posting_offsets": fuzzy_index.posting_offsets,
+            "fuzzy_postings": fuzzy_index.postings,
+            "fuzzy_name_offsets": fuzzy_index.name_offsets,
+            "fuzzy_occurrence_tables": fuzzy_index.occurrence_tables,
+            "fuzzy_occurrence_columns": fuzzy_index.occurrence_columns,
+        })
+
+    def add_facets(self, facets: CatalogueFacets) -> None:
+        """Add bitmaps of facets (as little-endian bytes) and the order of tables by rows."""
+        bitmap_size = (len(facets.table_names) + 7) // 8
+        for _prefix, _bitmaps in zip(FACET_BITMAP_PREFIXES, (facets.flag_bitmaps,
+                                                             facets.data_type_bitmaps,
+                                                             facets.classification_bitmaps)):
+            for _value, _bitmap in _bitmaps.items():
+                self.sections[f"{_prefix}{_value}"] = _bitmap.to_bytes(bitmap_size, "little")
+        self.sections.update({
+            "facet_rows_order": facets.rows_order,
+            "facet_sorted_rows": facets.sorted_rows,
+            "facet_rows_checkpoints": b"".join(
+                _bitmap.to_bytes(bitmap_size, "little") for _bitmap in facets.rows_checkpoints
+            ),
+        })
+
+    def add_document(self, name: str, body: bytes) -> None:
+        """Add the serialized document (e.g. the JSON response with the whole catalogue) and
+        its compressed bodies (see encode_document), so the service does not compress it."""
+        self.sections[f"document_{name}"] = body
+        for _coding, _encoded_body in encode_document(body).items():
+            self.sections[f"document_{name}.{_coding}"] = _encoded_body
+
+    def write(self, artifact_path: Path, version: str) -> None:
+        """Write the artifact, the file is replaced atomically (the previous file stays
+        readable for processes that have it mapped).
+        Args:
+            artifact_path (Path): Path to the artifact.
+            version (str): Version of the catalogue.
+        """
+        sections = self.sections | {
+            "string_offsets": self.strings.offsets,
+            "string_data": bytes(self.strings.data),
+        }
+        directory = {"version": version, "byteorder": sys.byteorder, "sections": {}}
+        # Sections are placed after the header (padded directory length is reserved upfront)
+        position = 0
+        for _name, _section in sections.items():
+            typecode = _section.typecode if isinstance(_section, array) else "B"
+            size = len(_section) * (_section.itemsize if isinstance(_section, array) else 1)
+            directory["sections"][_name] = [position, size, typecode]
+            position += -(-size // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+        directory_bytes = json.dumps(directory).encode("utf-8")
+        header_size = len(ARTIFACT_MAGIC) + 8 + len(directory_bytes)
+        header_size = -(-header_size // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+        temporary_path = artifact_path.with_name(f"{artifact_path.name}.{os.getpid()}.tmp")
+        with temporary_path.open("wb") as artifact_file:
+            artifact_file.write(ARTIFACT_MAGIC)
+            artifact_file.write(struct.pack("<Q", len(directory_bytes)))
+            artifact_file.write(directory_bytes)
+            for _name, _section in sections.items():
+                artifact_file.seek(header_size + directory["sections"][_name][0])
+                artifact_file.write(_section)
+            # Padding of the last section
+            artifact_file.truncate(header_size + position)
+        os.replace(temporary_path, artifact_path)
+
+
+class MappedCatalogue(Mapping):
+    """Read-only catalogue (table name -> entry in the shape of create_catalogue output)
+    reading tables from the sections of the artifact (memory mapped or packed in memory,
+    see pack_catalogue), each entry is created only when accessed."""
+
+    # Values of column flags for each packed flags byte
+    COLUMN_FLAG_VALUES = [
+        {_flag: bool(_flags >> _bit & 1) for _bit, _flag in enumerate(COLUMN_FLAGS)}
+        for _flags in range(1 << len(COLUMN_FLAGS))
+    ]
+
+    def __init__(self, strings: StringTable | list[str],
+                 sections: dict[str, memoryview | array]):
+        self.strings = strings
+        self.sections = sections
+        self.table_names = StringList(strings, sections["table_names"])
+        self.table_ids = {_table: _table_id for _table_id, _table in enumerate(self.table_names)}
+
+    def __len__(self) -> int:
+        return len(self.table_ids)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.table_ids)
+
+    def __contains__(self, table_name: object) -> bool:
+        return table_name in self.table_ids
+
+    def __getitem__(self, table_name: str) -> dict:
+        return self.table_entry(self.table_ids[table_name])
+
+    def column_names(self, table_id: int) -> StringList:
+        """Names of columns of the table in their order (without creating its entry)."""
+        column_offsets = self.sections["column_offsets"]
+        return StringList(self.strings, self.sections["column_names"][
+            column_offsets[table_id]:column_offsets[table_id + 1]
+        ])
+
+    def table_entry(self, table_id: int) -> dict:
+        """Create the entry of the table (a new dict, changes do not affect the catalogue)."""
+        sections = self.sections
+        strings = self.strings
+        primary_keys = None
+        if sections["table_flags"][table_id] & TABLE_HAS_PRIMARY_KEYS:
+            primary_key_offsets = sections["primary_key_offsets"]
+            primary_keys = [strings[_string_id] for _string_id in sections["primary_keys"][
+                primary_key_offsets[table_id]:primary_key_offsets[table_id + 1]
+            ]]
+        columns_slice = slice(sections["column_offsets"][table_id],
+                              sections["column_offsets"][table_id + 1])
+        columns = {
+            strings[_name_id]: {
+                "description": strings[_description_id],
+                **self.COLUMN_FLAG_VALUES[_flags],
+                "data_type": strings[_data_type_id],
+            }
+            for _name_id, _description_id, _flags, _data_type_id in zip(
+                sections["column_names"][columns_slice],
+                sections["column_descriptions"][columns_slice],
+                sections["column_flags"][columns_slice],
+                sections["column_data_types"][columns_slice],
+            )
+        }
+        return json.loads(strings[sections["table_other_fields"][table_id]]) | {
+            "number_of_rows": sections["table_rows"][table_id],
+            "table_classification": strings[sections["table_classifications"][table_id]],
+            "primary_keys": primary_keys,
+            "columns": columns,
+        }
+
+
+def pack_catalogue(catalogue: dict, search_catalogue: dict) -> MappedCatalogue:
+    """Pack the catalogue into arrays of the artifact kept in memory: columns are stored
+    as arrays of string identifiers and packed flags instead of a dict per column, and
+    each distinct string (e.g. a data type) is held only once.
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+        search_catalogue (dict): Second output of create_catalogue (table -> search string).
+    Returns:
+        MappedCatalogue: Catalogue creating entries of tables when accessed.
+    """
+    artifact_writer = CatalogueArtifactWriter()
+    artifact_writer.add_catalogue(catalogue, search_catalogue)
+    # Identifiers of strings follow the order they were added in (the same string objects
+    #   as in the catalogue are referenced, they are not copied)
+    return MappedCatalogue(list(artifact_writer.strings.string_ids), artifact_writer.sections)
+
+
+class CatalogueArtifact:
+    """Catalogue artifact (see CatalogueArtifactWriter) opened by mmap: all processes
+    reading the same file share its pages (in the page cache) instead of holding their
+    own copies of the catalogue, search strings and indexes."""
+
+    def __init__(self, artifact_path: Path):
+        with artifact_path.open("rb") as artifact_file:
+            self.buffer = mmap.mmap(artifact_file.fileno(), 0, access=mmap.ACCESS_READ)
+        directory_start = len(ARTIFACT_MAGIC) + 8
+        if len(self.buffer) < directory_start or \
+                self.buffer[:len(ARTIFACT_MAGIC)] != ARTIFACT_MAGIC:
+            raise ValueError(f"{artifact_path} is not a catalogue artifact")
+        (directory_size,) = struct.unpack_from("<Q", self.buffer, len(ARTIFACT_MAGIC))
+        directory = json.loads(self.buffer[directory_start:directory_start + directory_size])
+        if directory["byteorder"] != sys.byteorder:
+            raise ValueError(f"{artifact_path} was created on a different architecture")
+        header_size = directory_start + directory_size
+        header_size = -(-header_size // SECTION_ALIGNMENT) * SECTION_ALIGNMENT
+
+        self.version: str = directory["version"]
+        buffer_view = memoryview(self.buffer)
+        self.sections: dict[str, memoryview] = {}
+        for _name, (_position, _size, _typecode) in directory["sections"].items():
+            start = header_size + _position
+            if start + _size > len(self.buffer):
+                raise ValueError(f"{artifact_path} is truncated")
+            self.sections[_name] = buffer_view[start:start + _size].cast(_typecode)
+        self.strings = StringTable(self.sections["string_offsets"], self.sections["string_data"])
+        self.catalogue = MappedCatalogue(self.strings, self.sections)
+
+    def table_fingerprints(self) -> dict[str, str]:
+        """Fingerprints of inputs of tables (table name -> fingerprint, see add_table)."""
+        return dict(zip(self.catalogue.table_names, self._strings("table_fingerprints")))
+
+    def _strings(self, name: str) -> StringList:
+        """Strings of the section with string identifiers."""
+        return StringList(self.strings, self.sections[name])
+
+    def search_index(self) -> CatalogueSearchIndex:
+        """Inverted index reading its arrays and search strings from the artifact."""
+        return CatalogueSearchIndex(
+            self.catalogue.table_names, self._strings("search_strings"),
+            self._strings("search_ngrams"), self.sections["search_posting_offsets"],
+            self.sections["search_postings"], self.sections["search_table_field_offsets"],
+            self.sections["search_field_offsets"]
+        )
+
+    def fuzzy_index(self) -> CatalogueFuzzyIndex:
+        """Trigram index reading its arrays from the artifact."""
+        return CatalogueFuzzyIndex(
+            self.catalogue.table_names, self._strings("fuzzy_names"),
+            self.sections["fuzzy_name_trigram_counts"], self._strings("fuzzy_trigrams"),
+            self.sections["fuzzy_posting_offsets"], self.sections["fuzzy_postings"],
+            self.sections["fuzzy_name_offsets"], self.sections["fuzzy_occurrence_tables"],
+            self.sections["fuzzy_occurrence_columns"]
+        )
+
+    def facets(self) -> CatalogueFacets:
+        """Facets with bitmaps loaded from the artifact (order of tables stays mapped)."""
+        bitmaps = {_prefix: {} for _prefix in FACET_BITMAP_PREFIXES}
+        for _name, _section in self.sections.items():
+            prefix, separator, value = _name.partition(":")
+            if separator and f"{prefix}:" in bitmaps:
+                bitmaps[f"{prefix}:"][value] = int.from_bytes(_section, "little")
+        bitmap_size = (len(self.catalogue) + 7) // 8
+        rows_checkpoints = self.sections["facet_rows_checkpoints"]
+        if bitmap_size:
+            checkpoints = [
+                int.from_bytes(rows_checkpoints[_start:_start + bitmap_size], "little")
+                for _start in range(0, len(rows_checkpoints), bitmap_size)
+            ]
+        else:
+            # Empty catalogue, its only checkpoint (stored in no bytes) has no tables
+            checkpoints = [0]
+        return CatalogueFacets(
+            self.catalogue.table_names, *bitmaps.values(), self.sections["facet_rows_order"],
+            self.sections["facet_sorted_rows"], checkpoints
+        )
+
+    def document(self, name: str) -> memoryview:
+        """Serialized document added by CatalogueArtifactWriter.add_document."""
+        return self.sections[f"document_{name}"]
+
+    def encoded_documents(self, name: str) -> dict[str, memoryview]:
+        """Compressed bodies of the document by their coding (see encode_document)."""
+        prefix = f"document_{name}."
+        return {_name.removeprefix(prefix): _section for _name, _section in self.sections.items()
+                if _name.startswith(prefix)}
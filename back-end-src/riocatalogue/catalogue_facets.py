@@ -0,0 +1,108 @@
+from array import array
+from bisect import bisect_left
+
+from .catalogue_index import bitmap_to_ids
+
+# Flags of columns used as facets: the table has (or has not) any column with the flag
+COLUMN_FLAG_FACETS = ("is_identifiable", "is_client_id", "is_free_text", "is_date_time")
+
+# Every ROWS_CHECKPOINT_STEP-th table (ordered by number of rows) has a precomputed
+#   bitmap of all tables with at least its number of rows
+ROWS_CHECKPOINT_STEP = 64
+
+
+class CatalogueFacets:
+    """Facets of catalogue tables as bitmaps (Python integers, bit i stands for the table
+    at position i in the catalogue), so filters are combined by bitwise operations and
+    counted by bit_count() instead of scanning tables.
+
+    For the number of rows, rows_order lists tables ordered by the number of rows
+    (sorted_rows) and rows_checkpoints[c] contains tables from the position
+    c * ROWS_CHECKPOINT_STEP of this order to its end."""
+
+    def __init__(self, table_names: list[str], flag_bitmaps: dict[str, int],
+                 data_type_bitmaps: dict[str, int], classification_bitmaps: dict[str, int],
+                 rows_order: array, sorted_rows: array, rows_checkpoints: list[int]):
+        self.table_names = table_names
+        self.flag_bitmaps = flag_bitmaps
+        self.data_type_bitmaps = data_type_bitmaps
+        self.classification_bitmaps = classification_bitmaps
+        self.rows_order = rows_order
+        self.sorted_rows = sorted_rows
+        self.rows_checkpoints = rows_checkpoints
+        self.all_tables = (1 << len(table_names)) - 1
+
+    def table_names_of(self, tables: int) -> list[str]:
+        """Names of tables in the bitmap (in the order of the catalogue)."""
+        return [self.table_names[_table_id] for _table_id in bitmap_to_ids(tables)]
+
+    def rows_at_least(self, minimal_rows: int) -> int:
+        """Bitmap of tables with at least minimal_rows rows."""
+        position = bisect_left(self.sorted_rows, minimal_rows)
+        # Closest checkpoint and the few tables before it
+        checkpoint = -(-position // ROWS_CHECKPOINT_STEP)
+        tables = self.rows_checkpoints[checkpoint]
+        for _position in range(position, min(checkpoint * ROWS_CHECKPOINT_STEP,
+                                             len(self.rows_order))):
+            tables |= 1 << self.rows_order[_position]
+        return tables
+
+    def filter(self, flags: dict[str, bool | None], data_types: list[str],
+               classifications: list[str], min_rows: int | None, max_rows: int | None
+               ) -> int | None:
+        """Select tables matching all the facets (any of values within a facet).
+        Args:
+            flags (dict[str, bool | None]): For flags in COLUMN_FLAG_FACETS, True selects tables
+                having a column with the flag, False tables without it, None does not filter.
+            data_types (list[str]): Tables having a column of any of these data types.
+            classifications (list[str]): Tables with any of these classifications.
+            min_rows (int | None): Minimal number of rows.
+            max_rows (int | None): Maximal number of rows.
+        Returns:
+            int | None: Bitmap of selected tables, None if nothing is filtered.
+        """
+        selected = self.all_tables
+        filtered = False
+        for _flag, _value in flags.items():
+            if _value is not None:
+                filtered = True
+                selected &= self.flag_bitmaps[_flag] if _value else ~self.flag_bitmaps[_flag]
+        for _bitmaps, _values in ((self.data_type_bitmaps, data_types),
+                                  (self.classification_bitmaps, classifications)):
+            if _values:
+                filtered = True
+                any_value = 0
+                for _value in _values:
+                    any_value |= _bitmaps.get(_value, 0)
+                selected &= any_value
+        if min_rows is not None:
+            filtered = True
+            selected &= self.rows_at_least(min_rows)
+        if max_rows is not None:
+            filtered = True
+            selected &= ~self.rows_at_least(max_rows + 1)
+        return selected if filtered else None
+
+    def counts(self, tables: int) -> dict[str, dict[str, int]]:
+        """Count tables per facet value.
+        Args:
+            tables (int): Bitmap of tables to be counted (e.g. search results).
+        Returns:
+            dict[str, dict[str, int]]: Facet -> value -> number of tables.
+        """
+        facet_counts = {}
+        for _flag, _bitmap in self.flag_bitmaps.items():
+            with_flag = (tables & _bitmap).bit_count()
+            facet_counts[_flag] = {
+                "true": with_flag,
+                "false": tables.bit_count() - with_flag,
+            }
+        facet_counts["data_type"] = {
+            _value: (tables & _bitmap).bit_count()
+            for _value, _bitmap in self.data_type_bitmaps.items()
+        }
+        facet_counts["table_classification"] = {
+            _value: (tables & _bitmap).bit_count()
+            for _value, _bitmap in self.classification_bitmaps.items()
+        }
+        return facet_counts
@@ -0,0 +1,412 @@
+import heapq
+from array import array
+from bisect import bisect_left, bisect_right
+from math import ceil, floor
+
+# Maximal length of n-grams in the inverted index (shorter n-grams are indexed as well,
+#   so queries of 1 or 2 characters are resolved by their own posting list)
+NGRAM_LENGTH = 3
+
+# Separator of fields in search strings: the ASCII unit separator is whitespace for str.split,
+#   so no search term contains it and n-grams containing it are not indexed (a match can
+#   never span two fields)
+FIELD_SEPARATOR = "\x1f"
+
+# Weights of matches in the ranked search (per search term and matching field)
+TABLE_NAME_WEIGHT = 10
+COLUMN_NAME_WEIGHT = 3
+COLUMN_DESCRIPTION_WEIGHT = 1
+
+# Similarity (of trigram sets) needed for a name to match in the fuzzy search by default
+DEFAULT_SIMILARITY_THRESHOLD = 0.4
+
+# Posting lists of the fuzzy index longer than 1/32 of names are kept also as bitmaps
+#   (then the bitmap is not bigger than the array of 4 bytes long identifiers)
+BITMAP_POSTING_RATIO = 32
+
+
+def text_ngrams(text: str) -> set[str]:
+    """Collect all distinct n-grams (of length 1 up to NGRAM_LENGTH) of fields of the text.
+    Args:
+        text (str): Lowercase search string (fields joined by FIELD_SEPARATOR).
+    Returns:
+        set[str]: Distinct n-grams (none of them contains FIELD_SEPARATOR).
+    """
+    ngrams = set()
+    for _length in range(1, NGRAM_LENGTH + 1):
+        # Zipping shifted copies of the text is much faster than slicing for long strings
+        ngrams.update(map("".join, zip(*(text[_shift:] for _shift in range(_length)))))
+    # Dropped afterwards, there are far fewer distinct n-grams than fields
+    return {_ngram for _ngram in ngrams if FIELD_SEPARATOR not in _ngram}
+
+
+def query_ngrams(term: str) -> set[str]:
+    """N-grams that must be contained in every search string containing the term.
+    Args:
+        term (str): Lowercase search term.
+    Returns:
+        set[str]: The term itself if it is short, otherwise all its n-grams of NGRAM_LENGTH.
+    """
+    if len(term) <= NGRAM_LENGTH:
+        return {term}
+    return {term[_i:_i + NGRAM_LENGTH] for _i in range(len(term) - NGRAM_LENGTH + 1)}
+
+
+def ids_to_bitmap(ids: array, size: int) -> int:
+    """Convert identifiers into a bitmap (Python integer with the bit i set for each id i).
+    Args:
+        ids (array): Identifiers (smaller than size).
+        size (int): Number of all identifiers.
+    Returns:
+        int: The bitmap.
+    """
+    bits = bytearray((size + 7) // 8)
+    for _id in ids:
+        bits[_id >> 3] |= 1 << (_id & 7)
+    return int.from_bytes(bits, "little")
+
+
+def bitmap_to_ids(bitmap: int) -> list[int]:
+    """Positions of set bits of the bitmap (in ascending order)."""
+    # Binary representation starting from the least significant bit
+    bits = bin(bitmap)[:1:-1]
+    ids = []
+    position = bits.find("1")
+    while position != -1:
+        ids.append(position)
+        position = bits.find("1", position + 1)
+    return ids
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase the name and drop everything except letters and digits, so that
+    e.g. "Date of birth", "date_of_birth" and "DateOfBirth" are equal.
+    Args:
+        name (str): Name of table or column (or the search query).
+    Returns:
+        str: Normalized name.
+    """
+    return "".join(filter(str.isalnum, name.lower()))
+
+
+def name_trigrams(name: str) -> set[str]:
+    """Trigrams of the normalized name, padded (two spaces before, one after) so that
+    the beginning and the end of the name carry more weight.
+    Args:
+        name (str): Normalized name.
+    Returns:
+        set[str]: Distinct trigrams (empty for an empty name).
+    """
+    if not name:
+        return set()
+    padded_name = f"  {name} "
+    return set(map("".join, zip(padded_name, padded_name[1:], padded_name[2:])))
+
+
+class CatalogueSearchIndex:
+    """Inverted index mapping n-grams to tables (identified by their position in the catalogue)
+    whose search string contains them. The n-grams are sorted and posting lists are stored
+    back to back in a single array, posting_offsets[i]:posting_offsets[i + 1] delimits the
+    list of ngrams[i].
+
+    Similarly, field_offsets[table_field_offsets[t]:table_field_offsets[t + 1]] are the
+    starting positions of fields (table name, then names of all columns and then their
+    descriptions) in the search string of the table t."""
+
+    def __init__(self, table_names: list[str], search_strings: list[str], ngrams: list[str],
+                 posting_offsets: array, postings: array,
+                 table_field_offsets: array, field_offsets: array):
+        self.table_names = table_names
+        self.search_strings = search_strings
+        self.ngrams = ngrams
+        self.posting_offsets = posting_offsets
+        self.postings = postings
+        self.table_field_offsets = table_field_offsets
+        self.field_offsets = field_offsets
+
+    def posting_list(self, ngram: str) -> array:
+        """Return the (ascending) identifiers of tables containing the n-gram."""
+        position = bisect_left(self.ngrams, ngram)
+        if position == len(self.ngrams) or self.ngrams[position] != ngram:
+            return array('I')
+        return self.postings[self.posting_offsets[position]:self.posting_offsets[position + 1]]
+
+    @staticmethod
+    def search_terms(search: str) -> list[str]:
+        """Split the query into lowercase words (whitespace only query is kept as it is)."""
+        search_lower = search.lower()
+        return search_lower.split() or [search_lower]
+
+    def candidates(self, terms: list[str], table_ids: set[int] | None = None) -> list[int]:
+        """Intersect posting lists of all n-grams of the terms (starting from the shortest).
+        Args:
+            terms (list[str]): Lowercase search terms.
+            table_ids (set[int] | None): If set, only these tables are considered.
+        Returns:
+            list[int]: Ascending identifiers of tables that may contain all terms.
+        """
+        posting_lists = sorted(
+            (self.posting_list(_ngram) for _term in terms for _ngram in query_ngrams(_term)),
+            key=len
+        )
+        candidates = set(posting_lists[0])
+        if table_ids is not None:
+            candidates.intersection_update(table_ids)
+        for _posting_list in posting_lists[1:]:
+            if not candidates:
+                break
+            candidates.intersection_update(_posting_list)
+        return sorted(candidates)
+
+    def search_ids(self, search: str, table_ids: set[int] | None = None) -> list[int]:
+        """Find tables whose search string contains every word of the query (AND semantics).
+        Args:
+            search (str): Query as typed by the user (case-insensitive).
+            table_ids (set[int] | None): If set, only these tables are searched.
+        Returns:
+            list[int]: Ascending identifiers of matching tables.
+        """
+        terms = self.search_terms(search)
+        # N-grams are only a necessary condition for longer terms, verify the substring
+        #   on candidates (the short terms are indexed as they are)
+        long_terms = [_term for _term in terms if len(_term) > NGRAM_LENGTH]
+        return [
+            _table_id for _table_id in self.candidates(terms, table_ids)
+            if all(_term in self.search_strings[_table_id] for _term in long_terms)
+        ]
+
+    def search(self, search: str, table_ids: set[int] | None = None) -> list[str]:
+        """Same as search_ids, but returns names of the tables (in the order of the catalogue).
+        """
+        return [self.table_names[_table_id] for _table_id in self.search_ids(search, table_ids)]
+
+    def _table_fields(self, table_id: int) -> tuple[str, array, int]:
+        """Return the search string, starting positions of its fields and number of columns."""
+        field_offsets = self.field_offsets[
+            self.table_field_offsets[table_id]:self.table_field_offsets[table_id + 1]
+        ]
+        return self.search_strings[table_id], field_offsets, (len(field_offsets) - 1) // 2
+
+    def _score_table(self, table_id: int, terms: list[str]) -> int:
+        """Score the table against all terms, returns zero if any term is missing."""
+        search_string, field_offsets, number_of_columns = self._table_fields(table_id)
+        # Column names and descriptions are continuous parts of the search string
+        #   (each part ends by FIELD_SEPARATOR)
+        names_start = descriptions_start = len(search_string) + 1
+        if number_of_columns:
+            names_start = field_offsets[1]
+            descriptions_start = field_offsets[number_of_columns + 1]
+        score = 0
+        for _term in terms:
+            term_score = (
+                TABLE_NAME_WEIGHT * (search_string.find(_term, 0, names_start - 1) != -1)
+                + COLUMN_NAME_WEIGHT * search_string.count(
+                    _term, names_start, descriptions_start - 1
+                )
+                + COLUMN_DESCRIPTION_WEIGHT * search_string.count(_term, descriptions_start)
+            )
+            if not term_score:
+                return 0
+            score += term_score
+        return score
+
+    def _matched_columns(self, table_id: int, terms: list[str]) -> list[int]:
+        """Positions of columns whose name or description contains any of the terms."""
+        search_string, field_offsets, number_of_columns = self._table_fields(table_id)
+        matched_columns = set()
+        for _term in terms:
+            position = search_string.find(_term, field_offsets[1] if number_of_columns else 0)
+            while number_of_columns and position != -1:
+                field = bisect_right(field_offsets, position) - 1
+                # Fields 1..n are column names, n+1..2n their descriptions
+                matched_columns.add((field - 1) % number_of_columns)
+                # Every field counts once, continue in the next one
+                if field + 1 == len(field_offsets):
+                    break
+                position = search_string.find(_term, field_offsets[field + 1])
+        return sorted(matched_columns)
+
+    def rank(self, search: str, limit: int, offset: int = 0,
+             table_ids: set[int] | None = None
+             ) -> tuple[list[int], list[tuple[str, int, list[int]]]]:
+        """Score tables containing every word of the query and select the best ones.
+        Args:
+            search (str): Query as typed by the user (case-insensitive).
+            limit (int): Maximal number of returned tables.
+            offset (int): Number of best scoring tables to skip.
+            table_ids (set[int] | None): If set, only these tables are searched.
+        Returns:
+            tuple[list[int], list[tuple[str, int, list[int]]]]: Identifiers of all matching
+                tables and the selected ones as (table name, score, positions of matching
+                columns), ordered by score (ties in the order of the catalogue).
+        """
+        terms = self.search_terms(search)
+        scored_tables = []
+        for _table_id in self.candidates(terms, table_ids):
+            score = self._score_table(_table_id, terms)
+            if score:
+                scored_tables.append((score, -_table_id))
+        # Only the top of the heap is ordered
+        best_tables = heapq.nlargest(offset + limit, scored_tables)
+        return [-_table_id for _score, _table_id in scored_tables], [
+            (self.table_names[-_table_id], score, self._matched_columns(-_table_id, terms))
+            for score, _table_id in best_tables[offset:]
+        ]
+
+
+class CatalogueFuzzyIndex:
+    """Trigram index of distinct normalized names of tables and columns, used for the typo
+    tolerant search. Similarity of two names is the Jaccard index of their trigram sets.
+
+    Names are ordered by their number of trigrams (name_trigram_counts is ascending).
+    Posting lists (trigram -> ascending identifiers of names) are stored like in
+    CatalogueSearchIndex. Occurrences of the name ni are
+    occurrence_tables/occurrence_columns[name_offsets[ni]:name_offsets[ni + 1]], where
+    the column position -1 stands for the table name."""
+
+    def __init__(self, table_names: list[str], names: list[str], name_trigram_counts: array,
+                 trigrams: list[str], posting_offsets: array, postings: array,
+                 name_offsets: array, occurrence_tables: array, occurrence_columns: array):
+        self.table_names = table_names
+        self.names = names
+        self.name_trigram_counts = name_trigram_counts
+        self.trigrams = trigrams
+        self.posting_offsets = posting_offsets
+        self.postings = postings
+        self.name_offsets = name_offsets
+        self.occurrence_tables = occurrence_tables
+        self.occurrence_columns = occurrence_columns
+        # Bitmaps of the frequent trigrams (the others are converted when searched)
+        self.posting_bitmaps = {}
+        for _position in range(len(trigrams)):
+            posting_list = self.postings[
+                self.posting_offsets[_position]:self.posting_offsets[_position + 1]
+            ]
+            if len(posting_list) * BITMAP_POSTING_RATIO > len(names):
+                self.posting_bitmaps[_position] = ids_to_bitmap(posting_list, len(names))
+
+    def posting_bitmap(self, trigram: str) -> int:
+        """Return the bitmap of names containing the trigram."""
+        position = bisect_left(self.trigrams, trigram)
+        if position == len(self.trigrams) or self.trigrams[position] != trigram:
+            return 0
+        if position in self.posting_bitmaps:
+            return self.posting_bitmaps[position]
+        return ids_to_bitmap(
+            self.postings[self.posting_offsets[position]:self.posting_offsets[position + 1]],
+            len(self.names)
+        )
+
+    def _overlap_at_least(self, overlap_bits: list[int], minimal_overlap: int) -> int:
+        """Bitmap of names whose count (in binary digits overlap_bits) is >= minimal_overlap.
+        """
+        if minimal_overlap >= 1 << len(overlap_bits):
+            return 0
+        # Compare digit by digit, from the most significant one
+        greater = 0
+        equal = (1 << len(self.names)) - 1
+        for _digit in reversed(range(len(overlap_bits))):
+            if minimal_overlap >> _digit & 1:
+                equal &= overlap_bits[_digit]
+            else:
+                greater |= equal & overlap_bits[_digit]
+                equal &= ~overlap_bits[_digit]
+        return greater | equal
+
+    def similar_names(self, search: str, similarity_threshold: float) -> list[tuple[int, float]]:
+        """Find names similar to the query.
+        Args:
+            search (str): Query as typed by the user.
+            similarity_threshold (float): Minimal similarity (0 to 1] of matching names.
+        Returns:
+            list[tuple[int, float]]: Identifiers of matching names with their similarity.
+        """
+        query_trigrams = name_trigrams(normalize_name(search))
+        number_of_query_trigrams = len(query_trigrams)
+        # Count shared trigrams for all names at once: bit i of overlap_bits[d] is the d-th
+        #   binary digit of the count for the name i (bitmaps are added like binary numbers)
+        overlap_bits = []
+        for _trigram in query_trigrams:
+            carry = self.posting_bitmap(_trigram)
+            for _digit in range(len(overlap_bits)):
+                if not carry:
+                    break
+                overlap_bits[_digit], carry = overlap_bits[_digit] ^ carry, \
+                    overlap_bits[_digit] & carry
+            if carry:
+                overlap_bits.append(carry)
+        # Similarity shared / (query + name - shared trigrams) reaches the threshold iff
+        #   shared >= threshold * (query + name trigrams) / (1 + threshold), the required
+        #   overlap is the same for a range of name lengths (continuous range of identifiers)
+        #   (names shorter than threshold * query or longer than query / threshold cannot match)
+        selected_names = 0
+        name_length = max(1, ceil(similarity_threshold * number_of_query_trigrams - 1e-9))
+        maximal_name_length = floor(number_of_query_trigrams / similarity_threshold + 1e-9)
+        while name_length <= maximal_name_length:
+            required_overlap = ceil(similarity_threshold * (
+                number_of_query_trigrams + name_length
+            ) / (1 + similarity_threshold) - 1e-9)
+            last_name_length = min(maximal_name_length, floor(
+                required_overlap * (1 + similarity_threshold) / similarity_threshold
+                - number_of_query_trigrams + 1e-9
+            ))
+            first_name_id = bisect_left(self.name_trigram_counts, name_length)
+            end_name_id = bisect_right(self.name_trigram_counts, last_name_length)
+            if first_name_id < end_name_id:
+                selected_names |= self._overlap_at_least(overlap_bits, required_overlap) & (
+                    (1 << end_name_id) - (1 << first_name_id)
+                )
+            name_length = max(name_length, last_name_length) + 1
+        # Byte representation allows to read counts of the few selected names cheaply
+        number_of_bytes = (len(self.names) + 7) // 8
+        overlap_bytes = [_bits.to_bytes(number_of_bytes, "little") for _bits in overlap_bits]
+        similar_names = []
+        for _name_id in bitmap_to_ids(selected_names):
+            overlap = sum(
+                (_bytes[_name_id >> 3] >> (_name_id & 7) & 1) << _digit
+                for _digit, _bytes in enumerate(overlap_bytes)
+            )
+            similarity = overlap / (
+                number_of_query_trigrams + self.name_trigram_counts[_name_id] - overlap
+            )
+            if similarity >= similarity_threshold:
+                similar_names.append((_name_id, similarity))
+        return similar_names
+
+    def rank(self, search: str, similarity_threshold: float, limit: int, offset: int = 0,
+             table_ids: set[int] | None = None
+             ) -> tuple[list[int], list[tuple[str, float, list[int]]]]:
+        """Select tables whose name or any column name is similar to the query.
+        Args:
+            search (str): Query as typed by the user.
+            similarity_threshold (float): Minimal similarity (0 to 1] of matching names.
+            limit (int): Maximal number of returned tables.
+            offset (int): Number of best scoring tables to skip.
+            table_ids (set[int] | None): If set, only these tables are searched.
+        Returns:
+            tuple[list[int], list[tuple[str, float, list[int]]]]: Identifiers of all matching
+                tables and the selected ones as (table name, best similarity, positions of
+                similar columns), ordered by similarity (ties in the order of the catalogue).
+        """
+        best_similarity = {}
+        similar_columns = {}
+        for _name_id, _similarity in self.similar_names(search, similarity_threshold):
+            for _occurrence in range(self.name_offsets[_name_id], self.name_offsets[_name_id + 1]):
+                table_id = self.occurrence_tables[_occurrence]
+                if table_ids is not None and table_id not in table_ids:
+                    continue
+                if _similarity > best_similarity.get(table_id, 0.0):
+                    best_similarity[table_id] = _similarity
+                if self.occurrence_columns[_occurrence] >= 0:
+                    similar_columns.setdefault(table_id, []).append(
+                        self.occurrence_columns[_occurrence]
+                    )
+        best_tables = heapq.nlargest(
+            offset + limit, ((_similarity, -_table_id)
+                             for _table_id, _similarity in best_similarity.items())
+        )
+        return sorted(best_similarity.keys()), [
+            (self.table_names[-_table_id], round(_similarity, 3),
+             sorted(similar_columns.get(-_table_id, [])))
+            for _similarity, _table_id in best_tables[offset:]
+        ]
@@ -1,6 +1,97 @@
+from array import array
+from collections import defaultdict
 from pathlib import Path
+import hashlib
 import json
 
+from .catalogue_index import (
+    CatalogueSearchIndex,
+    CatalogueFuzzyIndex,
+    FIELD_SEPARATOR,
+    text_ngrams,
+    normalize_name,
+    name_trigrams,
+)
+from .catalogue_facets import CatalogueFacets, COLUMN_FLAG_FACETS, ROWS_CHECKPOINT_STEP
+from .catalogue_binary import CatalogueArtifact, CatalogueArtifactWriter
+
+# Fields of each table in the catalogue (besides its name)
+TABLE_FIELDS = ("table_description", "number_of_rows", "table_classification",
+                "primary_keys", "columns")
+# Fields of tables in the lightweight list of tables
+TABLE_SUMMARY_FIELDS = ("table_description", "number_of_rows", "table_classification")
+
+
+def _table_search_strings(table_name: str, columns: dict) -> list[str]:
+    """Strings searched for the table: its name, then names of all columns and then their
+    descriptions (so each kind of strings is a continuous part of the joined string).
+    Args:
+        table_name (str): Name of the table.
+        columns (dict): Columns of the table in the catalogue (name -> column details).
+    Returns:
+        list[str]: Lowercase strings (without FIELD_SEPARATOR, it is replaced by a space).
+    """
+    search_strings = [table_name.lower()]
+    search_strings.extend(_col_name.lower() for _col_name in columns.keys())
+    search_strings.extend(_column["description"].lower() for _column in columns.values())
+    return [_search_string.replace(FIELD_SEPARATOR, " ") for _search_string in search_strings]
+
+
+def create_table_entry(table_name: str, table_entry: dict, number_of_rows: int,
+                       table_classification: str, primary_keys: list[str] | None,
+                       table_structure: dict) -> str:
+    """Reorganise the entry of the table from catalogue.json (in place) into the shape
+    of the catalogue.
+    Args:
+        table_name (str): Name of the table.
+        table_entry (dict): Entry of the table in catalogue.json.
+        number_of_rows (int): Number of rows of the table.
+        table_classification (str): Classification of the table.
+        primary_keys (list[str] | None): Primary keys of the table (None if not known).
+        table_structure (dict): Data types and constraints of columns of the table.
+    Returns:
+        str: Search string of the table (for the catalogue optimized for searching).
+    """
+    table_entry["number_of_rows"] = number_of_rows
+    table_entry["table_classification"] = table_classification
+    table_entry["primary_keys"] = primary_keys
+    # Reorganise columns
+    table_entry["columns"] = {}
+    for _col_name, _col_description in table_entry['columns_descriptions'].items():
+        is_free_text = False
+        if _col_name in table_entry['free_text_columns']:
+            is_free_text = True
+        is_identifiable = False
+        if _col_name in table_entry['other_identifiable_columns']:
+            is_identifiable = True
+        is_client_id = False
+        if _col_name in table_entry['client_id']:
+            is_client_id = True
+        is_date_time = False
+        if _col_name in table_entry['date_time']:
+            is_date_time = True
+        is_date = False
+        if _col_name in table_entry['date_of_birth']:
+            is_date = True
+
+        table_entry["columns"][_col_name] = {
+            "description": _col_description,
+            "is_free_text": is_free_text,
+            "is_identifiable": is_identifiable,
+            "is_client_id": is_client_id,
+            "is_date_time": is_date_time,
+            "is_date": is_date,
+            "is_nullable": table_structure["columns"][_col_name]["is_nullable"] == "YES",
+            "data_type": table_structure["columns"][_col_name]["data_type"],
+        }
+    # Drop additional keys:
+    additional_keys = ["columns_descriptions", 'free_text_columns',
+                       'other_identifiable_columns', 'client_id',
+                       'date_time', 'date_of_birth']
+    for additional_key in additional_keys:
+        table_entry.pop(additional_key, None)
+    return FIELD_SEPARATOR.join(_table_search_strings(table_name, table_entry["columns"]))
+
 
 def create_catalogue(catalogue_path: Path,
                      number_of_rows_per_table_path: Path,
@@ -32,56 +123,310 @@ def create_catalogue(catalogue_path: Path,
             # Table classified as not-imported are skipped
             tables_not_imported.append(_table)
             continue
-        search_strings = [_table.lower()]
-        catalogue[_table]["number_of_rows"] = number_of_rows_per_table[_table]
-        catalogue[_table]["table_classification"] = table_classification[_table]
-
-        if _table in primary_keys.keys():
-            catalogue[_table]["primary_keys"] = primary_keys[_table]
-        else:
-            catalogue[_table]["primary_keys"] = None
-        # Reorganise columns
-        catalogue[_table]["columns"] = {}
-        for _col_name, _col_description in catalogue[_table]['columns_descriptions'].items():
-            search_strings.append(_col_name.lower())
-            search_strings.append(_col_description.lower())
-
-            is_free_text = False
-            if _col_name in catalogue[_table]['free_text_columns']:
-                is_free_text = True
-            is_identifiable = False
-            if _col_name in catalogue[_table]['other_identifiable_columns']:
-                is_identifiable = True
-            is_client_id = False
-            if _col_name in catalogue[_table]['client_id']:
-                is_client_id = True
-            is_date_time = False
-            if _col_name in catalogue[_table]['date_time']:
-                is_date_time = True
-            is_date = False
-            if _col_name in catalogue[_table]['date_of_birth']:
-                is_date = True
-
-            catalogue[_table]["columns"][_col_name] = {
-                "description": _col_description,
-                "is_free_text": is_free_text,
-                "is_identifiable": is_identifiable,
-                "is_client_id": is_client_id,
-                "is_date_time": is_date_time,
-                "is_date": is_date,
-                "is_nullable": sql_structure[_table]["columns"][_col_name]["is_nullable"] == "YES",
-                "data_type": sql_structure[_table]["columns"][_col_name]["data_type"],
-            }
-        # Drop additional keys:
-        additional_keys = ["columns_descriptions", 'free_text_columns',
-                           'other_identifiable_columns', 'client_id',
-                           'date_time', 'date_of_birth']
-        for additional_key in additional_keys:
-            catalogue[_table].pop(additional_key, None)
         # Create catalogue for searching:
-        search_catalogue[_table] = "|".join(search_strings)
+        search_catalogue[_table] = create_table_entry(
+            _table, catalogue[_table], number_of_rows_per_table[_table],
+            table_classification[_table], primary_keys.get(_table), sql_structure[_table]
+        )
 
     for _table in tables_not_imported:
         # Table classified as not-imported are skipped
         catalogue.pop(_table, None)
     return catalogue, search_catalogue
+
+
+def create_table_summaries(catalogue: dict) -> list[dict]:
+    """Construct the lightweight list of tables (without columns).
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+    Returns:
+        list[dict]: For each table its name and TABLE_SUMMARY_FIELDS.
+    """
+    return [
+        {"table_name": _table} | {_field: _entry.get(_field) for _field in TABLE_SUMMARY_FIELDS}
+        for _table, _entry in catalogue.items()
+    ]
+
+
+class SearchIndexBuilder:
+    """Collects tables one by one for the inverted index (see create_search_index)."""
+
+    def __init__(self):
+        self.table_names: list[str] = []
+        self.search_strings: list[str] = []
+        # Tables are added in order, hence each posting list is ascending (unless postings
+        #   of earlier tables are added later by add_postings)
+        self.postings_per_ngram: defaultdict[str, list[int]] = defaultdict(list)
+        self.unsorted_ngrams: set[str] = set()
+        self.table_field_offsets = array('I', [0])
+        self.field_offsets = array('I')
+
+    def add_table(self, table_name: str, columns: dict, search_string: str,
+                  index_ngrams: bool = True) -> int:
+        """Add the table (its n-grams are not indexed if index_ngrams is False, then they
+        have to be added by add_postings).
+        Args:
+            table_name (str): Name of the table.
+            columns (dict): Columns of the table in the catalogue.
+            search_string (str): Search string of the table (see create_catalogue).
+            index_ngrams (bool): Whether to index n-grams of the search string.
+        Returns:
+            int: Identifier of the table in the index.
+        """
+        table_id = len(self.table_names)
+        self.table_names.append(table_name)
+        self.search_strings.append(search_string)
+        if index_ngrams:
+            for _ngram in text_ngrams(search_string):
+                self.postings_per_ngram[_ngram].append(table_id)
+        # Starting positions of the search strings (see create_catalogue) in the joined string
+        position = 0
+        for _search_string in _table_search_strings(table_name, columns):
+            self.field_offsets.append(position)
+            # Strings are joined by FIELD_SEPARATOR
+            position += len(_search_string) + 1
+        self.table_field_offsets.append(len(self.field_offsets))
+        return table_id
+
+    def add_postings(self, ngram: str, table_ids: list[int]) -> None:
+        """Add tables (already added without indexing) to the posting list of the n-gram."""
+        self.postings_per_ngram[ngram].extend(table_ids)
+        self.unsorted_ngrams.add(ngram)
+
+    def build(self) -> CatalogueSearchIndex:
+        """Create the index of all added tables."""
+        ngrams = sorted(self.postings_per_ngram.keys())
+        # Store all posting lists back to back in one array
+        posting_offsets = array('I', [0])
+        postings = array('I')
+        for _ngram in ngrams:
+            if _ngram in self.unsorted_ngrams:
+                self.postings_per_ngram[_ngram].sort()
+            postings.extend(self.postings_per_ngram[_ngram])
+            posting_offsets.append(len(postings))
+        return CatalogueSearchIndex(self.table_names, self.search_strings, ngrams,
+                                    posting_offsets, postings,
+                                    self.table_field_offsets, self.field_offsets)
+
+
+class FuzzyIndexBuilder:
+    """Collects tables one by one for the trigram index (see create_fuzzy_index)."""
+
+    def __init__(self):
+        self.table_names: list[str] = []
+        # Normalized name -> list of (table, column position or -1 for the table name)
+        self.occurrences_per_name: defaultdict[str, list[tuple[int, int]]] = defaultdict(list)
+
+    def add_table(self, table_name: str, columns: dict) -> None:
+        """Add names of the table and its columns."""
+        table_id = len(self.table_names)
+        self.table_names.append(table_name)
+        self.occurrences_per_name[normalize_name(table_name)].append((table_id, -1))
+        for _col_position, _col_name in enumerate(columns.keys()):
+            self.occurrences_per_name[normalize_name(_col_name)].append(
+                (table_id, _col_position)
+            )
+
+    def build(self) -> CatalogueFuzzyIndex:
+        """Create the index of all added tables."""
+        occurrences_per_name = self.occurrences_per_name
+        # Names without letters and digits cannot be matched
+        occurrences_per_name.pop("", None)
+
+        # Names ordered by the number of trigrams (see CatalogueFuzzyIndex), trigrams are
+        #   computed again later rather than kept for all names (saves memory)
+        trigram_count_per_name = {
+            _name: len(name_trigrams(_name)) for _name in occurrences_per_name.keys()
+        }
+        names = sorted(trigram_count_per_name.keys(), key=trigram_count_per_name.__getitem__)
+        name_trigram_counts = array('I')
+        name_offsets = array('I', [0])
+        occurrence_tables = array('I')
+        occurrence_columns = array('i')
+        postings_per_trigram = defaultdict(lambda: array('I'))
+        for _name_id, _name in enumerate(names):
+            name_trigram_counts.append(trigram_count_per_name[_name])
+            for _trigram in name_trigrams(_name):
+                postings_per_trigram[_trigram].append(_name_id)
+            for _table_id, _col_position in occurrences_per_name[_name]:
+                occurrence_tables.append(_table_id)
+                occurrence_columns.append(_col_position)
+            name_offsets.append(len(occurrence_tables))
+        trigrams = sorted(postings_per_trigram.keys())
+        posting_offsets = array('I', [0])
+        postings = array('I')
+        for _trigram in trigrams:
+            postings.extend(postings_per_trigram[_trigram])
+            posting_offsets.append(len(postings))
+        return CatalogueFuzzyIndex(self.table_names, names, name_trigram_counts, trigrams,
+                                   posting_offsets, postings,
+                                   name_offsets, occurrence_tables, occurrence_columns)
+
+
+class FacetsBuilder:
+    """Collects tables one by one for the facets (see create_facets)."""
+
+    def __init__(self):
+        self.table_names: list[str] = []
+        self.flag_bitmaps = {_flag: 0 for _flag in COLUMN_FLAG_FACETS}
+        self.data_type_bitmaps: defaultdict[str, int] = defaultdict(int)
+        self.classification_bitmaps: defaultdict[str, int] = defaultdict(int)
+        self.number_of_rows = array('q')
+
+    def add_table(self, table_name: str, table_entry: dict) -> None:
+        """Add the table (entry in the shape of the catalogue)."""
+        table_bit = 1 << len(self.table_names)
+        self.table_names.append(table_name)
+        self.number_of_rows.append(table_entry["number_of_rows"])
+        self.classification_bitmaps[table_entry["table_classification"]] |= table_bit
+        for _column in table_entry["columns"].values():
+            self.data_type_bitmaps[_column["data_type"]] |= table_bit
+            for _flag in COLUMN_FLAG_FACETS:
+                if _column[_flag]:
+                    self.flag_bitmaps[_flag] |= table_bit
+
+    def build(self) -> CatalogueFacets:
+        """Create facets of all added tables."""
+        number_of_tables = len(self.table_names)
+        # Tables ordered by the number of rows and bitmaps of their suffixes (at checkpoints)
+        rows_order = array('I', sorted(
+            range(number_of_tables), key=self.number_of_rows.__getitem__
+        ))
+        sorted_rows = array('q', (self.number_of_rows[_id] for _id in rows_order))
+        rows_checkpoints = [0] * (-(-number_of_tables // ROWS_CHECKPOINT_STEP) + 1)
+        suffix = 0
+        for _position in reversed(range(number_of_tables)):
+            suffix |= 1 << rows_order[_position]
+            if _position % ROWS_CHECKPOINT_STEP == 0:
+                rows_checkpoints[_position // ROWS_CHECKPOINT_STEP] = suffix
+        return CatalogueFacets(self.table_names, self.flag_bitmaps, dict(self.data_type_bitmaps),
+                               dict(self.classification_bitmaps), rows_order, sorted_rows,
+                               rows_checkpoints)
+
+
+class CatalogueDocumentBuilder:
+    """Serializes the catalogue table by table into the JSON document (the same bytes
+    as FastAPI renders for the whole catalogue) and computes its version (hash of the
+    document and search strings)."""
+
+    def __init__(self):
+        self.body = bytearray(b"{")
+        self.content_hash = hashlib.sha256()
+
+    def add_table(self, table_name: str, table_entry: dict, search_string: str) -> None:
+        """Add the table (entry in the shape of the catalogue) with its search string."""
+        table_json = render_json(table_name) + b":" + render_json(table_entry)
+        if len(self.body) > 1:
+            self.body += b","
+        self.body += table_json
+        self.content_hash.update(table_json + b"," + render_json(search_string) + b"\n")
+
+    @property
+    def version(self) -> str:
+        """Version of the added tables (hexadecimal SHA-256 digest)."""
+        return self.content_hash.hexdigest()
+
+    def document(self) -> bytearray:
+        """The JSON document of all added tables."""
+        return self.body + b"}"
+
+
+def create_search_index(catalogue: dict, search_catalogue: dict) -> CatalogueSearchIndex:
+    """Construct the inverted index (n-gram -> tables) for the catalogue optimized for searching.
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+        search_catalogue (dict): Second output of create_catalogue (table -> search string).
+    Returns:
+        CatalogueSearchIndex: Index resolving searches by posting-list intersection.
+    """
+    search_index_builder = SearchIndexBuilder()
+    for _table, _search_string in search_catalogue.items():
+        search_index_builder.add_table(_table, catalogue[_table]["columns"], _search_string)
+    return search_index_builder.build()
+
+
+def create_fuzzy_index(catalogue: dict) -> CatalogueFuzzyIndex:
+    """Construct the trigram index of table and column names for the typo tolerant search.
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+    Returns:
+        CatalogueFuzzyIndex: Index of distinct normalized names.
+    """
+    fuzzy_index_builder = FuzzyIndexBuilder()
+    for _table, _entry in catalogue.items():
+        fuzzy_index_builder.add_table(_table, _entry["columns"])
+    return fuzzy_index_builder.build()
+
+
+def create_facets(catalogue: dict) -> CatalogueFacets:
+    """Construct bitmaps of tables for each facet value.
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+    Returns:
+        CatalogueFacets: Facets for filtering and counting of tables.
+    """
+    facets_builder = FacetsBuilder()
+    for _table, _entry in catalogue.items():
+        facets_builder.add_table(_table, _entry)
+    return facets_builder.build()
+
+
+def catalogue_version(catalogue: dict, search_catalogue: dict) -> str:
+    """Compute the version of the catalogue (hash of its content, see
+    CatalogueDocumentBuilder).
+    Args:
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+        search_catalogue (dict): Second output of create_catalogue (table -> search string).
+    Returns:
+        str: Hexadecimal SHA-256 digest.
+    """
+    document_builder = CatalogueDocumentBuilder()
+    for _table, _entry in catalogue.items():
+        document_builder.add_table(_table, _entry, search_catalogue[_table])
+    return document_builder.version
+
+
+def render_json(content) -> bytes:
+    """Serialize the content exactly as FastAPI (JSONResponse) does in responses."""
+    return json.dumps(
+        content, ensure_ascii=False, allow_nan=False, indent=None, separators=(",", ":")
+    ).encode("utf-8")
+
+
+def write_catalogue_artifact(artifact_path: Path, catalogue: dict,
+                             search_catalogue: dict) -> str:
+    """Store the catalogue with its search indexes and serialized responses in the versioned
+    binary artifact (see CatalogueArtifactWriter), so the service only maps the file.
+    The file is replaced atomically, so a running service never reads a partial artifact.
+    Args:
+        artifact_path (Path): Path to the artifact.
+        catalogue (dict): First output of create_catalogue (the full catalogue).
+        search_catalogue (dict): Second output of create_catalogue (table -> search string).
+    Returns:
+        str: Version of the stored catalogue.
+    """
+    document_builder = CatalogueDocumentBuilder()
+    artifact_writer = CatalogueArtifactWriter()
+    for _table, _entry in catalogue.items():
+        document_builder.add_table(_table, _entry, search_catalogue[_table])
+        artifact_writer.add_table(_table, _entry, search_catalogue[_table])
+    artifact_writer.add_search_index(create_search_index(catalogue, search_catalogue))
+    artifact_writer.add_fuzzy_index(create_fuzzy_index(catalogue))
+    artifact_writer.add_facets(create_facets(catalogue))
+    artifact_writer.add_document("catalogue", document_builder.document())
+    artifact_writer.add_document("table_summaries", render_json(create_table_summaries(catalogue)))
+    artifact_writer.write(artifact_path, document_builder.version)
+    return document_builder.version
+
+
+def read_catalogue_artifact(artifact_path: Path) -> CatalogueArtifact:
+    """Open the artifact written by write_catalogue_artifact (memory mapped, the content is
+    read when used).
+    Args:
+        artifact_path (Path): Path to the artifact.
+    Raises:
+        ValueError: If the file is not a catalogue artifact.
+    Returns:
+        CatalogueArtifact: Opened artifact.
+    """
+    return CatalogueArtifact(artifact_path)
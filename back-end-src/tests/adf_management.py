@@ -0,0 +1,179 @@
+"""Local stand-in of the Azure Data Factory (aka ADF) management API for tests.
+
+It serves createRun and queryPipelineRuns of pipelines over plain HTTP on localhost (see
+LOCAL_MANAGEMENT_HOSTS of DataPipelineClient), keeps the created runs in memory and rejects
+queries the real API rejects (unknown filter operands or operators, missing time window).
+"""
+import datetime
+import json
+import re
+import threading
+import time
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse
+
+from azure.core.credentials import AccessToken
+from azure.mgmt.datafactory.models import RunQueryFilterOperand, RunQueryFilterOperator
+
+CREATE_RUN_PATH = re.compile(r"/pipelines/(?P<pipeline_name>[^/]+)/createRun$")
+QUERY_RUNS_PATH = re.compile(r"/queryPipelineRuns$")
+# Properties of PipelineRun the filters of the stand-in understand
+FILTERED_PROPERTIES = {
+    RunQueryFilterOperand.PIPELINE_NAME: "pipelineName",
+    RunQueryFilterOperand.STATUS: "status",
+}
+
+
+def _parse_time(value: str) -> datetime.datetime:
+    return datetime.datetime.fromisoformat(value.replace("Z", "+00:00"))
+
+
+def _format_time(value: datetime.datetime) -> str:
+    return value.isoformat().replace("+00:00", "Z")
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "AdfManagementStandIn"
+
+    def log_message(self, *_args) -> None:
+        pass
+
+    def _send(self, status: int, body: dict) -> None:
+        content = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(content)))
+        self.end_headers()
+        self.wfile.write(content)
+
+    def do_POST(self) -> None:
+        payload = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        path = urlparse(self.path).path
+        self.server.calls.append((path, self.headers.get("Authorization"), payload))
+        time.sleep(self.server.delay)
+        if create_run := CREATE_RUN_PATH.search(path):
+            self._send(200, {"runId": self.server.add_run(create_run["pipeline_name"], payload)})
+        elif QUERY_RUNS_PATH.search(path):
+            try:
+                self._send(200, self.server.query_runs(payload))
+            except ValueError as error:
+                self._send(400, {"error": {"code": "BadRequest", "message": str(error)}})
+        else:
+            self._send(404, {"error": {"code": "NotFound", "message": path}})
+
+
+class AdfManagementStandIn(ThreadingHTTPServer):
+    """HTTP server of the stand-in (listening on a free port of localhost).
+
+    Attributes:
+        calls (list[tuple[str, str | None, dict]]): Path, Authorization header and JSON body of
+            each call.
+        connections (int): Number of TCP connections accepted.
+        runs (dict[str, dict]): Runs (as PipelineRun properties) by their run id.
+        page_size (int): Maximal number of runs returned by one queryPipelineRuns call.
+        delay (float): Seconds each call waits before answering.
+    """
+
+    def __init__(self, page_size: int = 100, delay: float = 0.0):
+        super().__init__(("127.0.0.1", 0), _Handler)
+        self.calls: list[tuple[str, str | None, dict]] = []
+        self.connections = 0
+        self.runs: dict[str, dict] = {}
+        self.page_size = page_size
+        self.delay = delay
+        self._lock = threading.Lock()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def process_request(self, request, client_address) -> None:
+        self.connections += 1
+        super().process_request(request, client_address)
+
+    def start(self) -> "AdfManagementStandIn":
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def stop(self) -> None:
+        self.shutdown()
+        self.server_close()
+
+    def add_run(self, pipeline_name: str, parameters: dict, status: str = "Queued") -> str:
+        """Create a run of the pipeline (as createRun does) and return its run id."""
+        run_id = str(uuid.uuid4())
+        now = _format_time(datetime.datetime.now(datetime.timezone.utc))
+        with self._lock:
+            self.runs[run_id] = {
+                "runId": run_id, "pipelineName": pipeline_name, "parameters": parameters,
+                "status": status, "runStart": now, "lastUpdated": now,
+            }
+        return run_id
+
+    def finish_run(self, run_id: str, status: str = "Succeeded", duration_ms: int = 1000,
+                   message: str = "") -> None:
+        """Move the run to a final state (updated now)."""
+        now = datetime.datetime.now(datetime.timezone.utc)
+        with self._lock:
+            self.runs[run_id] |= {
+                "status": status, "durationInMs": duration_ms, "message": message,
+                "runEnd": _format_time(now), "lastUpdated": _format_time(now),
+            }
+
+    def query_runs(self, payload: dict) -> dict:
+        """Answer queryPipelineRuns (runs ordered by their run id, paged by page_size).
+        Raises:
+            ValueError: If the query would be rejected by ADF.
+        """
+        if "lastUpdatedAfter" not in payload or "lastUpdatedBefore" not in payload:
+            raise ValueError("lastUpdatedAfter and lastUpdatedBefore are required")
+        updated_after = _parse_time(payload["lastUpdatedAfter"])
+        updated_before = _parse_time(payload["lastUpdatedBefore"])
+        filters = []
+        for _filter in payload.get("filters", []):
+            if _filter.get("operand") not in set(RunQueryFilterOperand):
+                raise ValueError(f"unknown operand {_filter.get('operand')}")
+            if _filter.get("operator") not in set(RunQueryFilterOperator):
+                raise ValueError(f"unknown operator {_filter.get('operator')}")
+            if _filter["operand"] not in FILTERED_PROPERTIES:
+                raise ValueError(f"operand {_filter['operand']} is not supported by stand-in")
+            filters.append(_filter)
+        with self._lock:
+            runs = sorted(self.runs.values(), key=lambda _run: _run["runId"])
+        runs = [
+            _run for _run in runs
+            if updated_after <= _parse_time(_run["lastUpdated"]) < updated_before
+            and all(self._matches(_run, _filter) for _filter in filters)
+        ]
+        start = int(payload.get("continuationToken") or 0)
+        response = {"value": runs[start:start + self.page_size]}
+        if start + self.page_size < len(runs):
+            response["continuationToken"] = str(start + self.page_size)
+        return response
+
+    @staticmethod
+    def _matches(run: dict, run_filter: dict) -> bool:
+        value = run.get(FILTERED_PROPERTIES[run_filter["operand"]])
+        is_in = value in run_filter["values"]
+        if run_filter["operator"] in (RunQueryFilterOperator.EQUALS, RunQueryFilterOperator.IN):
+            return is_in
+        return not is_in
+
+
+class FakeCredential:
+    """Credential issuing fake access tokens (acquisition can be slowed down by `cost`
+    seconds) and counting them."""
+
+    def __init__(self, cost: float = 0.0):
+        self.tokens = 0
+        self.cost = cost
+
+    def get_token(self, *_scopes, **_kwargs) -> AccessToken:
+        self.tokens += 1
+        time.sleep(self.cost)
+        return AccessToken(f"token-{self.tokens}", int(time.time()) + 3600)
+
+    def close(self) -> None:
+        pass
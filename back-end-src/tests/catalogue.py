@@ -0,0 +1,83 @@
+"""Synthetic catalogue (in the shape of the RIO source files) for tests and benchmarks."""
+import json
+import random
+from pathlib import Path
+
+from riocatalogue.create_catalogue import create_catalogue
+
+WORDS = (
+    "client patient referral appointment episode care plan diagnosis medication prescription "
+    "dose ward bed admission discharge assessment risk team staff contact address postcode "
+    "ethnicity gender date time start end status code type description outcome reason source "
+    "provider clinic service inpatient outpatient community mental health section legal act "
+    "tribunal leave event note text identifier number sequence created updated deleted flag "
+    "score scale item question answer form review cpa coordinator allergy alert observation "
+    "measurement weight height blood pressure"
+).split()
+DATA_TYPES = ("int", "varchar", "datetime", "bit", "decimal", "nvarchar", "bigint", "date",
+              "char", "uniqueidentifier")
+# Classifications (in proportions of the real catalogue)
+CLASSIFICATIONS = ("imported",) * 8 + ("imported-with-identifiable", "not-imported")
+# Names of the source files in the order of create_catalogue arguments
+SOURCE_FILES = ("catalogue.json", "number_of_rows.json", "table_classification.json",
+                "primary_keys.json", "sql_structure.json")
+
+
+def _camel_case(words: list[str]) -> str:
+    return "".join(_word.capitalize() for _word in words)
+
+
+def write_catalogue_sources(directory: Path, number_of_tables: int, number_of_columns: int,
+                            seed: int = 1) -> list[Path]:
+    """Write the source files of a random catalogue (the same for the same arguments).
+    Args:
+        directory (Path): Existing directory for the files.
+        number_of_tables (int): Number of tables (about 10 % of them are not imported).
+        number_of_columns (int): Number of columns of each table.
+        seed (int): Seed of the random content.
+    Returns:
+        list[Path]: Paths to the files (arguments of create_catalogue).
+    """
+    random_generator = random.Random(seed)
+    catalogue, number_of_rows, classification, primary_keys, structure = {}, {}, {}, {}, {}
+    for _table in range(number_of_tables):
+        table_name = _camel_case(random_generator.sample(WORDS, 2)) + f"{_table:04d}"
+        columns = {}
+        while len(columns) < number_of_columns:
+            column_name = _camel_case(random_generator.sample(WORDS, random_generator.randint(1, 3)))
+            columns[column_name] = " ".join(
+                random_generator.choices(WORDS, k=random_generator.randint(3, 12))
+            ).capitalize() + "."
+        column_names = list(columns)
+        catalogue[table_name] = {
+            "table_description": " ".join(random_generator.choices(WORDS, k=15)),
+            "columns_descriptions": columns,
+            **{_field: [_column for _column in column_names
+                        if random_generator.random() < _probability]
+               for _field, _probability in (("free_text_columns", 0.05),
+                                            ("other_identifiable_columns", 0.08),
+                                            ("client_id", 0.03), ("date_time", 0.1),
+                                            ("date_of_birth", 0.01))},
+        }
+        number_of_rows[table_name] = int(10 ** random_generator.uniform(0, 8))
+        classification[table_name] = random_generator.choice(CLASSIFICATIONS)
+        if random_generator.random() < 0.7:
+            primary_keys[table_name] = column_names[:random_generator.randint(1, 2)]
+        structure[table_name] = {"columns": {
+            _column: {"is_nullable": random_generator.choice(("YES", "NO")),
+                      "data_type": random_generator.choice(DATA_TYPES)}
+            for _column in column_names
+        }}
+    paths = [directory / _file_name for _file_name in SOURCE_FILES]
+    for _path, _content in zip(paths, (catalogue, number_of_rows, classification,
+                                       primary_keys, structure)):
+        _path.write_text(json.dumps(_content))
+    return paths
+
+
+def synthetic_catalogue(directory: Path, number_of_tables: int, number_of_columns: int,
+                        seed: int = 1) -> tuple[dict, dict]:
+    """Random catalogue and its search catalogue (see create_catalogue)."""
+    return create_catalogue(
+        *write_catalogue_sources(directory, number_of_tables, number_of_columns, seed)
+    )
@@ -0,0 +1,103 @@
+import asyncio
+import uuid
+
+import httpx
+import pytest
+
+from dataaccessrequest.main import service
+from dataaccessrequest.authentication.role_validators import (
+    validator_is_researcher_or_data_manager,
+    validator_is_researcher,
+    validator_is_data_manager,
+)
+from dataaccessrequest.pydantic_models.pd_aad_auth_models import AADUserModel, AADUserRoles
+from dataaccessrequest.utils.catalogue_snapshot import CATALOGUE_LOADER
+from dataaccessrequest.utils.data_access import KNOWN_USERS
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from dataaccessrequest.utils.workspace_acl import WORKSPACE_ACL
+from .adf_management import AdfManagementStandIn
+from .database import SqliteDatabase, seed_database
+from .fake_pipeline import FakePipelineClient
+
+DATA_MANAGER = AADUserModel(
+    oid=uuid.UUID("11111111-1111-1111-1111-111111111111"), roles=[AADUserRoles.data_manager],
+    name="Data Manager", preferred_username="data.manager@example.com",
+)
+RESEARCHER = AADUserModel(
+    oid=uuid.UUID("22222222-2222-2222-2222-222222222222"), roles=[AADUserRoles.researcher],
+    name="Researcher", preferred_username="researcher@example.com",
+)
+
+
+class ApiClient:
+    """Calls end-points of the service in-process, authenticated as `user` (the role
+    validators are replaced, tokens are not involved)."""
+
+    def __init__(self):
+        self.user = DATA_MANAGER
+        self._runner = asyncio.Runner()
+
+    def request(self, method: str, url: str, **kwargs) -> httpx.Response:
+        async def _request() -> httpx.Response:
+            async with httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=service), base_url="http://test"
+            ) as client:
+                return await client.request(method, url, **kwargs)
+
+        return self._runner.run(_request())
+
+    def close(self) -> None:
+        self._runner.close()
+
+
+@pytest.fixture
+def database(tmp_path) -> SqliteDatabase:
+    """Empty database the sessions of the service are bound to."""
+    test_database = SqliteDatabase(tmp_path / "dar.sqlite")
+    SESSION_FACTORY.configure(bind=test_database.engine)
+    # Process-wide caches must not see rows of the previous test
+    WORKSPACE_ACL.version = None
+    KNOWN_USERS.clear()
+    yield test_database
+    test_database.dispose()
+
+
+@pytest.fixture
+def seeded_requests(database, request) -> list[dict]:
+    """Requests created in turn by the Data Manager and the Researcher (see seed_database),
+    estimated from the active catalogue. Their number and the number of their tables,
+    columns and workspaces are taken from NUMBER_OF_REQUESTS, NUMBER_OF_TABLES,
+    NUMBER_OF_COLUMNS and NUMBER_OF_WORKSPACES of the test module (if defined)."""
+    return seed_database(
+        database.engine, [DATA_MANAGER.user_uuid, RESEARCHER.user_uuid],
+        getattr(request.module, "NUMBER_OF_REQUESTS", 6),
+        getattr(request.module, "NUMBER_OF_TABLES", 2),
+        getattr(request.module, "NUMBER_OF_COLUMNS", 3),
+        number_of_workspaces=getattr(request.module, "NUMBER_OF_WORKSPACES", 5),
+        estimate_version=CATALOGUE_LOADER.snapshot.version,
+    )
+
+
+@pytest.fixture
+def api(database) -> ApiClient:
+    client = ApiClient()
+    for _validator in (validator_is_researcher_or_data_manager, validator_is_researcher,
+                       validator_is_data_manager):
+        service.dependency_overrides[_validator] = lambda: client.user
+    yield client
+    service.dependency_overrides.clear()
+    client.close()
+
+
+@pytest.fixture
+def adf_management() -> AdfManagementStandIn:
+    """Running stand-in of the ADF management API."""
+    stand_in = AdfManagementStandIn().start()
+    yield stand_in
+    stand_in.stop()
+
+
+@pytest.fixture
+def pipeline_client() -> FakePipelineClient:
+    """In-process fake of the ADF client (see FakePipelineClient)."""
+    return FakePipelineClient()
@@ -0,0 +1,212 @@
+"""SQLite stand-in of the SQL Server database for tests and benchmarks.
+
+The models use SQL Server types, SQLite gets equivalent column types and UUIDs in the same
+(32 hex digits) form whether they are bound as strings or UUID objects. The database records
+every statement sent to it and every row fetched from it, so tests can pin the number of
+round-trips of each end-point.
+"""
+import datetime
+import sqlite3
+import uuid
+from pathlib import Path
+
+import sqlalchemy
+import sqlalchemy.dialects.mssql as ms
+import sqlalchemy.dialects.sqlite as sqlite
+from sqlalchemy.engine import Engine
+from sqlalchemy.ext.compiler import compiles
+
+from dataaccessrequest.sql_models.db_models import (
+    Base,
+    DataAccessRequest,
+    DataAccessRequestAclVersion,
+    DataAccessRequestColumns,
+    DataAccessRequestTables,
+    DataAccessRequestUser,
+    DataAccessRequestWorkspace,
+    DataAccessRequestWorkspaceVisibility,
+)
+
+
+@compiles(ms.UNIQUEIDENTIFIER, "sqlite")
+def _compile_uniqueidentifier(_type, _compiler, **_kwargs) -> str:
+    return "CHAR(32)"
+
+
+@compiles(ms.DATETIME2, "sqlite")
+def _compile_datetime2(_type, _compiler, **_kwargs) -> str:
+    return "DATETIME"
+
+
+_uniqueidentifier_bind_processor = ms.UNIQUEIDENTIFIER.bind_processor
+
+
+def _bind_uniqueidentifier(self, dialect):
+    """Routes pass UUID objects as well as strings, SQL Server accepts both."""
+    if dialect.name != "sqlite":
+        return _uniqueidentifier_bind_processor(self, dialect)
+
+    def process(value):
+        return None if value is None else uuid.UUID(str(value)).hex
+
+    return process
+
+
+ms.UNIQUEIDENTIFIER.bind_processor = _bind_uniqueidentifier
+
+_datetime_bind_processor = sqlite.DATETIME.bind_processor
+
+
+def _bind_datetime(self, dialect):
+    """Routes pass ISO formatted strings as well as datetimes, SQL Server accepts both."""
+    process = _datetime_bind_processor(self, dialect)
+
+    def process_string(value):
+        if isinstance(value, str):
+            value = datetime.datetime.fromisoformat(value)
+        return process(value)
+
+    return process_string
+
+
+sqlite.DATETIME.bind_processor = _bind_datetime
+
+
+class QueryRecorder:
+    """Statements executed (with the number of their parameter sets) and rows fetched."""
+
+    def __init__(self):
+        self.statements: list[tuple[str, int]] = []
+        self.rows_fetched = 0
+
+    def reset(self) -> None:
+        self.statements.clear()
+        self.rows_fetched = 0
+
+    @property
+    def round_trips(self) -> int:
+        """Number of statements (an executemany is one batch with fast_executemany)."""
+        return len(self.statements)
+
+    def tables(self) -> set[str]:
+        """Names of the tables referred to by the recorded statements."""
+        return {
+            _table.name for _table in Base.metadata.sorted_tables
+            for _statement, _ in self.statements if f'"{_table.name}"' in _statement
+        }
+
+
+class SqliteDatabase:
+    """SQLite database file with all tables of the models."""
+
+    def __init__(self, path: Path):
+        self.recorder = QueryRecorder()
+        recorder = self.recorder
+
+        class _RecordingCursor(sqlite3.Cursor):
+            def fetchone(self):
+                row = super().fetchone()
+                recorder.rows_fetched += row is not None
+                return row
+
+            def fetchmany(self, *args):
+                rows = super().fetchmany(*args)
+                recorder.rows_fetched += len(rows)
+                return rows
+
+            def fetchall(self):
+                rows = super().fetchall()
+                recorder.rows_fetched += len(rows)
+                return rows
+
+        class _RecordingConnection(sqlite3.Connection):
+            def cursor(self, factory=_RecordingCursor):
+                return super().cursor(factory)
+
+        def _connect() -> sqlite3.Connection:
+            connection = sqlite3.connect(
+                path, factory=_RecordingConnection, check_same_thread=False
+            )
+            connection.execute("PRAGMA foreign_keys = ON")
+            return connection
+
+        # A connection per thread of the pool (the default pool of SQLite closes connections
+        #   of other threads once there are more threads than its size)
+        self.engine: Engine = sqlalchemy.create_engine(
+            "sqlite://", creator=_connect, poolclass=sqlalchemy.pool.QueuePool
+        )
+
+        @sqlalchemy.event.listens_for(self.engine, "before_cursor_execute")
+        def _record(_connection, _cursor, statement, parameters, _context, executemany):
+            recorder.statements.append((statement, len(parameters) if executemany else 1))
+
+        Base.metadata.create_all(self.engine)
+        self.recorder.reset()
+
+    def dispose(self) -> None:
+        self.engine.dispose()
+
+
+def seed_database(engine: Engine, users: list[uuid.UUID], number_of_requests: int,
+                  number_of_tables: int, number_of_columns: int,
+                  number_of_workspaces: int = 5,
+                  estimate_version: str | None = None) -> list[dict]:
+    """Insert users (each sees all workspaces), workspaces and requests created in turn by
+    the users (statuses pending, approved and rejected in turn), each with the tables t0,
+    t1, ... and columns c0, c1, ... (with a zero estimate of the size computed from the
+    catalogue of estimate_version, if given)
+    Returns:
+        list[dict]: Values of inserted requests.
+    """
+    workspaces = [str(uuid.uuid4()) for _ in range(number_of_workspaces)]
+    created_on = datetime.datetime(2024, 1, 1)
+    requests, tables, columns = [], [], []
+    for _number in range(number_of_requests):
+        request_uuid = str(uuid.uuid4())
+        requests.append({
+            "request_uuid": request_uuid,
+            "title": f"Request {_number}",
+            "status": ("pending", "approved", "rejected")[_number % 3],
+            "created_on": created_on + datetime.timedelta(hours=_number),
+            "justification": "Justification",
+            "workspace_uuid": workspaces[_number % number_of_workspaces],
+            "creator_uuid": str(users[_number % len(users)]),
+            "estimated_rows": 0 if estimate_version else None,
+            "estimated_bytes": 0 if estimate_version else None,
+            "estimate_version": estimate_version,
+        })
+        for _table in range(number_of_tables):
+            table_uuid = str(uuid.uuid4())
+            tables.append({
+                "dar_tables_uuid": table_uuid, "request_uuid": request_uuid,
+                "table_name": f"t{_table}", "table_description": "Table",
+            })
+            columns.extend({
+                "dar_columns_uuid": str(uuid.uuid4()), "dar_tables_uuid": table_uuid,
+                "column_name": f"c{_column}", "column_description": "Column",
+            } for _column in range(number_of_columns))
+    with engine.begin() as connection:
+        # The counter of the workspace visibility (inserted by create-tables.sql)
+        connection.execute(sqlalchemy.insert(DataAccessRequestAclVersion).values(
+            acl_name="workspace_visibility", version=0
+        ))
+        connection.execute(sqlalchemy.insert(DataAccessRequestUser), [
+            {"user_uuid": str(_user), "user_full_name": f"User {_number}",
+             "user_username": f"user{_number}@example.com"}
+            for _number, _user in enumerate(users)
+        ])
+        connection.execute(sqlalchemy.insert(DataAccessRequestWorkspace), [
+            {"workspace_uuid": _workspace, "workspace_name": f"Workspace {_number}"}
+            for _number, _workspace in enumerate(workspaces)
+        ])
+        connection.execute(sqlalchemy.insert(DataAccessRequestWorkspaceVisibility), [
+            {"workspace_uuid": _workspace, "user_uuid": str(_user)}
+            for _workspace in workspaces for _user in users
+        ])
+        if requests:
+            connection.execute(sqlalchemy.insert(DataAccessRequest), requests)
+        if tables:
+            connection.execute(sqlalchemy.insert(DataAccessRequestTables), tables)
+        if columns:
+            connection.execute(sqlalchemy.insert(DataAccessRequestColumns), columns)
+    return requests
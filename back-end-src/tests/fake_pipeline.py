@@ -0,0 +1,82 @@
+"""In-process fake of the Azure Data Factory (aka ADF) client for tests of the provisioning
+worker and the run status poller (see PipelineClient and RunStatusClient)."""
+import asyncio
+import datetime
+import json
+import uuid
+
+from azure.mgmt.datafactory.models import PipelineRun
+
+from dataaccessrequest.adf_pipeline.query_payload import PayloadStore
+
+
+class FakePipelineClient:
+    """Creates pipeline runs in memory.
+
+    Attributes:
+        submissions (list[tuple[dict, uuid.UUID]]): Request definition and target workspace
+            of each created run.
+        runs (dict[str, PipelineRun]): Created runs by their run id.
+        queries (list[list[str]]): Run ids of each query of runs.
+        failures (int): Number of the next create_run calls that fail.
+        delay (float): Seconds each create_run waits (to overlap the submissions).
+        max_running (int): Highest number of create_run calls in progress at once.
+        payload_store (PayloadStore | None): If set, the request definition of each run is
+            staged there (as JSON) and passed in query_reference.
+    """
+
+    def __init__(self, delay: float = 0.0, payload_store: PayloadStore | None = None):
+        self.submissions: list[tuple[dict, uuid.UUID]] = []
+        self.runs: dict[str, PipelineRun] = {}
+        self.payload_store = payload_store
+        self.queries: list[list[str]] = []
+        self.failures = 0
+        self.delay = delay
+        self.max_running = 0
+        self._running = 0
+
+    async def create_run_async(self, request_def: dict, target_workspace: uuid.UUID) -> str:
+        self._running += 1
+        self.max_running = max(self.max_running, self._running)
+        try:
+            await asyncio.sleep(self.delay)
+            if self.failures > 0:
+                self.failures -= 1
+                raise ConnectionError("Data Factory is not available")
+            run_id = str(uuid.uuid4())
+            self.submissions.append((request_def, target_workspace))
+            parameters = {"workspace_uuid": str(target_workspace)}
+            if self.payload_store is not None:
+                parameters["query_reference"] = self.payload_store.put(
+                    json.dumps(request_def).encode()
+                )
+            self.runs[run_id] = PipelineRun.deserialize(
+                {"runId": run_id, "status": "Queued", "parameters": parameters}
+            )
+            return run_id
+        finally:
+            self._running -= 1
+
+    def run_link(self, run_id: str) -> str:
+        return f"https://adf.example.com/pipelineruns/{run_id}"
+
+    def finish_run(self, run_id: str, status: str = "Succeeded", duration_ms: int = 1000,
+                   message: str = "") -> None:
+        """Move the run to a final state."""
+        self.runs[run_id] = PipelineRun.deserialize({
+            "runId": run_id, "status": status, "durationInMs": duration_ms, "message": message,
+            "parameters": self.runs[run_id].parameters,
+        })
+
+    async def query_runs_async(self, run_ids: list[str],
+                               updated_after: datetime.datetime) -> list[PipelineRun]:
+        self.queries.append(list(run_ids))
+        return [self.runs[_run_id] for _run_id in run_ids if _run_id in self.runs]
+
+    async def delete_staged_payloads_async(self, pipeline_runs: list[PipelineRun]) -> int:
+        query_references = [_pipeline_run.parameters["query_reference"]
+                            for _pipeline_run in pipeline_runs
+                            if "query_reference" in _pipeline_run.parameters]
+        for _query_reference in query_references:
+            self.payload_store.delete(_query_reference)
+        return len(query_references)
@@ -0,0 +1,132 @@
+import asyncio
+import base64
+import datetime
+import json
+import uuid
+
+import pytest
+
+from config import CONFIG
+from dataaccessrequest.adf_pipeline.data_pipeline import DataPipelineClient
+from dataaccessrequest.adf_pipeline.query_payload import (
+    COMPACT_QUERY_FORMAT,
+    LocalPayloadStore,
+    decode_query_payload,
+)
+from dataaccessrequest.utils.catalogue_snapshot import CATALOGUE_LOADER
+from .adf_management import FakeCredential
+
+REQUEST_DEFINITION = {"t0": {"columns": ["c0", "c1"], "where_statement": None}}
+
+
+@pytest.fixture
+def credential() -> FakeCredential:
+    return FakeCredential()
+
+
+@pytest.fixture
+def adf_client(adf_management, credential) -> DataPipelineClient:
+    client = DataPipelineClient(CONFIG.ADF_SUBSCRIPTION_ID, adf_management.url, credential)
+    yield client
+    client.close()
+
+
+def test_runs_reuse_token_and_connection(adf_management, credential, adf_client):
+    workspace_uuid = uuid.uuid4()
+    run_ids = [adf_client.create_run(REQUEST_DEFINITION, workspace_uuid) for _ in range(3)]
+
+    assert set(run_ids) == set(adf_management.runs)
+    assert credential.tokens == 1
+    assert adf_management.connections == 1
+    for _path, _authorization, _payload in adf_management.calls:
+        assert _path.endswith(f"/pipelines/{CONFIG.ADF_PIPELINE_NAME}/createRun")
+        assert _authorization == "Bearer token-1"
+        assert _payload["workspace_uuid"] == str(workspace_uuid)
+        assert json.loads(base64.b64decode(_payload["query_base64"])) == REQUEST_DEFINITION
+
+
+def test_run_is_created_from_worker_thread(adf_management, adf_client):
+    run_id = asyncio.run(adf_client.create_run_async(REQUEST_DEFINITION, uuid.uuid4()))
+
+    assert adf_management.runs[run_id]["pipelineName"] == CONFIG.ADF_PIPELINE_NAME
+    assert adf_client.run_link(run_id).startswith(
+        f"https://adf.azure.com/en/monitoring/pipelineruns/{run_id}?"
+    )
+
+
+def test_closed_client_is_created_again(adf_management, adf_client):
+    adf_client.create_run(REQUEST_DEFINITION, uuid.uuid4())
+    adf_client.close()
+    adf_client.create_run(REQUEST_DEFINITION, uuid.uuid4())
+
+    assert len(adf_management.runs) == 2
+    assert adf_management.connections == 2
+
+
+def test_runs_are_queried_by_pipeline_and_picked_by_id(adf_management, adf_client):
+    adf_management.page_size = 2
+    run_ids = [adf_client.create_run(REQUEST_DEFINITION, uuid.uuid4()) for _ in range(5)]
+    adf_management.finish_run(run_ids[0], status="Failed", message="Table not found")
+    for _ in range(3):
+        adf_management.add_run("OtherPipeline", {})
+    queried_run_ids = run_ids[:3]
+
+    pipeline_runs = adf_client.query_runs(
+        queried_run_ids,
+        datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    )
+
+    assert sorted(_run.run_id for _run in pipeline_runs) == sorted(queried_run_ids)
+    failed_run = next(_run for _run in pipeline_runs if _run.run_id == run_ids[0])
+    assert (failed_run.status, failed_run.message) == ("Failed", "Table not found")
+    queries = [_payload for _path, _, _payload in adf_management.calls
+               if _path.endswith("/queryPipelineRuns")]
+    assert queries[0]["filters"] == [{
+        "operand": "PipelineName", "operator": "Equals", "values": [CONFIG.ADF_PIPELINE_NAME]
+    }]
+    # Pages (of runs of the pipeline ordered by id) are followed until all queried runs are
+    #   found
+    last_position = max(sorted(run_ids).index(_run_id) for _run_id in queried_run_ids)
+    assert [_query.get("continuationToken") for _query in queries] == [
+        None, *(str(_page * 2) for _page in range(1, last_position // 2 + 1))
+    ]
+
+
+
+def test_staged_payload_is_deleted_with_finished_run(tmp_path, adf_management, credential):
+    staging_directory = tmp_path / "payloads"
+    adf_client = DataPipelineClient(
+        CONFIG.ADF_SUBSCRIPTION_ID, adf_management.url, credential,
+        query_format=COMPACT_QUERY_FORMAT, inline_limit=0,
+        staging_url=staging_directory.as_uri(),
+    )
+    run_id = adf_client.create_run(REQUEST_DEFINITION, uuid.uuid4())
+    (payload_path,) = staging_directory.iterdir()
+    assert decode_query_payload(payload_path.read_bytes(), CATALOGUE_LOADER.snapshot) == \
+           REQUEST_DEFINITION
+    adf_management.finish_run(run_id)
+
+    (pipeline_run,) = adf_client.query_runs(
+        [run_id], datetime.datetime.now(datetime.timezone.utc) - datetime.timedelta(days=1)
+    )
+
+    assert pipeline_run.parameters["query_reference"] == payload_path.as_uri()
+    assert adf_client.delete_staged_payloads([pipeline_run]) == 1
+    assert list(staging_directory.iterdir()) == []
+    # Deleted payloads (and URLs outside of the staging directory) are ignored
+    assert adf_client.delete_staged_payloads([pipeline_run]) == 1
+    adf_client.close()
+
+
+def test_local_payload_store_deletes_only_its_payloads(tmp_path):
+    payload_store = LocalPayloadStore(tmp_path / "payloads")
+    other_path = tmp_path / "other.json.gz"
+    other_path.write_bytes(b"other")
+
+    reference = payload_store.put(b"payload")
+    payload_store.delete(other_path.as_uri())
+
+    assert other_path.exists()
+    assert [_path.read_bytes() for _path in payload_store.directory.iterdir()] == [b"payload"]
+    payload_store.delete(reference)
+    assert list(payload_store.directory.iterdir()) == []
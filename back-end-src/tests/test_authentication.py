@@ -0,0 +1,82 @@
+import asyncio
+import uuid
+
+import pytest
+from fastapi import HTTPException
+from fastapi.security import SecurityScopes
+from fastapi_azure_auth.exceptions import InvalidAuth
+from starlette.requests import Request
+
+from dataaccessrequest.authentication.role_validators import CachedAzureAuthorizationCodeBearer
+from dataaccessrequest.utils.ttl_cache import TTLCache
+from .conftest import RESEARCHER
+from .tokens import TokenIssuer
+
+TENANT_ID = str(uuid.UUID(int=1))
+APP_CLIENT_ID = str(uuid.UUID(int=2))
+
+
+@pytest.fixture(scope="module")
+def token_issuer() -> TokenIssuer:
+    return TokenIssuer(TENANT_ID, APP_CLIENT_ID)
+
+
+def _bearer(token_issuer: TokenIssuer, auto_error: bool = True
+            ) -> CachedAzureAuthorizationCodeBearer:
+    bearer = CachedAzureAuthorizationCodeBearer(
+        TTLCache(16, 300), app_client_id=APP_CLIENT_ID, tenant_id=TENANT_ID,
+        allow_guest_users=True, scopes={f"api://{APP_CLIENT_ID}/user_impersonation": "access"},
+        auto_error=auto_error,
+    )
+    token_issuer.configure(bearer)
+    return bearer
+
+
+def _request(access_token: str | None) -> Request:
+    headers = []
+    if access_token is not None:
+        headers.append((b"authorization", f"Bearer {access_token}".encode()))
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": headers})
+
+
+def _authenticate(bearer: CachedAzureAuthorizationCodeBearer, request: Request):
+    return asyncio.run(bearer(request, SecurityScopes()))
+
+
+def test_principal_is_cached_by_token(token_issuer):
+    bearer = _bearer(token_issuer)
+    access_token = token_issuer.issue(RESEARCHER)
+
+    first_request = _request(access_token)
+    assert _authenticate(bearer, first_request) == RESEARCHER
+    # Cached tokens are not validated again, the user is still attached to the request
+    bearer.openid_config.signing_keys = {}
+    second_request = _request(access_token)
+    assert _authenticate(bearer, second_request) == RESEARCHER
+    assert second_request.state.user == first_request.state.user
+    assert str(second_request.state.user.oid) == str(RESEARCHER.oid)
+    assert len(bearer.principal_cache) == 1
+
+
+@pytest.mark.parametrize("access_token", [None, "not-a-token"])
+def test_invalid_token_is_rejected(token_issuer, access_token):
+    bearer = _bearer(token_issuer)
+
+    with pytest.raises(HTTPException) as error:
+        _authenticate(bearer, _request(access_token))
+
+    assert error.value.status_code == 401
+    assert len(bearer.principal_cache) == 0
+
+
+@pytest.mark.parametrize("access_token", [None, "not-a-token"])
+def test_invalid_token_without_auto_error_is_anonymous(token_issuer, access_token):
+    request = _request(access_token)
+
+    assert _authenticate(_bearer(token_issuer, auto_error=False), request) is None
+    assert not hasattr(request.state, "user")
+
+
+def test_expired_token_is_rejected(token_issuer):
+    with pytest.raises(InvalidAuth):
+        _authenticate(_bearer(token_issuer), _request(token_issuer.issue(RESEARCHER, -60)))
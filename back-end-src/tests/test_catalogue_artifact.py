@@ -0,0 +1,63 @@
+import gzip
+import json
+
+import brotli
+import pytest
+
+from riocatalogue.create_catalogue import (
+    create_facets,
+    create_fuzzy_index,
+    create_search_index,
+    read_catalogue_artifact,
+    write_catalogue_artifact,
+)
+from .catalogue import synthetic_catalogue
+
+QUERIES = ("client", "date of", "blood pressure", "ward0", "xq")
+
+
+def _facet_arrays(facets) -> tuple:
+    return (list(facets.table_names), facets.flag_bitmaps, facets.data_type_bitmaps,
+            facets.classification_bitmaps, list(facets.rows_order), list(facets.sorted_rows),
+            facets.rows_checkpoints)
+
+
+@pytest.mark.parametrize("number_of_tables", [0, 1, 150])
+def test_catalogue_artifact_round_trip(tmp_path, number_of_tables):
+    catalogue, search_catalogue = synthetic_catalogue(tmp_path, number_of_tables, 5)
+    artifact_path = tmp_path / "catalogue.bin"
+    write_catalogue_artifact(artifact_path, catalogue, search_catalogue)
+
+    artifact = read_catalogue_artifact(artifact_path)
+
+    assert dict(artifact.catalogue) == catalogue
+    facets = artifact.facets()
+    expected_facets = create_facets(catalogue)
+    assert _facet_arrays(facets) == _facet_arrays(expected_facets)
+    for _min_rows, _max_rows in ((None, None), (0, None), (100, 10 ** 6), (None, 10)):
+        assert facets.filter({}, [], [], _min_rows, _max_rows) == \
+               expected_facets.filter({}, [], [], _min_rows, _max_rows)
+    assert facets.counts(facets.all_tables) == expected_facets.counts(facets.all_tables)
+    search_index = artifact.search_index()
+    expected_search_index = create_search_index(catalogue, search_catalogue)
+    fuzzy_index = artifact.fuzzy_index()
+    expected_fuzzy_index = create_fuzzy_index(catalogue)
+    for _query in QUERIES:
+        assert search_index.rank(_query, 20) == expected_search_index.rank(_query, 20)
+        assert fuzzy_index.rank(_query, 0.4, 20) == expected_fuzzy_index.rank(_query, 0.4, 20)
+
+
+def test_documents_are_stored_compressed(tmp_path):
+    catalogue, search_catalogue = synthetic_catalogue(tmp_path, 20, 5)
+    artifact_path = tmp_path / "catalogue.bin"
+    write_catalogue_artifact(artifact_path, catalogue, search_catalogue)
+
+    artifact = read_catalogue_artifact(artifact_path)
+
+    for _name in ("catalogue", "table_summaries"):
+        document = artifact.document(_name)
+        encoded_documents = artifact.encoded_documents(_name)
+        assert set(encoded_documents) == {"br", "gzip"}
+        assert brotli.decompress(encoded_documents["br"]) == document
+        assert gzip.decompress(encoded_documents["gzip"]) == document
+    assert json.loads(bytes(artifact.document("catalogue"))) == catalogue
@@ -0,0 +1,92 @@
+import random
+
+import pytest
+
+from riocatalogue.catalogue_index import (
+    COLUMN_DESCRIPTION_WEIGHT,
+    COLUMN_NAME_WEIGHT,
+    FIELD_SEPARATOR,
+    TABLE_NAME_WEIGHT,
+)
+from riocatalogue.create_catalogue import create_search_index
+from .catalogue import synthetic_catalogue
+
+FIXED_QUERIES = ("client", "Date of", "blood pressure", "ward0", "xq", "c", "e.", ". ", " ",
+                 "|", "a|b", "care|plan", FIELD_SEPARATOR, f"ward{FIELD_SEPARATOR}bed")
+
+
+@pytest.fixture(scope="module")
+def catalogue_and_index(tmp_path_factory) -> tuple[dict, object]:
+    catalogue, search_catalogue = synthetic_catalogue(tmp_path_factory.mktemp("catalogue"),
+                                                      60, 8)
+    # Descriptions may contain the characters used to join fields (in the past or now)
+    for _entry in list(catalogue.values())[:5]:
+        for _column in list(_entry["columns"].values())[:2]:
+            _column["description"] += f" care|plan ward{FIELD_SEPARATOR}bed"
+    return catalogue, create_search_index(catalogue, _search_catalogue(catalogue))
+
+
+def _search_catalogue(catalogue: dict) -> dict:
+    """Search strings of the (modified) catalogue, as create_catalogue joins them."""
+    return {
+        _table: FIELD_SEPARATOR.join(
+            _field.replace(FIELD_SEPARATOR, " ") for _field in _fields(_table, _entry)
+        )
+        for _table, _entry in catalogue.items()
+    }
+
+
+def _fields(table_name: str, entry: dict) -> list[str]:
+    return [table_name.lower()] + [_column.lower() for _column in entry["columns"]] + [
+        _column["description"].lower() for _column in entry["columns"].values()
+    ]
+
+
+def _baseline_score(table_name: str, entry: dict, terms: list[str]) -> int:
+    """Score of the table by scanning each field on its own (zero if any term is missing)."""
+    fields = [_field.replace(FIELD_SEPARATOR, " ") for _field in _fields(table_name, entry)]
+    number_of_columns = len(entry["columns"])
+    score = 0
+    for _term in terms:
+        term_score = (
+            TABLE_NAME_WEIGHT * (_term in fields[0])
+            + COLUMN_NAME_WEIGHT * sum(
+                _field.count(_term) for _field in fields[1:number_of_columns + 1]
+            )
+            + COLUMN_DESCRIPTION_WEIGHT * sum(
+                _field.count(_term) for _field in fields[number_of_columns + 1:]
+            )
+        )
+        if not term_score:
+            return 0
+        score += term_score
+    return score
+
+
+def _queries(catalogue: dict) -> list[str]:
+    """Fixed queries and random substrings of the joined fields (many of them crossing
+    the boundary of two fields)."""
+    random_generator = random.Random(7)
+    joined_fields = ["|".join(_fields(_table, _entry)) for _table, _entry in catalogue.items()]
+    queries = list(FIXED_QUERIES)
+    for _ in range(300):
+        text = random_generator.choice(joined_fields)
+        start = random_generator.randrange(len(text))
+        queries.append(text[start:start + random_generator.randint(1, 12)])
+    return queries
+
+
+def test_search_matches_fields_like_linear_scan(catalogue_and_index):
+    catalogue, search_index = catalogue_and_index
+
+    for _query in _queries(catalogue):
+        terms = search_index.search_terms(_query)
+        expected = {_table: _baseline_score(_table, _entry, terms)
+                    for _table, _entry in catalogue.items()}
+        expected = {_table: _score for _table, _score in expected.items() if _score}
+        assert search_index.search(_query) == list(expected), _query
+        matching_ids, ranked_tables = search_index.rank(_query, len(catalogue))
+        assert [search_index.table_names[_table_id] for _table_id in matching_ids] == \
+               list(expected), _query
+        assert {_table: _score for _table, _score, _columns in ranked_tables} == expected, \
+            _query
@@ -0,0 +1,103 @@
+import gzip
+import json
+
+import brotli
+import pytest
+from starlette.requests import Request
+
+from dataaccessrequest.utils.encoded_response import PreEncodedJSON, negotiate_content_coding
+
+CONTENT = {"tables": [{"name": f"Table{_number}", "rows": _number} for _number in range(100)]}
+ALL_CODINGS = ("br", "gzip")
+
+
+@pytest.mark.parametrize("accept_encoding, available_codings, coding", [
+    # Missing header, any coding is acceptable, the body is sent as it is
+    (None, ALL_CODINGS, "identity"),
+    # Empty header, no coding is wanted
+    ("", ALL_CODINGS, "identity"),
+    ("gzip", ALL_CODINGS, "gzip"),
+    ("gzip, deflate, br", ALL_CODINGS, "br"),
+    ("GZIP;Q=0.8", ALL_CODINGS, "gzip"),
+    ("x-gzip", ALL_CODINGS, "gzip"),
+    ("br;q=0.5, gzip", ALL_CODINGS, "gzip"),
+    ("br;q=0, gzip;q=0", ALL_CODINGS, "identity"),
+    ("br;q=invalid", ALL_CODINGS, "identity"),
+    ("deflate", ALL_CODINGS, "identity"),
+    # "*" stands for codings not listed
+    ("*", ALL_CODINGS, "br"),
+    ("br;q=0, *", ALL_CODINGS, "gzip"),
+    ("*;q=0", ALL_CODINGS, None),
+    ("*;q=0, identity", ALL_CODINGS, "identity"),
+    ("*;q=0, gzip;q=0.1", ALL_CODINGS, "gzip"),
+    # The identity refused explicitly
+    ("identity;q=0", ALL_CODINGS, None),
+    ("identity;q=0, gzip", ALL_CODINGS, "gzip"),
+    ("identity;q=0, *", ALL_CODINGS, "br"),
+    # The identity listed competes with the codings by its q-value
+    ("identity, br;q=0.5", ALL_CODINGS, "identity"),
+    ("identity;q=0.5, br", ALL_CODINGS, "br"),
+    ("identity, br", ALL_CODINGS, "br"),
+    # Codings not available for the body (e.g. it is too small to be compressed)
+    ("br", ("gzip",), "identity"),
+    ("br, gzip;q=0.5", ("gzip",), "gzip"),
+    ("gzip, br", (), "identity"),
+    ("*", (), "identity"),
+    ("identity;q=0, gzip", (), None),
+])
+def test_content_coding_negotiation(accept_encoding, available_codings, coding):
+    assert negotiate_content_coding(accept_encoding, available_codings) == coding
+
+
+def _request(**headers) -> Request:
+    return Request({"type": "http", "method": "GET", "path": "/", "headers": [
+        (_name.replace("_", "-").encode(), _value.encode()) for _name, _value in headers.items()
+    ]})
+
+
+@pytest.mark.parametrize("coding, decompress", [
+    ("br", brotli.decompress), ("gzip", gzip.decompress), (None, bytes)
+])
+def test_response_is_sent_in_negotiated_coding(coding, decompress):
+    payload = PreEncodedJSON(CONTENT)
+
+    response = payload.response(_request(accept_encoding=coding or "identity"))
+
+    assert response.status_code == 200
+    assert response.headers.get("content-encoding") == coding
+    assert response.headers["etag"] == payload.etag(coding)
+    assert json.loads(decompress(response.body)) == CONTENT
+
+
+def test_response_is_not_acceptable():
+    response = PreEncodedJSON(CONTENT).response(_request(accept_encoding="identity;q=0, zstd"))
+
+    assert response.status_code == 406
+    assert response.headers["vary"] == "Accept-Encoding"
+
+
+def test_response_is_not_modified_for_any_representation():
+    payload = PreEncodedJSON(CONTENT)
+
+    response = payload.response(
+        _request(accept_encoding="br", if_none_match=payload.etag("gzip"))
+    )
+
+    assert response.status_code == 304
+    assert response.headers["etag"] == payload.etag("br")
+
+
+def test_given_body_is_served_without_copy_and_compression():
+    body = memoryview(json.dumps(CONTENT).encode())
+    encoded_body = memoryview(gzip.compress(body))
+    payload = PreEncodedJSON(body=body, encoded_bodies={"gzip": encoded_body}, version="v1")
+
+    identity_response = payload.response(_request(accept_encoding="identity"))
+    gzip_response = payload.response(_request(accept_encoding="br, gzip"))
+
+    assert identity_response.body is body
+    assert identity_response.headers["etag"] == '"v1"'
+    assert identity_response.headers["content-length"] == str(len(body))
+    assert gzip_response.body is encoded_body
+    assert gzip_response.headers["etag"] == '"v1-gzip"'
+    assert payload.response(_request(if_none_match='"v1-br"')).status_code == 304
@@ -0,0 +1,122 @@
+import datetime
+import json
+import uuid
+from base64 import urlsafe_b64encode
+from collections.abc import Iterable
+
+import pytest
+import sqlalchemy
+
+from dataaccessrequest.sql_models.db_models import DataAccessRequest
+from .conftest import DATA_MANAGER, RESEARCHER
+from .database import seed_database
+
+NUMBER_OF_REQUESTS = 30
+# Requests created at the same time (so pages end in the middle of the ties)
+REQUESTS_PER_CREATED_ON = 4
+PAGE_SIZE = 7
+
+
+@pytest.fixture
+def listed_requests(database) -> list[dict]:
+    requests = seed_database(database.engine, [DATA_MANAGER.user_uuid, RESEARCHER.user_uuid],
+                             NUMBER_OF_REQUESTS, 0, 0, number_of_workspaces=3)
+    with database.engine.begin() as connection:
+        for _number, _request in enumerate(requests):
+            _request["created_on"] = datetime.datetime(2024, 1, 1) + datetime.timedelta(
+                hours=_number // REQUESTS_PER_CREATED_ON
+            )
+            connection.execute(sqlalchemy.update(DataAccessRequest).where(
+                DataAccessRequest.request_uuid == _request["request_uuid"]
+            ).values(created_on=_request["created_on"]))
+    return requests
+
+
+def _list_pages(api, **params) -> list[list[str]]:
+    """Follow next_cursor from the first page to the last one."""
+    pages = []
+    cursor = None
+    while True:
+        response = api.request("GET", "/requests", params={
+            **params, "limit": PAGE_SIZE, **({"cursor": cursor} if cursor else {})
+        })
+        assert response.status_code == 200, response.text
+        pages.append([_request["request_uuid"] for _request in response.json()["items"]])
+        cursor = response.json()["next_cursor"]
+        if cursor is None:
+            return pages
+
+
+def _ordered_uuids(requests: Iterable[dict], newest_first: bool = True) -> list[str]:
+    return [_request["request_uuid"] for _request in sorted(
+        requests, key=lambda _request: (_request["created_on"],
+                                        uuid.UUID(_request["request_uuid"])),
+        reverse=newest_first
+    )]
+
+
+@pytest.mark.parametrize("sort_order", ["newest_first", "oldest_first"])
+def test_pages_follow_each_other(api, listed_requests, sort_order):
+    pages = _list_pages(api, sort_order=sort_order)
+
+    assert [len(_page) for _page in pages] == [PAGE_SIZE] * 4 + [2]
+    assert sum(pages, []) == _ordered_uuids(listed_requests, sort_order == "newest_first")
+
+
+@pytest.mark.parametrize("params, selected", [
+    ({"status": "approved"}, lambda _request: _request["status"] == "approved"),
+    ({"creator_uuid": str(RESEARCHER.user_uuid)},
+     lambda _request: _request["creator_uuid"] == str(RESEARCHER.user_uuid)),
+    ({"created_from": "2024-01-01T02:00:00", "created_to": "2024-01-01T06:00:00"},
+     lambda _request: datetime.datetime(2024, 1, 1, 2) <= _request["created_on"] <
+     datetime.datetime(2024, 1, 1, 6)),
+    ({"status": "pending", "sort_order": "oldest_first"},
+     lambda _request: _request["status"] == "pending"),
+])
+def test_pages_of_filtered_requests(api, listed_requests, params, selected):
+    pages = _list_pages(api, **params)
+
+    assert sum(pages, []) == _ordered_uuids(
+        filter(selected, listed_requests), params.get("sort_order") != "oldest_first"
+    )
+
+
+def test_pages_of_workspace(api, listed_requests):
+    workspace_uuid = listed_requests[1]["workspace_uuid"]
+
+    pages = _list_pages(api, workspace_uuid=workspace_uuid)
+
+    assert sum(pages, []) == _ordered_uuids(
+        _request for _request in listed_requests if _request["workspace_uuid"] == workspace_uuid
+    )
+
+
+def test_researcher_pages_only_own_requests(api, listed_requests):
+    api.user = RESEARCHER
+
+    pages = _list_pages(api)
+
+    assert sum(pages, []) == _ordered_uuids(
+        _request for _request in listed_requests
+        if _request["creator_uuid"] == str(RESEARCHER.user_uuid)
+    )
+
+
+def _cursor(values) -> str:
+    return urlsafe_b64encode(json.dumps(values).encode()).decode()
+
+
+@pytest.mark.parametrize("cursor", [
+    "not a cursor",
+    urlsafe_b64encode(b"\xff\xfe").decode(),
+    _cursor({"created_on": "2024-01-01T00:00:00"}),
+    _cursor(["2024-01-01T00:00:00"]),
+    _cursor(["2024-01-01T00:00:00", 1]),
+    _cursor(["yesterday", str(uuid.UUID(int=0))]),
+    _cursor(["2024-01-01T00:00:00", "not a UUID"]),
+])
+def test_malformed_cursor_is_rejected(api, listed_requests, cursor):
+    response = api.request("GET", "/requests", params={"cursor": cursor})
+
+    assert response.status_code == 400
+    assert response.json()["detail"] == "invalid cursor"
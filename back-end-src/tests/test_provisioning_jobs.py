@@ -0,0 +1,267 @@
+import asyncio
+
+import pytest
+import sqlalchemy
+
+from dataaccessrequest.adf_pipeline.fan_out import split_request_definition
+from dataaccessrequest.adf_pipeline.provisioning_jobs import ProvisioningWorker
+from dataaccessrequest.routes import requests as requests_routes
+from dataaccessrequest.sql_models.db_models import (
+    DataAccessRequest,
+    DataAccessRequestProvisioningJob,
+)
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY, SessionManager
+from .conftest import DATA_MANAGER
+from .database import seed_database
+from .fake_pipeline import FakePipelineClient
+
+NUMBER_OF_REQUESTS = 12
+NUMBER_OF_TABLES = 2
+NUMBER_OF_COLUMNS = 3
+
+
+@pytest.fixture
+def approved_requests(seeded_requests) -> list[dict]:
+    return [_request for _request in seeded_requests if _request["status"] == "approved"]
+
+
+def _worker(pipeline_client: FakePipelineClient, concurrency: int = 2, max_attempts: int = 3,
+            fan_out_min_tables: int = 0, fan_out_parallelism: int = 1) -> ProvisioningWorker:
+    return ProvisioningWorker(pipeline_client, concurrency=concurrency,
+                              max_attempts=max_attempts, retry_backoff=0, poll_interval=0.01,
+                              job_timeout=600, fan_out_min_tables=fan_out_min_tables,
+                              fan_out_parallelism=fan_out_parallelism)
+
+
+def _commit(api, request: dict) -> dict:
+    response = api.request("PUT", "/request-adf-commit",
+                           params={"request_uuid": request["request_uuid"]})
+    assert response.status_code == 202
+    return response.json()
+
+
+def _count_unfinished_jobs(session) -> int:
+    return session.scalar(sqlalchemy.select(sqlalchemy.func.count()).where(
+        DataAccessRequestProvisioningJob.status.in_(["queued", "running"])
+    ))
+
+
+def _process_jobs(worker: ProvisioningWorker) -> None:
+    """Run the worker until no job is queued or running."""
+    async def _run() -> None:
+        worker_task = asyncio.create_task(worker.run())
+        try:
+            while await SessionManager.run_sync(_count_unfinished_jobs):
+                await asyncio.sleep(0.01)
+        finally:
+            worker_task.cancel()
+            await worker.drain()
+
+    asyncio.run(asyncio.wait_for(_run(), timeout=10))
+
+
+def _job(api, job: dict) -> dict:
+    response = api.request("GET", "/provisioning-job", params={"job_uuid": job["job_uuid"]})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_job_submits_run_and_stores_link(api, approved_requests, pipeline_client):
+    request = approved_requests[0]
+    job = _commit(api, request)
+    assert job["status"] == "queued"
+
+    _process_jobs(_worker(pipeline_client))
+
+    job = _job(api, job)
+    (run_id,) = pipeline_client.runs
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 1
+    assert job["adf_link"] == pipeline_client.run_link(run_id)
+    assert [_run["run_id"] for _run in job["runs"]] == [run_id]
+    assert pipeline_client.submissions == [({
+        f"t{_table}": {"columns": [f"c{_column}" for _column in range(NUMBER_OF_COLUMNS)],
+                       "where_statement": None}
+        for _table in range(NUMBER_OF_TABLES)
+    }, request["workspace_uuid"])]
+    with SESSION_FACTORY() as session:
+        stored_request = session.get(DataAccessRequest, request["request_uuid"])
+        assert stored_request.adf_link == job["adf_link"]
+        assert stored_request.adf_run_id == run_id
+
+
+def test_active_job_is_returned_again(api, approved_requests):
+    job = _commit(api, approved_requests[0])
+
+    assert _commit(api, approved_requests[0])["job_uuid"] == job["job_uuid"]
+
+
+def test_concurrent_commit_returns_job_created_first(api, approved_requests, monkeypatch):
+    job = _commit(api, approved_requests[0])
+    select_active_job = requests_routes._select_active_provisioning_job
+    calls = []
+
+    def _select_after_concurrent_commit(session, request_uuid):
+        # The first check runs before the concurrent commit created its job
+        calls.append(request_uuid)
+        return None if len(calls) == 1 else select_active_job(session, request_uuid)
+
+    monkeypatch.setattr(requests_routes, "_select_active_provisioning_job",
+                        _select_after_concurrent_commit)
+
+    assert _commit(api, approved_requests[0])["job_uuid"] == job["job_uuid"]
+    assert len(calls) == 2
+    with SESSION_FACTORY() as session:
+        assert _count_unfinished_jobs(session) == 1
+
+
+def test_second_active_job_of_request_is_rejected(api, approved_requests):
+    job = _commit(api, approved_requests[0])
+
+    with SESSION_FACTORY() as session, pytest.raises(sqlalchemy.exc.IntegrityError,
+                                                      match="request_uuid"):
+        session.add(DataAccessRequestProvisioningJob(
+            request_uuid=job["request_uuid"], status="running"
+        ))
+        session.commit()
+
+
+def test_failed_submission_is_retried(api, approved_requests, pipeline_client):
+    job = _commit(api, approved_requests[0])
+    pipeline_client.failures = 1
+
+    _process_jobs(_worker(pipeline_client))
+
+    job = _job(api, job)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    assert job["error"] is None
+    assert len(pipeline_client.runs) == 1
+
+
+def test_job_fails_after_max_attempts(api, approved_requests, pipeline_client):
+    job = _commit(api, approved_requests[0])
+    pipeline_client.failures = 10
+
+    _process_jobs(_worker(pipeline_client, max_attempts=3))
+
+    job = _job(api, job)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 3
+    assert "Data Factory is not available" in job["error"]
+    assert job["adf_link"] is None
+    assert pipeline_client.failures == 7
+
+
+def test_request_not_approved_anymore_is_not_retried(api, approved_requests,
+                                                     pipeline_client):
+    request = approved_requests[0]
+    job = _commit(api, request)
+    response = api.request("PUT", "/review-request", json={
+        "request_uuid": request["request_uuid"], "status": "rejected",
+        "reviewer_decision": "Withdrawn",
+    })
+    assert response.status_code == 200
+
+    _process_jobs(_worker(pipeline_client))
+
+    job = _job(api, job)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+    assert pipeline_client.submissions == []
+
+
+def test_submissions_are_bounded_by_concurrency(api, approved_requests):
+    pipeline_client = FakePipelineClient(delay=0.05)
+    jobs = [_commit(api, _request) for _request in approved_requests]
+
+    _process_jobs(_worker(pipeline_client, concurrency=2))
+
+    assert {_job(api, _current)["status"] for _current in jobs} == {"succeeded"}
+    assert len(pipeline_client.runs) == len(approved_requests)
+    assert pipeline_client.max_running == 2
+
+
+def test_request_without_tables_fails_without_retry(database, api, pipeline_client):
+    (request,) = seed_database(database.engine, [DATA_MANAGER.user_uuid], 2, 0, 0)[1:]
+    job = _commit(api, request)
+
+    _process_jobs(_worker(pipeline_client))
+
+    job = _job(api, job)
+    assert job["status"] == "failed"
+    assert job["attempts"] == 1
+    assert "request has no tables" in job["error"]
+    assert pipeline_client.submissions == []
+
+
+def _submitted_tables(pipeline_client: FakePipelineClient) -> list[list[str]]:
+    return [sorted(_request_definition) for _request_definition, _ in pipeline_client.submissions]
+
+
+def test_split_spreads_tables_without_rows():
+    # Tables no longer in the catalogue have no rows
+    request_definition = {f"t{_table}": {} for _table in range(7)}
+
+    groups = split_request_definition(request_definition, lambda _table: 0, 3)
+
+    assert [sorted(_definition) for _definition, _ in groups] == [
+        ["t0", "t3", "t6"], ["t1", "t4"], ["t2", "t5"]
+    ]
+
+
+def test_large_request_is_split_into_groups(database, api, pipeline_client):
+    (request,) = seed_database(database.engine, [DATA_MANAGER.user_uuid], 2, 5, 2)[1:]
+    job = _commit(api, request)
+
+    _process_jobs(_worker(pipeline_client, fan_out_min_tables=4, fan_out_parallelism=3))
+
+    job = _job(api, job)
+    assert job["status"] == "succeeded"
+    assert sorted(map(len, _submitted_tables(pipeline_client))) == [1, 2, 2]
+    assert sorted(sum(_submitted_tables(pipeline_client), [])) == [f"t{_table}"
+                                                                   for _table in range(5)]
+    assert [_run["group_number"] for _run in job["runs"]] == [0, 1, 2]
+
+
+def test_small_request_is_not_split(api, approved_requests, pipeline_client):
+    job = _commit(api, approved_requests[0])
+
+    _process_jobs(_worker(pipeline_client, fan_out_min_tables=NUMBER_OF_TABLES + 1,
+                          fan_out_parallelism=3))
+
+    assert _job(api, job)["status"] == "succeeded"
+    assert _submitted_tables(pipeline_client) == [
+        [f"t{_table}" for _table in range(NUMBER_OF_TABLES)]
+    ]
+
+
+def test_retry_keeps_submitted_groups(database, api, pipeline_client):
+    (request,) = seed_database(database.engine, [DATA_MANAGER.user_uuid], 2, 6, 2)[1:]
+    job = _commit(api, request)
+    # The first of the three groups fails, the other two are submitted
+    pipeline_client.failures = 1
+
+    _process_jobs(_worker(pipeline_client, fan_out_min_tables=4, fan_out_parallelism=3))
+
+    job = _job(api, job)
+    assert job["status"] == "succeeded"
+    assert job["attempts"] == 2
+    submitted_tables = _submitted_tables(pipeline_client)
+    assert len(submitted_tables) == 3
+    # Each table is submitted once, the retry submits only tables of the failed group
+    assert sorted(sum(submitted_tables, [])) == [f"t{_table}" for _table in range(6)]
+    assert len(submitted_tables[-1]) == 2
+    # The retry numbers its group after the groups already submitted
+    assert sorted(_run["group_number"] for _run in job["runs"]) == [1, 2, 3]
+    assert job["adf_link"] == pipeline_client.run_link(job["runs"][0]["run_id"])
+
+
+def test_jobs_get_distinct_default_uuids(approved_requests):
+    with SESSION_FACTORY() as session:
+        jobs = [DataAccessRequestProvisioningJob(request_uuid=approved_requests[0]["request_uuid"],
+                                                 status="failed") for _ in range(2)]
+        session.add_all(jobs)
+        session.commit()
+
+        assert jobs[0].job_uuid != jobs[1].job_uuid
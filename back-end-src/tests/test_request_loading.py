@@ -0,0 +1,42 @@
+import pytest
+
+from .conftest import DATA_MANAGER, RESEARCHER
+
+NUMBER_OF_REQUESTS = 50
+NUMBER_OF_TABLES = 5
+NUMBER_OF_COLUMNS = 20
+# Tables holding what RequestListModel shows (the request, its workspace and creator)
+LIST_TABLES = {"DataAccessRequest", "DataAccessRequestWorkspace", "DataAccessRequestUser"}
+
+
+@pytest.mark.parametrize("user, listed_requests", [
+    (DATA_MANAGER, NUMBER_OF_REQUESTS),
+    (RESEARCHER, NUMBER_OF_REQUESTS // 2),
+])
+def test_request_list_loads_only_listed_columns(api, database, seeded_requests,
+                                                user, listed_requests):
+    api.user = user
+    database.recorder.reset()
+    response = api.request("GET", "/requests")
+
+    assert response.status_code == 200
+    assert len(response.json()["items"]) == listed_requests
+    # One joined query, no requested tables and columns are fetched
+    assert database.recorder.round_trips == 1
+    assert database.recorder.tables() == LIST_TABLES
+    assert database.recorder.rows_fetched == listed_requests
+
+
+def test_request_detail_loads_tables_and_columns(api, database, seeded_requests):
+    database.recorder.reset()
+    response = api.request(
+        "GET", "/request", params={"request_uuid": seeded_requests[0]["request_uuid"]}
+    )
+
+    assert response.status_code == 200
+    tables_and_columns = response.json()["tables_and_columns"]
+    assert len(tables_and_columns) == NUMBER_OF_TABLES
+    assert all(len(_table["columns"]) == NUMBER_OF_COLUMNS for _table in tables_and_columns)
+    # The request (joined with its workspace and users), its tables, their columns
+    assert database.recorder.round_trips == 3
+    assert database.recorder.rows_fetched == 1 + NUMBER_OF_TABLES * (1 + NUMBER_OF_COLUMNS)
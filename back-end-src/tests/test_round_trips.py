@@ -0,0 +1,177 @@
+"""Number of statements each end-point sends to the database (with the process-wide caches
+warm, as they are for all but the first request of a worker process)."""
+import uuid
+
+import pytest
+
+from dataaccessrequest.utils.data_access import KNOWN_USERS
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from dataaccessrequest.utils.workspace_acl import WORKSPACE_ACL
+from .conftest import DATA_MANAGER, RESEARCHER
+
+UNKNOWN_UUID = str(uuid.UUID(int=0))
+NUMBER_OF_REQUESTS = 6
+NUMBER_OF_TABLES = 2
+NUMBER_OF_COLUMNS = 3
+NUMBER_OF_WORKSPACES = 2
+
+
+@pytest.fixture
+def warm_caches(database, seeded_requests) -> None:
+    """Load the process-wide caches and forget the statements sent so far."""
+    with SESSION_FACTORY() as session:
+        WORKSPACE_ACL.load(session)
+    for _user in (DATA_MANAGER, RESEARCHER):
+        KNOWN_USERS.put(_user.user_uuid, True)
+    database.recorder.reset()
+
+
+def _request_body(requests: list[dict]) -> dict:
+    return {
+        "title": "New request",
+        "workspace": {"workspace_uuid": requests[0]["workspace_uuid"],
+                      "workspace_name": "Workspace 0"},
+        "justification": "Justification",
+        "comment": None,
+        "tables_and_columns": [
+            {"table_name": f"t{_table}", "table_description": "Table",
+             "where_statement": None,
+             "columns": [{"column_name": f"c{_column}", "column_description": "Column"}
+                         for _column in range(20)]}
+            for _table in range(5)
+        ],
+    }
+
+
+def _workspace_body(workspace_uuid: str, users: list) -> dict:
+    return {"workspace_uuid": workspace_uuid, "workspace_name": "Renamed",
+            "visible_for_users": [str(_user) for _user in users]}
+
+
+# (user, method, url, keyword arguments of the call from seeded requests, status, round-trips)
+#   requests[0] is pending (by the Data Manager), requests[1] approved (by the Researcher)
+ROUND_TRIPS = {
+    "list requests": (
+        RESEARCHER, "GET", "/requests", lambda _requests: {}, 200, 1
+    ),
+    "get request": (
+        DATA_MANAGER, "GET", "/request",
+        lambda _requests: {"params": {"request_uuid": _requests[0]["request_uuid"]}}, 200, 3
+    ),
+    "get missing request": (
+        DATA_MANAGER, "GET", "/request",
+        lambda _requests: {"params": {"request_uuid": UNKNOWN_UUID}}, 404, 1
+    ),
+    "post request": (
+        RESEARCHER, "POST", "/request",
+        lambda _requests: {"json": _request_body(_requests)}, 200, 3
+    ),
+    "post request to hidden workspace": (
+        RESEARCHER, "POST", "/request",
+        lambda _requests: {"json": _request_body(_requests) | {
+            "workspace": {"workspace_uuid": UNKNOWN_UUID, "workspace_name": "Hidden"}
+        }}, 403, 0
+    ),
+    "delete request": (
+        RESEARCHER, "DELETE", "/request",
+        lambda _requests: {"params": {"request_uuid": _requests[1]["request_uuid"]}}, 200, 1
+    ),
+    "delete request of another user": (
+        RESEARCHER, "DELETE", "/request",
+        lambda _requests: {"params": {"request_uuid": _requests[0]["request_uuid"]}}, 404, 1
+    ),
+    "review request": (
+        DATA_MANAGER, "PUT", "/review-request",
+        lambda _requests: {"json": {"request_uuid": _requests[0]["request_uuid"],
+                                    "status": "approved", "reviewer_decision": "OK"}}, 200, 1
+    ),
+    "review missing request": (
+        DATA_MANAGER, "PUT", "/review-request",
+        lambda _requests: {"json": {"request_uuid": UNKNOWN_UUID,
+                                    "status": "approved", "reviewer_decision": "OK"}}, 404, 1
+    ),
+    # Checks the request and its active job, inserts the job and loads it with its runs
+    "commit approved request": (
+        DATA_MANAGER, "PUT", "/request-adf-commit",
+        lambda _requests: {"params": {"request_uuid": _requests[1]["request_uuid"]}}, 202, 6
+    ),
+    "commit pending request": (
+        DATA_MANAGER, "PUT", "/request-adf-commit",
+        lambda _requests: {"params": {"request_uuid": _requests[0]["request_uuid"]}}, 404, 1
+    ),
+    "list workspaces": (
+        RESEARCHER, "GET", "/workspaces", lambda _requests: {}, 200, 1
+    ),
+    "get workspace": (
+        DATA_MANAGER, "GET", "/workspace",
+        lambda _requests: {"params": {"workspace_uuid": _requests[0]["workspace_uuid"]}},
+        200, 1
+    ),
+    "put workspace": (
+        DATA_MANAGER, "PUT", "/workspace",
+        lambda _requests: {
+            "params": {"workspace_uuid": _requests[0]["workspace_uuid"]},
+            "json": _workspace_body(_requests[0]["workspace_uuid"], [DATA_MANAGER.user_uuid])
+        }, 200, 4
+    ),
+    "put missing workspace": (
+        DATA_MANAGER, "PUT", "/workspace",
+        lambda _requests: {
+            "params": {"workspace_uuid": UNKNOWN_UUID},
+            "json": _workspace_body(UNKNOWN_UUID, [])
+        }, 404, 1
+    ),
+    "patch workspace visibility": (
+        DATA_MANAGER, "PATCH", "/workspace-visibility",
+        lambda _requests: {
+            "params": {"workspace_uuid": _requests[0]["workspace_uuid"]},
+            "json": {"add_users": [], "remove_users": [str(RESEARCHER.user_uuid)]}
+        }, 200, 4
+    ),
+    "get user": (
+        DATA_MANAGER, "GET", "/user",
+        lambda _requests: {"params": {"user_uuid": str(RESEARCHER.user_uuid)}}, 200, 1
+    ),
+    "get missing user": (
+        DATA_MANAGER, "GET", "/user",
+        lambda _requests: {"params": {"user_uuid": UNKNOWN_UUID}}, 404, 1
+    ),
+    "put user": (
+        DATA_MANAGER, "PUT", "/user",
+        lambda _requests: {
+            "params": {"user_uuid": str(RESEARCHER.user_uuid)},
+            "json": {"user_uuid": str(RESEARCHER.user_uuid), "user_full_name": "Renamed",
+                     "user_username": "renamed@example.com"}
+        }, 200, 1
+    ),
+    "put missing user": (
+        DATA_MANAGER, "PUT", "/user",
+        lambda _requests: {
+            "params": {"user_uuid": UNKNOWN_UUID},
+            "json": {"user_uuid": UNKNOWN_UUID, "user_full_name": "Nobody",
+                     "user_username": "nobody@example.com"}
+        }, 404, 1
+    ),
+    "users per workspace": (
+        DATA_MANAGER, "GET", "/users-per-workspace",
+        lambda _requests: {"params": {"workspace_uuid": _requests[0]["workspace_uuid"]}},
+        200, 0
+    ),
+    "visibility maps": (
+        DATA_MANAGER, "GET", "/workspaces-visibility-per-user-and-vice-versa",
+        lambda _requests: {}, 200, 0
+    ),
+}
+
+
+@pytest.mark.parametrize(
+    "user, method, url, arguments, status_code, round_trips",
+    ROUND_TRIPS.values(), ids=ROUND_TRIPS.keys()
+)
+def test_round_trips_of_endpoint(api, database, seeded_requests, warm_caches,
+                                 user, method, url, arguments, status_code, round_trips):
+    api.user = user
+    response = api.request(method, url, **arguments(seeded_requests))
+
+    assert response.status_code == status_code, response.text
+    assert database.recorder.round_trips == round_trips
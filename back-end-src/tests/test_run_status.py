@@ -0,0 +1,101 @@
+import asyncio
+import datetime
+import uuid
+
+import sqlalchemy
+
+from dataaccessrequest.adf_pipeline.query_payload import LocalPayloadStore
+from dataaccessrequest.adf_pipeline.run_status import PipelineRunPoller
+from dataaccessrequest.sql_models.db_models import (
+    DataAccessRequest,
+    DataAccessRequestPipelineRun,
+    DataAccessRequestProvisioningJob,
+)
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from .fake_pipeline import FakePipelineClient
+
+LOOKBACK_DAYS = 7
+NUMBER_OF_REQUESTS = 3
+NUMBER_OF_TABLES = 1
+NUMBER_OF_COLUMNS = 1
+
+
+def _submit(pipeline_client: FakePipelineClient, request: dict, number_of_runs: int,
+            created_on: datetime.datetime) -> list[str]:
+    """Record a succeeded provisioning job of the request with its runs (as the
+    provisioning worker does)."""
+    run_ids = [
+        asyncio.run(pipeline_client.create_run_async({}, request["workspace_uuid"]))
+        for _ in range(number_of_runs)
+    ]
+    job_uuid = str(uuid.uuid4())
+    with SESSION_FACTORY() as session:
+        session.add(DataAccessRequestProvisioningJob(
+            job_uuid=job_uuid, request_uuid=request["request_uuid"], status="succeeded",
+            created_on=created_on, updated_on=created_on, next_attempt_on=created_on,
+        ))
+        session.flush()
+        session.add_all(DataAccessRequestPipelineRun(
+            run_id=_run_id, job_uuid=job_uuid, group_number=_group_number,
+            table_names="[]", number_of_rows=0, created_on=created_on, status="Queued",
+        ) for _group_number, _run_id in enumerate(run_ids))
+        session.execute(sqlalchemy.update(DataAccessRequest).where(
+            DataAccessRequest.request_uuid == request["request_uuid"]
+        ).values(adf_run_id=run_ids[0], adf_run_status="Queued"))
+        session.commit()
+    return run_ids
+
+
+def _request_state(request: dict) -> tuple:
+    with SESSION_FACTORY() as session:
+        stored_request = session.get(DataAccessRequest, request["request_uuid"])
+        return (stored_request.adf_run_status, stored_request.adf_run_duration_ms,
+                stored_request.adf_run_error)
+
+
+def test_poll_stores_state_of_runs_on_request(seeded_requests, pipeline_client):
+    run_ids = _submit(pipeline_client, seeded_requests[0], 2, datetime.datetime.now())
+    poller = PipelineRunPoller(pipeline_client, interval=60, lookback_days=LOOKBACK_DAYS)
+
+    assert asyncio.run(poller.poll()) == 2
+    assert _request_state(seeded_requests[0]) == ("Queued", None, None)
+
+    pipeline_client.finish_run(run_ids[0], duration_ms=2000)
+    pipeline_client.finish_run(run_ids[1], status="Failed", message="Table not found")
+    assert asyncio.run(poller.poll()) == 2
+    assert _request_state(seeded_requests[0]) == (
+        "Failed", 2000, "Run 2 of 2: Table not found"
+    )
+
+    # Finished runs are not checked anymore
+    assert asyncio.run(poller.poll()) == 0
+    assert len(pipeline_client.queries) == 2
+
+
+def test_runs_older_than_lookback_are_not_checked(seeded_requests, pipeline_client):
+    now = datetime.datetime.now()
+    recent_run_ids = _submit(pipeline_client, seeded_requests[0], 1,
+                             now - datetime.timedelta(days=LOOKBACK_DAYS - 1))
+    _submit(pipeline_client, seeded_requests[1], 1,
+            now - datetime.timedelta(days=LOOKBACK_DAYS + 1))
+    poller = PipelineRunPoller(pipeline_client, interval=60, lookback_days=LOOKBACK_DAYS)
+
+    asyncio.run(poller.poll())
+
+    assert pipeline_client.queries == [recent_run_ids]
+
+
+def test_payloads_of_finished_runs_are_deleted(tmp_path, seeded_requests):
+    payload_store = LocalPayloadStore(tmp_path / "payloads")
+    pipeline_client = FakePipelineClient(payload_store=payload_store)
+    run_ids = _submit(pipeline_client, seeded_requests[0], 3, datetime.datetime.now())
+    poller = PipelineRunPoller(pipeline_client, interval=60, lookback_days=LOOKBACK_DAYS)
+    assert len(list(payload_store.directory.iterdir())) == 3
+
+    pipeline_client.finish_run(run_ids[0])
+    pipeline_client.finish_run(run_ids[1], status="Failed", message="Table not found")
+    asyncio.run(poller.poll())
+
+    remaining_reference = pipeline_client.runs[run_ids[2]].parameters["query_reference"]
+    assert [_path.as_uri() for _path in payload_store.directory.iterdir()] == \
+           [remaining_reference]
@@ -0,0 +1,137 @@
+"""Workspace visibility indexes of two worker processes sharing one database."""
+import uuid
+
+import pytest
+import sqlalchemy
+
+from dataaccessrequest.sql_models.db_models import (
+    DataAccessRequestUser,
+    DataAccessRequestWorkspace,
+    DataAccessRequestWorkspaceVisibility,
+)
+from dataaccessrequest.utils.session_manager import SESSION_FACTORY
+from dataaccessrequest.utils.workspace_acl import WorkspaceAclIndex, bump_acl_version
+from .conftest import DATA_MANAGER, RESEARCHER
+from .database import seed_database
+
+# User without requests (so it can be deleted)
+OTHER_USER = uuid.UUID("33333333-3333-3333-3333-333333333333")
+USERS = (DATA_MANAGER.user_uuid, RESEARCHER.user_uuid, OTHER_USER)
+
+
+@pytest.fixture
+def workspaces(database) -> list[uuid.UUID]:
+    """Workspaces seen by all users."""
+    seed_database(database.engine, list(USERS), 2, 0, 0, number_of_workspaces=3)
+    with SESSION_FACTORY() as session:
+        return [uuid.UUID(_workspace) for _workspace in session.scalars(
+            sqlalchemy.select(DataAccessRequestWorkspace.workspace_uuid)
+        )]
+
+
+def _loaded_index() -> WorkspaceAclIndex:
+    acl = WorkspaceAclIndex()
+    with SESSION_FACTORY() as session:
+        acl.load(session)
+    return acl
+
+
+def _refresh(acl: WorkspaceAclIndex) -> bool:
+    with SESSION_FACTORY() as session:
+        return acl.refresh(session)
+
+
+def _set_workspace_users(acl: WorkspaceAclIndex, workspace_uuid: uuid.UUID,
+                         users: set[uuid.UUID]) -> None:
+    """Change the visibility of the workspace as the process of the index does."""
+    with SESSION_FACTORY() as session:
+        session.execute(sqlalchemy.delete(DataAccessRequestWorkspaceVisibility).where(
+            DataAccessRequestWorkspaceVisibility.workspace_uuid == str(workspace_uuid)
+        ))
+        if users:
+            session.execute(sqlalchemy.insert(DataAccessRequestWorkspaceVisibility), [
+                {"workspace_uuid": str(workspace_uuid), "user_uuid": str(_user)}
+                for _user in users
+            ])
+        acl_version = bump_acl_version(session)
+        session.commit()
+    acl.set_workspace_users(workspace_uuid, users, acl_version)
+
+
+def _visibility(acl: WorkspaceAclIndex) -> dict:
+    return {_direction: {_key: set(_values) for _key, _values in _map.items()}
+            for _direction, _map in acl.visibility_maps().items()}
+
+
+def test_other_index_reloads_changed_version(workspaces):
+    first_acl, second_acl = _loaded_index(), _loaded_index()
+
+    _set_workspace_users(first_acl, workspaces[0], {DATA_MANAGER.user_uuid})
+
+    assert not first_acl.can_view(RESEARCHER.user_uuid, workspaces[0])
+    assert second_acl.can_view(RESEARCHER.user_uuid, workspaces[0])
+    assert _refresh(second_acl)
+    assert not second_acl.can_view(RESEARCHER.user_uuid, workspaces[0])
+    assert second_acl.version == first_acl.version == 1
+    assert _visibility(second_acl) == _visibility(first_acl)
+    assert not _refresh(first_acl)
+    assert not _refresh(second_acl)
+
+
+def test_change_skipping_version_is_reloaded(workspaces):
+    first_acl, second_acl = _loaded_index(), _loaded_index()
+    _set_workspace_users(second_acl, workspaces[0], {RESEARCHER.user_uuid})
+
+    # Version 2 is applied on top of version 0, the version 1 is not seen yet
+    _set_workspace_users(first_acl, workspaces[1], {DATA_MANAGER.user_uuid})
+
+    assert first_acl.version == 0
+    assert first_acl.can_view(DATA_MANAGER.user_uuid, workspaces[0])
+    assert _refresh(first_acl)
+    assert first_acl.version == 2
+    assert not first_acl.can_view(DATA_MANAGER.user_uuid, workspaces[0])
+    assert first_acl.users_of(workspaces[1]) == {DATA_MANAGER.user_uuid}
+    assert _refresh(second_acl)
+    assert _visibility(second_acl) == _visibility(first_acl)
+
+
+def test_removed_user_sees_no_workspace(workspaces):
+    first_acl, second_acl = _loaded_index(), _loaded_index()
+    _set_workspace_users(first_acl, workspaces[2], {OTHER_USER})
+
+    with SESSION_FACTORY() as session:
+        # Its visibility is deleted by cascade
+        session.execute(sqlalchemy.delete(DataAccessRequestUser).where(
+            DataAccessRequestUser.user_uuid == str(OTHER_USER)
+        ))
+        acl_version = bump_acl_version(session)
+        session.commit()
+    first_acl.remove_user(OTHER_USER, acl_version)
+
+    assert first_acl.version == 2
+    assert first_acl.workspaces_of(OTHER_USER) == frozenset()
+    assert all(OTHER_USER not in first_acl.users_of(_workspace) for _workspace in workspaces)
+    # The workspace seen only by the user is not listed anymore
+    assert workspaces[2] not in first_acl.visibility_maps()["workspace_to_users"]
+    assert _refresh(second_acl)
+    assert _visibility(second_acl) == _visibility(first_acl)
+
+
+def test_emptied_workspace_is_not_listed(workspaces):
+    first_acl, second_acl = _loaded_index(), _loaded_index()
+    _set_workspace_users(first_acl, workspaces[1], {RESEARCHER.user_uuid})
+    _set_workspace_users(first_acl, workspaces[2], {RESEARCHER.user_uuid})
+
+    _set_workspace_users(first_acl, workspaces[0], set())
+
+    assert first_acl.version == 3
+    assert first_acl.users_of(workspaces[0]) == frozenset()
+    assert first_acl.workspaces_of(RESEARCHER.user_uuid) == {workspaces[1], workspaces[2]}
+    # Users that saw only the emptied workspace are not listed anymore
+    assert _visibility(first_acl) == {
+        "user_to_workspaces": {RESEARCHER.user_uuid: {workspaces[1], workspaces[2]}},
+        "workspace_to_users": {workspaces[1]: {RESEARCHER.user_uuid},
+                               workspaces[2]: {RESEARCHER.user_uuid}},
+    }
+    assert _refresh(second_acl)
+    assert _visibility(second_acl) == _visibility(first_acl)
@@ -0,0 +1,48 @@
+"""Access tokens (JWT) signed by a local RSA key, accepted by the Azure AD bearer once it is
+configured with the key (no call to Azure AD)."""
+import datetime
+import time
+import uuid
+
+from cryptography.hazmat.primitives import serialization
+from cryptography.hazmat.primitives.asymmetric import rsa
+from fastapi_azure_auth import SingleTenantAzureAuthorizationCodeBearer
+from jose import jwk, jwt
+
+from dataaccessrequest.pydantic_models.pd_aad_auth_models import AADUserModel
+
+KEY_ID = "test-key"
+
+
+class TokenIssuer:
+    """Issues tokens of the tenant for the application."""
+
+    def __init__(self, tenant_id: str, app_client_id: str):
+        self.tenant_id = tenant_id
+        self.app_client_id = app_client_id
+        self.issuer = f"https://login.microsoftonline.com/{tenant_id}/v2.0"
+        key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+        self._private_key = key.private_bytes(
+            serialization.Encoding.PEM, serialization.PrivateFormat.PKCS8,
+            serialization.NoEncryption()
+        )
+        self._public_key = key.public_key().public_bytes(
+            serialization.Encoding.PEM, serialization.PublicFormat.SubjectPublicKeyInfo
+        )
+
+    def configure(self, bearer: SingleTenantAzureAuthorizationCodeBearer) -> None:
+        """Make the bearer trust the key without loading the OpenID configuration."""
+        bearer.openid_config.signing_keys = {KEY_ID: jwk.construct(self._public_key, "RS256")}
+        bearer.openid_config.issuer = self.issuer
+        bearer.openid_config._config_timestamp = datetime.datetime.now()
+
+    def issue(self, user: AADUserModel, lifetime: int = 3600) -> str:
+        """Signed access token of the user valid for lifetime seconds."""
+        now = int(time.time())
+        return jwt.encode({
+            "aud": self.app_client_id, "iss": self.issuer, "iat": now, "nbf": now,
+            "exp": now + lifetime, "sub": str(uuid.uuid4()), "ver": "2.0",
+            "tid": self.tenant_id, "oid": str(user.oid), "roles": user.roles,
+            "name": user.name, "preferred_username": user.preferred_username,
+            "scp": "user_impersonation",
+        }, self._private_key, algorithm="RS256", headers={"kid": KEY_ID})
@@ -60,3 +60,23 @@ export const parseDateTime = (dateTimeString) => {
     ")"
   );
 };
+
+/**
+ * Format the estimated size of the request, e.g. "1,234,567 rows, 42.1 MB"
+ * @param {Number} estimatedRows estimated number of rows (null if not estimated)
+ * @param {Number} estimatedBytes estimated number of bytes
+ * @returns formatted estimate, "N/A" if not estimated
+ */
+export const formatEstimate = (estimatedRows, estimatedBytes) => {
+  if (estimatedRows === null || estimatedRows === undefined) {
+    return "N/A";
+  }
+  const units = ["B", "kB", "MB", "GB", "TB"];
+  let size = estimatedBytes;
+  let unit = 0;
+  while (size >= 1000 && unit < units.length - 1) {
+    size /= 1000;
+    unit++;
+  }
+  return `${estimatedRows.toLocaleString("en-GB")} rows, ${size.toFixed(unit ? 1 : 0)} ${units[unit]}`;
+};
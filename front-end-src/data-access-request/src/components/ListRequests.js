@@ -1,7 +1,7 @@
 import { useState, useEffect } from "react";
 import { Link } from "react-router-dom";
 import EmptyTable from "./EmptyTable";
-import { createShortUUID, parseDateTime } from "../commons/common-scripts";
+import { createShortUUID, parseDateTime, formatEstimate } from "../commons/common-scripts";
 import { BACKEND_ENDPOINT } from "../commons/backend-config";
 import { AuthIsDataManagerComponent } from "../auth/AuthComponent";
 import { getBackEndTokenObject } from "../auth/AuthenticationConfig";
@@ -13,19 +13,23 @@ import { getBackEndTokenObject } from "../auth/AuthenticationConfig";
 const ListRequests = () => {
   // Contains selected columns and tables
   const [requestsArray, setRequestsArray] = useState([]);
+  // Cursor pointing to the next page of requests (null if there is no other page)
+  const [nextCursor, setNextCursor] = useState(null);
 
-  // Fetch workspaces (REST)
+  // Fetch the first page of requests (REST)
   useEffect(() => {
     const getRequestsArray = async () => {
-      const itemsFromServer = await fetchRequestsArray();
-      setRequestsArray(itemsFromServer);
+      const pageFromServer = await fetchRequestsPage(null);
+      setRequestsArray(pageFromServer.items);
+      setNextCursor(pageFromServer.next_cursor);
     };
     getRequestsArray();
   }, []);
 
-  // Actual REST API call to fetch catalogue items
-  const fetchRequestsArray = async () => {
-    const res = await fetch(`${BACKEND_ENDPOINT}/requests`, {
+  // Actual REST API call to fetch one page of requests
+  const fetchRequestsPage = async (cursor) => {
+    const cursorQuery = cursor ? `?cursor=${encodeURIComponent(cursor)}` : "";
+    const res = await fetch(`${BACKEND_ENDPOINT}/requests${cursorQuery}`, {
       headers: {
         Authorization: `Bearer ${getBackEndTokenObject()}`,
         "Content-Type": "application/json",
@@ -34,6 +38,13 @@ const ListRequests = () => {
     return await res.json();
   };
 
+  // Append the next page of requests to the list
+  const loadNextPage = async () => {
+    const pageFromServer = await fetchRequestsPage(nextCursor);
+    setRequestsArray([...requestsArray, ...pageFromServer.items]);
+    setNextCursor(pageFromServer.next_cursor);
+  };
+
   return (
     <>
       <table>
@@ -45,6 +56,7 @@ const ListRequests = () => {
               <th>Author</th>
             </AuthIsDataManagerComponent>
             <th>Status</th>
+            <th>Estimated size</th>
             <th>Created on</th>
             <th>Actions</th>
           </tr>
@@ -66,7 +78,11 @@ const ListRequests = () => {
               <AuthIsDataManagerComponent>
                 <td>{accessRequest.creator.user_full_name}</td>
               </AuthIsDataManagerComponent>
-              <td>{accessRequest.status}</td>
+              <td>
+                {accessRequest.status}
+                {accessRequest.adf_run_status ? ` (provisioning: ${accessRequest.adf_run_status})` : ""}
+              </td>
+              <td>{formatEstimate(accessRequest.estimated_rows, accessRequest.estimated_bytes)}</td>
               <td>{parseDateTime(accessRequest.created_on)}</td>
               <td>
                 {accessRequest.status === "pending" ? (
@@ -91,6 +107,25 @@ const ListRequests = () => {
           <EmptyTable textForEmptyTable={"No access request available"} />
         )
       }
+
+      {
+        /* In the case there are more requests on the server */
+        nextCursor && (
+          <div className="bottom-menu">
+            <a
+              href="/"
+              className="button left-button"
+              onClick={(e) => {
+                e.preventDefault();
+                loadNextPage();
+              }}
+            >
+              LOAD MORE
+            </a>
+            <div className="clear"></div>
+          </div>
+        )
+      }
     </>
   );
 };
@@ -1,17 +1,25 @@
-import { useState } from "react";
+import { useState, useEffect } from "react";
 import { BACKEND_ENDPOINT } from "../commons/backend-config";
 import { getBackEndTokenObject } from "../auth/AuthenticationConfig";
 
+// Milliseconds between checks of the provisioning job state
+const JOB_POLL_INTERVAL = 2000;
+
 /**
  * Component for running of the Dataset Provisioning pipeline
  * @param requestUUID UUID of the DAR
  * @param workspaceUUID UUID of the workspace
  * @param adfLink
+ * @param adfRunStatus status of the pipeline run in ADF (null until submitted)
+ * @param adfRunError message of the failed pipeline run
  * @returns component for running of the Dataset Provisioning pipeline
  */
-function RequestRunPipeline({ requestUUID, workspaceUUID, adfLink }) {
+function RequestRunPipeline({ requestUUID, workspaceUUID, adfLink, adfRunStatus, adfRunError }) {
   const [adfPipelineLink, setAdfPipelineLink] = useState(adfLink);
-  // Actual REST API triggers the Dataset Provisioning pipeline
+  // Provisioning job submitting the pipeline (null until the pipeline is triggered)
+  const [provisioningJob, setProvisioningJob] = useState(null);
+
+  // Actual REST API queues the job triggering the Dataset Provisioning pipeline
   const triggerDatasetProvisioningPipeline = async () => {
     const res = await fetch(`${BACKEND_ENDPOINT}/request-adf-commit?request_uuid=${requestUUID}`, {
       method: "PUT",
@@ -23,6 +31,35 @@ function RequestRunPipeline({ requestUUID, workspaceUUID, adfLink }) {
     return await res.json();
   };
 
+  // Actual REST API call to fetch the state of the provisioning job
+  const fetchProvisioningJob = async (jobUUID) => {
+    const res = await fetch(`${BACKEND_ENDPOINT}/provisioning-job?job_uuid=${jobUUID}`, {
+      headers: {
+        Authorization: `Bearer ${getBackEndTokenObject()}`,
+        "Content-Type": "application/json",
+      },
+    });
+    return await res.json();
+  };
+
+  // Check the job until the pipeline is submitted (or the submission fails)
+  useEffect(() => {
+    if (provisioningJob === null) {
+      return;
+    }
+    if (provisioningJob.status === "succeeded") {
+      setAdfPipelineLink(provisioningJob.adf_link);
+      return;
+    }
+    if (provisioningJob.status === "failed") {
+      return;
+    }
+    const timer = setTimeout(async () => {
+      setProvisioningJob(await fetchProvisioningJob(provisioningJob.job_uuid));
+    }, JOB_POLL_INTERVAL);
+    return () => clearTimeout(timer);
+  }, [provisioningJob]);
+
   return (
     <div className="large-top-margin">
       <h1>Dataset Provisioning pipeline</h1>
@@ -35,6 +72,22 @@ function RequestRunPipeline({ requestUUID, workspaceUUID, adfLink }) {
       ) : (
         ""
       )}
+      {provisioningJob !== null && provisioningJob.status !== "succeeded" ? (
+        <p>
+          Pipeline submission: <strong>{provisioningJob.status}</strong>
+          {provisioningJob.error ? <span> ({provisioningJob.error})</span> : ""}
+        </p>
+      ) : (
+        ""
+      )}
+      {provisioningJob !== null && provisioningJob.runs.length > 1 ? (
+        <p>
+          Tables split into <strong>{provisioningJob.runs.length}</strong> parallel pipeline runs
+          (the link refers to the first one)
+        </p>
+      ) : (
+        ""
+      )}
       <p>
         Pipeline link:{" "}
         {adfPipelineLink ? (
@@ -43,16 +96,24 @@ function RequestRunPipeline({ requestUUID, workspaceUUID, adfLink }) {
           <span>N/A</span>
         )}
       </p>
+      {adfRunStatus ? (
+        <p>
+          Pipeline run status: <strong>{adfRunStatus}</strong>
+          {adfRunError ? <span> ({adfRunError})</span> : ""}
+        </p>
+      ) : (
+        ""
+      )}
       <div className="bottom-menu">
         <div className="clear">&nbsp;</div>
-        {!adfPipelineLink ? (
+        {!adfPipelineLink && (provisioningJob === null || provisioningJob.status === "failed") ? (
           <a
             href="/"
             className="button left-button greenbutton"
-            onClick={(e) => {
+            onClick={async (e) => {
               e.preventDefault();
-              // Set the ADF link
-              setAdfPipelineLink(triggerDatasetProvisioningPipeline().adf_link);
+              // Queue the job, the ADF link is set once the job submits the pipeline
+              setProvisioningJob(await triggerDatasetProvisioningPipeline());
             }}
           >
             RUN ADF PIPELINE
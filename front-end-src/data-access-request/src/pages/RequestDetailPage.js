@@ -1,6 +1,6 @@
 import { useEffect, useState } from "react";
 import { useSearchParams, Link } from "react-router-dom";
-import { createShortDescription, parseDateTime } from "../commons/common-scripts";
+import { createShortDescription, parseDateTime, formatEstimate } from "../commons/common-scripts";
 import { BACKEND_ENDPOINT } from "../commons/backend-config";
 import { AuthIsDataManagerComponent } from "../auth/AuthComponent";
 import { getBackEndTokenObject } from "../auth/AuthenticationConfig";
@@ -90,6 +90,14 @@ const RequestDetailPage = () => {
               </li>
             ))}
           </ul>
+          <p>
+            <strong>Estimated size:</strong>{" "}
+            {formatEstimate(
+              dataAccessRequestDetail.estimated_rows,
+              dataAccessRequestDetail.estimated_bytes
+            )}{" "}
+            <em>(WHERE conditions are not taken into account)</em>
+          </p>
 
           {dataAccessRequestDetail.comment && (
             <>
@@ -143,6 +151,8 @@ const RequestDetailPage = () => {
                 requestUUID={dataAccessRequestDetail.request_uuid}
                 workspaceUUID={dataAccessRequestDetail.workspace_uuid}
                 adfLink={dataAccessRequestDetail.adf_link}
+                adfRunStatus={dataAccessRequestDetail.adf_run_status}
+                adfRunError={dataAccessRequestDetail.adf_run_error}
               />
             </AuthIsDataManagerComponent>
           )}
@@ -191,8 +191,179 @@ BEGIN
 END;
 GO
 
+-- Indexes for the keyset pagination of the request list, ordered by (created_on, request_uuid),
+--  optionally filtered by status, workspace or creator (created also in existing databases)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='index_on_DataAccessRequest_created_on')
+    CREATE INDEX index_on_DataAccessRequest_created_on
+        ON DataAccessRequest(created_on DESC, request_uuid DESC);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='index_on_DataAccessRequest_status_created_on')
+    CREATE INDEX index_on_DataAccessRequest_status_created_on
+        ON DataAccessRequest(status, created_on DESC, request_uuid DESC);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='index_on_DataAccessRequest_workspace_uuid_created_on')
+    CREATE INDEX index_on_DataAccessRequest_workspace_uuid_created_on
+        ON DataAccessRequest(workspace_uuid, created_on DESC, request_uuid DESC);
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='index_on_DataAccessRequest_creator_uuid_created_on')
+    CREATE INDEX index_on_DataAccessRequest_creator_uuid_created_on
+        ON DataAccessRequest(creator_uuid, created_on DESC, request_uuid DESC);
+GO
+
+-- State of the Dataset Provisioning pipeline run of DARs, kept up to date by the service
+--  (aggregated over all runs of the last submission, added also in existing databases)
+IF COL_LENGTH('DataAccessRequest', 'adf_run_id') IS NULL
+    ALTER TABLE DataAccessRequest ADD
+        --  - identifier of the (first) pipeline run in ADF
+        adf_run_id varchar(64),
+        --  - status of the run (Queued, InProgress, Succeeded, Failed, Canceling, Cancelled)
+        adf_run_status varchar(32),
+        --  - duration of the finished run (in milliseconds)
+        adf_run_duration_ms bigint,
+        --  - message of the failed run
+        adf_run_error varchar(1024);
+GO
+
+-- Estimated size of the data provisioned for DARs, cached by the service (added also in
+--  existing databases)
+IF COL_LENGTH('DataAccessRequest', 'estimated_rows') IS NULL
+    ALTER TABLE DataAccessRequest ADD
+        --  - estimated number of rows and bytes of the requested tables and columns
+        estimated_rows bigint,
+        estimated_bytes bigint,
+        --  - version of the catalogue the estimate was computed from
+        estimate_version varchar(64);
+GO
+
+-- Jobs running the Dataset Provisioning pipeline (ADF) of approved DARs, created by
+--  the commit end-point and processed by background workers of the service
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='DataAccessRequestProvisioningJob' and xtype='U')
+BEGIN
+    CREATE TABLE DataAccessRequestProvisioningJob(
+        -- === GENERIC COLUMNS ===
+        --  - UUID of the job, primary key
+        job_uuid uniqueidentifier not null,
+        --  - provisioned DAR (FK)
+        request_uuid uniqueidentifier not null,
+        --  - state of the job (queued, running, succeeded, failed)
+        status varchar(32) default 'queued' not null,
+        --  - number of submissions of the pipeline tried so far
+        attempts int default 0 not null,
+        --  - when the job was created and last changed
+        created_on datetime2 not null,
+        updated_on datetime2 not null,
+        --  - when the job (queued) can be submitted (later for retries)
+        next_attempt_on datetime2 not null,
+        --  - link to the pipeline run (once submitted)
+        adf_link varchar(1024),
+        --  - reason of the last failed submission
+        error varchar(1024),
+        -- =======================
+
+        -- === Constraints ===
+        --  foreign key for request_uuid
+        CONSTRAINT fk_provisioning_request_uuid FOREIGN KEY (request_uuid)
+            REFERENCES DataAccessRequest(request_uuid)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        --  - restrict status values
+        CONSTRAINT check_provisioning_status
+            CHECK (status IN ('queued', 'running', 'succeeded', 'failed')),
+        -- table specific primary key (job_uuid)
+        CONSTRAINT pk_job_uuid PRIMARY KEY (job_uuid)
+        -- ===================
+    );
+    -- Index to optimise selection of jobs to be submitted
+    CREATE INDEX index_on_DataAccessRequestProvisioningJob_status_next_attempt_on
+        ON DataAccessRequestProvisioningJob(status, next_attempt_on);
+    -- Index to optimise selection of jobs of the request
+    CREATE INDEX index_on_DataAccessRequestProvisioningJob_request_uuid
+        ON DataAccessRequestProvisioningJob(request_uuid);
+END;
+GO
+
+-- At most one active (queued or running) job of each request, so concurrent commits of the
+--  request cannot both create a job (created also in existing databases)
+IF NOT EXISTS (SELECT * FROM sys.indexes WHERE name='index_on_DataAccessRequestProvisioningJob_active_request_uuid')
+    CREATE UNIQUE INDEX index_on_DataAccessRequestProvisioningJob_active_request_uuid
+        ON DataAccessRequestProvisioningJob(request_uuid)
+        WHERE status IN ('queued', 'running');
+GO
+
+-- Pipeline runs submitted by provisioning jobs, one per group of tables (a large request
+--  can be split into more runs running in parallel)
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='DataAccessRequestPipelineRun' and xtype='U')
+BEGIN
+    CREATE TABLE DataAccessRequestPipelineRun(
+        -- === GENERIC COLUMNS ===
+        --  - identifier of the pipeline run in ADF, primary key
+        run_id varchar(64) not null,
+        --  - job that submitted the run (FK)
+        job_uuid uniqueidentifier not null,
+        --  - order of the group of tables within the job (0 is the first)
+        group_number int not null,
+        --  - names of the tables of the group (JSON list) and their number of rows
+        table_names text not null,
+        number_of_rows bigint not null,
+        --  - when the run was submitted
+        created_on datetime2 not null,
+        --  - status of the run in ADF, duration of the finished run and message of the failed
+        --    one (updated by the run status poller)
+        status varchar(32) not null,
+        duration_ms bigint,
+        error varchar(1024),
+        -- =======================
+
+        -- === Constraints ===
+        --  foreign key for job_uuid
+        CONSTRAINT fk_pipeline_run_job_uuid FOREIGN KEY (job_uuid)
+            REFERENCES DataAccessRequestProvisioningJob(job_uuid)
+            ON DELETE CASCADE
+            ON UPDATE CASCADE,
+        -- table specific primary key (run_id)
+        CONSTRAINT pk_run_id PRIMARY KEY (run_id)
+        -- ===================
+    );
+    -- Index to optimise selection of unfinished runs
+    CREATE INDEX index_on_DataAccessRequestPipelineRun_status
+        ON DataAccessRequestPipelineRun(status);
+    -- Index to optimise selection of runs of the job
+    CREATE INDEX index_on_DataAccessRequestPipelineRun_job_uuid
+        ON DataAccessRequestPipelineRun(job_uuid, group_number);
+END;
+GO
+
+-- Version counters of cached access control lists, incremented by each change of the list
+--  (worker processes reload their copy of the list when the version changes)
+IF NOT EXISTS (SELECT * FROM sysobjects WHERE name='DataAccessRequestAclVersion' and xtype='U')
+BEGIN
+    CREATE TABLE DataAccessRequestAclVersion(
+        -- === GENERIC COLUMNS ===
+        --  - name of the list (e.g. workspace_visibility), primary key
+        acl_name varchar(64) not null,
+        --  - current version of the list
+        version bigint not null,
+        -- =======================
+
+        -- === Constraints ===
+        -- table specific primary key (acl_name)
+        CONSTRAINT pk_acl_name PRIMARY KEY (acl_name)
+        -- ===================
+    );
+    INSERT INTO DataAccessRequestAclVersion(acl_name, version) VALUES ('workspace_visibility', 0);
+END;
+GO
+
 -- DROP STATEMENTS IF NEEDED
 /*
+DROP TABLE DataAccessRequestAclVersion;
+DROP INDEX index_on_DataAccessRequestPipelineRun_job_uuid ON DataAccessRequestPipelineRun;
+DROP INDEX index_on_DataAccessRequestPipelineRun_status ON DataAccessRequestPipelineRun;
+DROP TABLE DataAccessRequestPipelineRun;
+DROP INDEX index_on_DataAccessRequestProvisioningJob_request_uuid ON DataAccessRequestProvisioningJob;
+DROP INDEX index_on_DataAccessRequestProvisioningJob_status_next_attempt_on ON DataAccessRequestProvisioningJob;
+DROP TABLE DataAccessRequestProvisioningJob;
+DROP INDEX index_on_DataAccessRequest_creator_uuid_created_on ON DataAccessRequest;
+DROP INDEX index_on_DataAccessRequest_workspace_uuid_created_on ON DataAccessRequest;
+DROP INDEX index_on_DataAccessRequest_status_created_on ON DataAccessRequest;
+DROP INDEX index_on_DataAccessRequest_created_on ON DataAccessRequest;
 DROP INDEX index_on_DataAccessRequestColumns_dar_tables_uuid ON DataAccessRequestColumns;
 DROP TABLE DataAccessRequestColumns;
 DROP INDEX index_on_DataAccessRequestTables_request_uuid ON DataAccessRequestTables;